@@ -1,15 +1,51 @@
-from fastapi import Depends
-from repositories.in_memory_repository import InMemoryRepository
+from typing import Iterator, Optional
+from fastapi import Depends, Header, Query
+from core.config import settings
+from core.jobs import JobManager
+from core.workspaces import Repositorio, Workspace, WorkspaceRegistry, WORKSPACE_PADRAO
 from services.chamada_service import ChamadaService
 from services.file_service import FileService
+from services.export_service import ExportService
 
-global_repository = InMemoryRepository()
+workspaces = WorkspaceRegistry()
+jobs = JobManager(settings.jobs_max_workers, settings.jobs_max_retidos)
 
-def get_repository() -> InMemoryRepository:
-    return global_repository
+def restaurar_estado() -> None:
+    """Restaura os workspaces com estado persistido (chamado na inicialização)."""
+    workspaces.restaurar_persistidos()
 
-def get_chamada_service(repo: InMemoryRepository = Depends(get_repository)) -> ChamadaService:
-    return ChamadaService(repo)
+def encerrar_repositorio() -> None:
+    jobs.encerrar()
+    workspaces.fechar()
+
+def get_nome_workspace(
+    x_workspace: Optional[str] = Header(None, description="Workspace isolado em que a requisição opera"),
+    workspace: Optional[str] = Query(None, description="Alternativa ao cabeçalho X-Workspace (ex.: links de download)"),
+) -> str:
+    """Nome do workspace da requisição (cabeçalho X-Workspace ou parâmetro `workspace`; "default" se nenhum)."""
+    return x_workspace or workspace or WORKSPACE_PADRAO
+
+def get_workspace(nome: str = Depends(get_nome_workspace)) -> Iterator[Workspace]:
+    """
+    Workspace da requisição. O lock do workspace fica com a requisição até a
+    resposta terminar, de modo que as operações de um mesmo workspace são
+    serializadas e as de workspaces diferentes, não.
+    """
+    atual = workspaces.obter(nome)
+    with atual.lock:
+        yield atual
+
+def get_repository(workspace: Workspace = Depends(get_workspace)) -> Repositorio:
+    return workspace.repositorio
+
+def get_chamada_service(workspace: Workspace = Depends(get_workspace)) -> ChamadaService:
+    return ChamadaService(workspace.repositorio, workspace.cache, workspace.persistencia)
 
 def get_file_service() -> FileService:
-    return FileService()
\ No newline at end of file
+    return FileService()
+
+def get_export_service() -> ExportService:
+    return ExportService()
+
+def get_job_manager() -> JobManager:
+    return jobs
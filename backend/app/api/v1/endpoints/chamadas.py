@@ -1,64 +1,125 @@
 from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, Body, Query
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 
-import pandas as pd
 import logging
 
-from fastapi.responses import StreamingResponse
-from api.dependencies import get_chamada_service, get_file_service
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
+from api.dependencies import get_chamada_service, get_file_service, get_export_service, get_workspace, get_job_manager
+from core.jobs import Job, JobManager
+from core.workspaces import Workspace
 from services.chamada_service import ChamadaService
 from services.file_service import FileService
+from services.export_service import ExportService
 from domain.entities import (
-    Vagas, ChamadaResult, Candidato, FileUploadResponse, UploadSuccessResponse, BaseModel, FiltroPayload
+    Vagas, ChamadaResult, Candidato, FileUploadResponse, UploadSuccessResponse, BaseModel, FiltroPayload,
+    ChamadaLoteResult, CandidatosPagina, SimulacaoResult
 )
+from domain.enums import FormatoArquivo, OrdemCandidatos, StatusCandidato, TipoCota
 
-from core.exceptions import InvalidFileException, ValidationException, NotFoundException
+from core.exceptions import InvalidFileException, ValidationException, NotFoundException, UnsupportedFormatException
 from core.config import settings
+from core.serializacao import RespostaJSON, MEDIA_TYPE_NDJSON, linhas_ndjson
 import io
+import shutil
+import tempfile
 
+# As rotas são síncronas: o FastAPI as executa em threads, de modo que o
+# processamento pesado não bloqueia o event loop. Upload e geração de chamadas
+# aceitam ainda `assincrono=true`, que agenda a operação como job (ver /jobs).
+# As rotas que devolvem listas grandes retornam `RespostaJSON`, serializada
+# direto em bytes; o `response_model` fica apenas como documentação.
 router = APIRouter(prefix="/chamadas", tags=["chamadas"])
 
-def format_ordinal(n, gender='m'):
-    """Formata um número como ordinal em português (ex: 1, 'f' -> '1ª')."""
-    if not isinstance(n, (int, float)) or pd.isna(n):
-        return ''
-    num = int(n)
-    if gender.lower() == 'f':
-        return f"{num}ª"
-    return f"{num}º"
-
-@router.post("/upload", response_model=UploadSuccessResponse, summary="Upload de arquivo CSV")
-async def upload_csv(
+def _resposta_job(job: Job) -> JSONResponse:
+    return JSONResponse(status_code=202, content=jsonable_encoder(job.info()), headers={"Location": f"/jobs/{job.id}"})
+
+def _resposta_exportacao(export_service: ExportService, chamada_service: ChamadaService, ids, nome_arquivo: str, formato: FormatoArquivo) -> StreamingResponse:
+    media_type, extensao = export_service.FORMATOS[formato]
+    return StreamingResponse(
+        export_service.gerar(chamada_service.repo, ids, formato),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f"attachment; filename={nome_arquivo}.{extensao}"
+        }
+    )
+
+def _campos(fields: Optional[str]) -> Optional[List[str]]:
+    """Campos pedidos em `fields` (separados por vírgula); None quando não informados."""
+    return [campo.strip() for campo in (fields or "").split(",") if campo.strip()] or None
+
+def _curso_key(campus: Optional[str], curso: Optional[str], turno: Optional[str]):
+    return (campus, curso, turno) if campus is not None or curso is not None or turno is not None else None
+
+def _com_progresso(lotes, arquivo, tamanho: int, job: Job):
+    """Relata ao job, a cada bloco carregado, a fração do arquivo já lida."""
+    carregados = 0
+    for lote in lotes:
+        carregados += len(lote["cpf"])
+        job.relatar(min(arquivo.tell() / tamanho, 0.99) if tamanho else None, f"{carregados} candidatos lidos")
+        yield lote
+
+def _carregar_arquivo(
+    file_service: FileService, chamada_service: ChamadaService, arquivo, filename: str, content_type: Optional[str],
+    tamanho: int, delimiter: str, encoding: str, ignorar_linhas_invalidas: bool, formato: Optional[FormatoArquivo],
+    job: Job = None
+) -> dict:
+    rejeitadas = [] if ignorar_linhas_invalidas else None
+    formato = formato or file_service.detectar_formato(filename)
+    lotes = file_service.stream_candidatos(arquivo, delimiter, encoding, rejeitadas=rejeitadas, formato=formato)
+    if job is not None:
+        lotes = _com_progresso(lotes, arquivo, tamanho, job)
+    total_carregados = chamada_service.carregar_candidatos_em_lotes(lotes)
+    rejeitadas = rejeitadas or []
+
+    # Apenas o resumo da carga é devolvido; a lista completa fica em GET /chamadas/candidatos
+    return {
+        "status": "success",
+        "data": FileUploadResponse(
+            filename=filename,
+            size=tamanho,
+            content_type=content_type or "application/octet-stream",
+            records_processed=total_carregados,
+            linhas_rejeitadas=len(rejeitadas),
+            amostra_linhas_rejeitadas=rejeitadas[:file_service.MAX_ERROS_REPORTADOS],
+            **chamada_service.resumir_candidatos()
+        )
+    }
+
+@router.post("/upload", response_model=UploadSuccessResponse, summary="Upload de arquivo CSV, Parquet ou Arrow IPC")
+def upload_csv(
     file: UploadFile = File(...),
     delimiter: str = Query(";", description="Delimitador usado no arquivo CSV."),
     encoding: str = Query("iso-8859-1", description="Encoding do arquivo CSV. (ex: utf-8, iso-8859-1)"),
+    ignorar_linhas_invalidas: bool = Query(False, description="Descarta as linhas inválidas (informadas no resumo) em vez de rejeitar o arquivo."),
+    formato: Optional[FormatoArquivo] = Query(None, description="Formato do arquivo (csv, parquet ou arrow). Padrão: deduzido pela extensão."),
+    assincrono: bool = Query(False, description="Agenda a carga como job e responde 202 com o id do job."),
     file_service: FileService = Depends(get_file_service),
-    chamada_service: ChamadaService = Depends(get_chamada_service)
+    chamada_service: ChamadaService = Depends(get_chamada_service),
+    workspace: Workspace = Depends(get_workspace),
+    job_manager: JobManager = Depends(get_job_manager)
 ):
     try:
-        content = await file.read()
-        
-        if len(content) > settings.max_file_size:
+        tamanho = file.size if file.size is not None else file.file.seek(0, io.SEEK_END)
+        file.file.seek(0)
+
+        if tamanho > settings.max_file_size:
             raise HTTPException(status_code=413, detail=f"Arquivo muito grande. Tamanho máximo: {settings.max_file_size // (1024*1024)}MB")
 
-        records = file_service.process_csv(content, delimiter, encoding)
-        candidatos_obj = file_service.convert_to_candidatos(records)
-        
-        chamada_service.repo.reset()
-        total_carregados = chamada_service.carregar_candidatos(candidatos_obj)
-        
-        candidatos_retorno = chamada_service.repo.list_candidatos()
+        argumentos = (file.filename, file.content_type, tamanho, delimiter, encoding, ignorar_linhas_invalidas, formato)
+        if assincrono:
+            # O arquivo do upload é fechado ao fim da requisição: o job trabalha sobre uma cópia
+            copia = tempfile.TemporaryFile()
+            shutil.copyfileobj(file.file, copia)
+            copia.seek(0)
 
-        return {
-            "status": "success",
-            "data": FileUploadResponse(
-                filename=file.filename,
-                size=len(content),
-                content_type=file.content_type or "application/octet-stream",
-                records_processed=total_carregados,
-                candidatos=candidatos_retorno
-            )
-        }
+            def executar(job: Job) -> dict:
+                with copia:
+                    return _carregar_arquivo(file_service, chamada_service, copia, *argumentos, job=job)
+            return _resposta_job(job_manager.submeter("upload", workspace, executar))
+
+        # O upload já está em um arquivo temporário; ele é lido e carregado em blocos
+        return _carregar_arquivo(file_service, chamada_service, file.file, *argumentos)
     except InvalidFileException as e:
         logging.exception(f"Erro de arquivo inválido durante o upload: {e.detail}")
         raise HTTPException(status_code=e.status_code, detail=e.detail)
@@ -68,8 +129,35 @@ async def upload_csv(
         logging.exception("Erro interno não esperado no upload_csv")
         raise HTTPException(status_code=500, detail=f"Erro interno ao processar o arquivo: {str(e)}")
 
+@router.get("/candidatos", response_model=CandidatosPagina, summary="Listar os candidatos carregados (paginado, com filtros)")
+def listar_candidatos(
+    offset: int = Query(0, ge=0, description="Posição do primeiro candidato da página."),
+    limit: int = Query(100, ge=1, le=10_000, description="Quantidade máxima de candidatos na página."),
+    cursor: Optional[str] = Query(None, description="`proximo_cursor` da página anterior (substitui o offset)."),
+    fields: Optional[str] = Query(None, description="Campos a retornar, separados por vírgula (padrão: todos)."),
+    ordem: OrdemCandidatos = Query(OrdemCandidatos.ID, description="Ordem da listagem: id (ordem de carga) ou nota (decrescente)."),
+    campus: Optional[str] = Query(None),
+    curso: Optional[str] = Query(None),
+    turno: Optional[str] = Query(None),
+    chamada: Optional[int] = Query(None),
+    status: Optional[StatusCandidato] = Query(None),
+    cota: Optional[TipoCota] = Query(None, description="Cota do candidato."),
+    vaga_selecionada: Optional[TipoCota] = Query(None),
+    chamada_service: ChamadaService = Depends(get_chamada_service)
+):
+    try:
+        return RespostaJSON(chamada_service.listar_candidatos_paginado(
+            offset, limit, _campos(fields) or list(Candidato.model_fields), _curso_key(campus, curso, turno),
+            cursor=cursor, chamada=chamada, status=status, cota=cota, vaga_selecionada=vaga_selecionada, ordem=ordem
+        ))
+    except ValidationException as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    except Exception as e:
+        logging.exception("Erro interno não esperado em listar_candidatos")
+        raise HTTPException(status_code=500, detail=f"Erro interno: {str(e)}")
+
 @router.post("/filtro", summary="Aplicar filtro de Campus/Curso/Turno nos candidatos")
-async def aplicar_filtro(
+def aplicar_filtro(
     filtro: FiltroPayload,
     chamada_service: ChamadaService = Depends(get_chamada_service)
 ):
@@ -90,13 +178,16 @@ async def aplicar_filtro(
         raise HTTPException(status_code=500, detail=f"Erro interno ao aplicar filtro: {str(e)}")
 
 @router.post("/definir-vagas", summary="Definir quantidade de vagas por cota")
-async def definir_vagas(
+def definir_vagas(
     vagas: Vagas,
+    campus: Optional[str] = Query(None, description="Curso da operação (padrão: o do filtro aplicado). Clientes concorrentes devem informá-lo."),
+    curso: Optional[str] = Query(None),
+    turno: Optional[str] = Query(None),
     chamada_service: ChamadaService = Depends(get_chamada_service)
 ):
     try:
-        chamada_service.definir_vagas(vagas)
-        chamada_service.repo.chamada_num = 1
+        chamada_service.definir_vagas(vagas, _curso_key(campus, curso, turno))
+        chamada_service.repo.set_chamada_num(1)
         return {"status": "success", "message": "Distribuição de vagas definida com sucesso.", "total_vagas": sum(vagas.dict().values())}
     except Exception as e:
         logging.exception("Erro ao definir vagas")
@@ -109,12 +200,22 @@ class GerarChamadaPayload(BaseModel):
     fator_multiplicacao: Optional[int] = 1
 
 @router.post("/gerar-chamada", response_model=ChamadaResult, summary="Gerar nova chamada")
-async def gerar_chamada(
+def gerar_chamada(
     payload: GerarChamadaPayload = Body(GerarChamadaPayload(fator_multiplicacao=1)),
-    chamada_service: ChamadaService = Depends(get_chamada_service)
+    assincrono: bool = Query(False, description="Agenda a geração como job e responde 202 com o id do job."),
+    incluir_candidatos: bool = Query(True, description="Inclui a lista de chamados; sem ela, as páginas vêm de GET /chamadas/candidatos."),
+    campus: Optional[str] = Query(None, description="Curso da operação (padrão: o do filtro aplicado). Clientes concorrentes devem informá-lo."),
+    curso: Optional[str] = Query(None),
+    turno: Optional[str] = Query(None),
+    chamada_service: ChamadaService = Depends(get_chamada_service),
+    workspace: Workspace = Depends(get_workspace),
+    job_manager: JobManager = Depends(get_job_manager)
 ):
     try:
-        return chamada_service.gerar_chamada(payload.fator_multiplicacao)
+        curso_key = _curso_key(campus, curso, turno)
+        if assincrono:
+            return _resposta_job(job_manager.submeter("gerar-chamada", workspace, lambda job: chamada_service.gerar_chamada(payload.fator_multiplicacao, incluir_candidatos, curso_key)))
+        return RespostaJSON(chamada_service.gerar_chamada(payload.fator_multiplicacao, incluir_candidatos, curso_key))
     except ValidationException as e:
         logging.exception(f"Erro de validação ao gerar chamada (fator: {payload.fator_multiplicacao}): {e.detail}")
         raise HTTPException(status_code=e.status_code, detail=e.detail)
@@ -128,13 +229,88 @@ async def gerar_chamada(
         raise HTTPException(status_code=status_code, detail=detail_msg)
 
 
+class SimularChamadaPayload(BaseModel):
+    fatores: List[int] = [1]
+    vagas: Optional[List[Vagas]] = None  # saldos alternativos; padrão: as vagas atuais do curso
+
+@router.post("/simular-chamada", response_model=SimulacaoResult, summary="Simular a chamada do curso para vários fatores e vagas, sem alterar o estado")
+def simular_chamada(
+    payload: SimularChamadaPayload = Body(SimularChamadaPayload()),
+    chamada_service: ChamadaService = Depends(get_chamada_service)
+):
+    try:
+        return chamada_service.simular_chamada(payload.fatores, payload.vagas)
+    except ValidationException as e:
+        logging.exception(f"Erro de validação ao simular chamada (fatores: {payload.fatores}): {e.detail}")
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    except NotFoundException as e:
+        logging.exception(f"Recurso não encontrado ao simular chamada (fatores: {payload.fatores}): {e.detail}")
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    except Exception as e:
+        logging.exception(f"Erro interno não esperado ao simular chamada (fatores: {payload.fatores})")
+        raise HTTPException(status_code=500, detail=f"Erro interno ao simular a chamada: {str(e)}")
+
+
+@router.post("/gerar-chamada-lote", response_model=ChamadaLoteResult, summary="Gerar a chamada para todos os cursos com vagas definidas")
+def gerar_chamada_lote(
+    payload: GerarChamadaPayload = Body(GerarChamadaPayload(fator_multiplicacao=1)),
+    assincrono: bool = Query(False, description="Agenda a geração como job e responde 202 com o id do job."),
+    chamada_service: ChamadaService = Depends(get_chamada_service),
+    workspace: Workspace = Depends(get_workspace),
+    job_manager: JobManager = Depends(get_job_manager)
+):
+    try:
+        if assincrono:
+            return _resposta_job(job_manager.submeter(
+                "gerar-chamada-lote", workspace,
+                lambda job: chamada_service.gerar_chamadas_em_lote(payload.fator_multiplicacao, relatar=job.relatar)
+            ))
+        return RespostaJSON(chamada_service.gerar_chamadas_em_lote(payload.fator_multiplicacao))
+    except (ValidationException, NotFoundException) as e:
+        logging.exception(f"Erro ao gerar chamada em lote (fator: {payload.fator_multiplicacao}): {e.detail}")
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    except Exception as e:
+        logging.exception(f"Erro interno não esperado ao gerar chamada em lote (fator: {payload.fator_multiplicacao})")
+        detail_msg = e.detail if hasattr(e, 'detail') else str(e)
+        status_code = e.status_code if hasattr(e, 'status_code') else 500
+        raise HTTPException(status_code=status_code, detail=detail_msg)
+
+
+@router.post("/gerar-chamada-global", response_model=ChamadaLoteResult, summary="Gerar a chamada de todos os cursos, fase 1 de todos antes da fase 2")
+def gerar_chamada_global(
+    payload: GerarChamadaPayload = Body(GerarChamadaPayload(fator_multiplicacao=1)),
+    assincrono: bool = Query(False, description="Agenda a geração como job e responde 202 com o id do job."),
+    chamada_service: ChamadaService = Depends(get_chamada_service),
+    workspace: Workspace = Depends(get_workspace),
+    job_manager: JobManager = Depends(get_job_manager)
+):
+    try:
+        if assincrono:
+            return _resposta_job(job_manager.submeter(
+                "gerar-chamada-global", workspace,
+                lambda job: chamada_service.gerar_chamadas_em_lote(payload.fator_multiplicacao, relatar=job.relatar, por_fase=True)
+            ))
+        return RespostaJSON(chamada_service.gerar_chamadas_em_lote(payload.fator_multiplicacao, por_fase=True))
+    except (ValidationException, NotFoundException) as e:
+        logging.exception(f"Erro ao gerar chamada global (fator: {payload.fator_multiplicacao}): {e.detail}")
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
+    except Exception as e:
+        logging.exception(f"Erro interno não esperado ao gerar chamada global (fator: {payload.fator_multiplicacao})")
+        detail_msg = e.detail if hasattr(e, 'detail') else str(e)
+        status_code = e.status_code if hasattr(e, 'status_code') else 500
+        raise HTTPException(status_code=status_code, detail=detail_msg)
+
+
 @router.post("/marcar-nao-homologados", summary="Marcar candidatos não homologados e preparar para próxima chamada")
-async def marcar_nao_homologados(
+def marcar_nao_homologados(
     cpfs: List[str] = Body(...),
+    campus: Optional[str] = Query(None, description="Curso da operação (padrão: o do filtro aplicado). Clientes concorrentes devem informá-lo."),
+    curso: Optional[str] = Query(None),
+    turno: Optional[str] = Query(None),
     chamada_service: ChamadaService = Depends(get_chamada_service)
 ):
     try:
-        vagas_disponiveis_formatado = chamada_service.marcar_nao_homologados(cpfs)
+        vagas_disponiveis_formatado = chamada_service.marcar_nao_homologados(cpfs, _curso_key(campus, curso, turno))
         proxima_chamada_num = chamada_service.repo.get_chamada_num()
 
         print(f"Vagas disponíveis após marcar não homologados: {vagas_disponiveis_formatado}")
@@ -155,14 +331,27 @@ async def marcar_nao_homologados(
         raise HTTPException(status_code=status_code, detail=detail_msg)
 
 
-@router.get("/listar/{chamada_num}", response_model=List[Candidato], summary="Listar candidatos de uma chamada")
-async def listar_chamada(
+@router.get("/listar/{chamada_num}", response_model=List[Dict[str, Any]], summary="Listar candidatos de uma chamada")
+def listar_chamada(
     chamada_num: int,
+    ndjson: bool = Query(False, description="Transmite a lista em NDJSON (um candidato por linha), em blocos."),
+    fields: Optional[str] = Query(None, description="Campos a retornar, separados por vírgula (padrão: todos os de Candidato)."),
+    campus: Optional[str] = Query(None),
+    curso: Optional[str] = Query(None),
+    turno: Optional[str] = Query(None),
+    cota: Optional[TipoCota] = Query(None, description="Cota do candidato."),
+    vaga_selecionada: Optional[TipoCota] = Query(None),
     chamada_service: ChamadaService = Depends(get_chamada_service)
 ):
     try:
-        candidatos = chamada_service.listar_candidatos_chamada(chamada_num)
-        return candidatos
+        campos = _campos(fields)
+        filtros = dict(curso_key=_curso_key(campus, curso, turno), cota=cota, vaga_selecionada=vaga_selecionada)
+        if ndjson:
+            blocos = chamada_service.listar_candidatos_chamada_em_blocos(chamada_num, campos, **filtros)
+            return StreamingResponse(linhas_ndjson(blocos), media_type=MEDIA_TYPE_NDJSON)
+        return RespostaJSON(chamada_service.listar_candidatos_chamada(chamada_num, campos, **filtros))
+    except ValidationException as e:
+        raise HTTPException(status_code=e.status_code, detail=e.detail)
     except NotFoundException as e:
         logging.exception(f"Chamada {chamada_num} não encontrada ao listar: {e.detail}")
         raise HTTPException(status_code=e.status_code, detail=e.detail)
@@ -173,46 +362,21 @@ async def listar_chamada(
         raise HTTPException(status_code=status_code, detail=detail_msg)
 
 
-@router.get("/exportar/{chamada_num}", summary="Exportar chamada para CSV")
-async def exportar_chamada(
+@router.get("/exportar/{chamada_num}", summary="Exportar chamada (CSV, Parquet ou Arrow IPC)")
+def exportar_chamada(
     chamada_num: int,
-    chamada_service: ChamadaService = Depends(get_chamada_service)
+    formato: FormatoArquivo = Query(FormatoArquivo.CSV, description="Formato do arquivo exportado (csv, parquet ou arrow)."),
+    chamada_service: ChamadaService = Depends(get_chamada_service),
+    export_service: ExportService = Depends(get_export_service)
 ):
     try:
-        candidatos = chamada_service.listar_candidatos_chamada(chamada_num)
-        if not candidatos:
+        ids = chamada_service.ids_candidatos_chamada(chamada_num)
+        if not len(ids):
             logging.warning(f"Tentativa de exportar chamada {chamada_num} sem candidatos ou chamada inexistente.")
             raise NotFoundException(detail=f"Nenhum candidato encontrado para a chamada {chamada_num} para exportação.")
-            
-        colunas_ordenadas = [
-            "id", "campus", "curso", "turno", "nome", "nota_final",
-            "cota", "vaga_selecionada", "status", "opcao", "chamada",
-            "class_AC", "class_LI_EP", "class_LI_PCD", "class_LI_Q", "class_LI_PPI",
-            "class_LB_EP", "class_LB_PCD", "class_LB_Q", "class_LB_PPI"
-        ]
-        
-        candidatos_dict_list = [c.dict(exclude_none=True) for c in candidatos]
-        df = pd.DataFrame(candidatos_dict_list)
-        df = df.reindex(columns=colunas_ordenadas)
-
-        df['chamada'] = df['chamada'].apply(lambda x: f"{int(x)}ª chamada" if pd.notna(x) else "")
-        df['opcao'] = df['opcao'].apply(lambda x: f"{int(x)}ª opção" if pd.notna(x) else "")
-        for col in [c for c in colunas_ordenadas if c.startswith('class_')]:
-            if col in df:
-                df[col] = df[col].apply(lambda x: format_ordinal(x, 'm'))
-
-        stream = io.StringIO()
-        df.to_csv(stream, index=False, sep=';', decimal=',')
-        
-        response = StreamingResponse(
-            iter([stream.getvalue()]),
-            media_type="text/csv",
-            headers={
-                "Content-Disposition": f"attachment; filename=chamada_{chamada_num}.csv"
-            }
-        )
-        return response
-    except NotFoundException as e:
+
+        return _resposta_exportacao(export_service, chamada_service, ids, f"chamada_{chamada_num}", formato)
+    except (NotFoundException, UnsupportedFormatException) as e:
         logging.warning(f"Exportação falhou para chamada {chamada_num}: {e.detail}")
         raise HTTPException(status_code=e.status_code, detail=e.detail)
     except Exception as e:
@@ -220,11 +384,14 @@ async def exportar_chamada(
         raise HTTPException(status_code=500, detail="Erro interno ao gerar o relatório.")
 
 @router.get("/vagas-disponiveis", summary="Obter vagas disponíveis por cota para a próxima chamada")
-async def vagas_disponiveis_endpoint(
+def vagas_disponiveis_endpoint(
+    campus: Optional[str] = Query(None, description="Curso da operação (padrão: o do filtro aplicado). Clientes concorrentes devem informá-lo."),
+    curso: Optional[str] = Query(None),
+    turno: Optional[str] = Query(None),
     chamada_service: ChamadaService = Depends(get_chamada_service)
 ):
     try:
-        return chamada_service.get_vagas_disponiveis()
+        return chamada_service.get_vagas_disponiveis(_curso_key(campus, curso, turno))
     except ValidationException as e:
         logging.exception(f"Erro de validação ao obter vagas disponíveis: {e.detail}")
         raise HTTPException(status_code=e.status_code, detail=e.detail)
@@ -235,45 +402,20 @@ async def vagas_disponiveis_endpoint(
         raise HTTPException(status_code=status_code, detail=detail_msg)
 
 @router.get("/relatorio-completo/{chamada_num}", summary="Exportar relatório completo da chamada (com não homologados)")
-async def exportar_relatorio_completo(
+def exportar_relatorio_completo(
     chamada_num: int,
-    chamada_service: ChamadaService = Depends(get_chamada_service)
+    formato: FormatoArquivo = Query(FormatoArquivo.CSV, description="Formato do arquivo exportado (csv, parquet ou arrow)."),
+    chamada_service: ChamadaService = Depends(get_chamada_service),
+    export_service: ExportService = Depends(get_export_service)
 ):
     try:
-        candidatos = chamada_service.gerar_relatorio_chamada_completo(chamada_num)
-        if not candidatos:
+        ids = chamada_service.ids_relatorio_chamada_completo(chamada_num)
+        if not len(ids):
             logging.warning(f"Tentativa de exportar relatório da chamada {chamada_num} sem candidatos.")
             raise NotFoundException(detail=f"Nenhum candidato encontrado para o relatório da chamada {chamada_num}.")
-            
-        colunas_ordenadas = [
-            "id", "campus", "curso", "turno", "nome", "nota_final",
-            "cota", "vaga_selecionada", "status", "opcao", "chamada",
-            "class_AC", "class_LI_EP", "class_LI_PCD", "class_LI_Q", "class_LI_PPI",
-            "class_LB_EP", "class_LB_PCD", "class_LB_Q", "class_LB_PPI"
-        ]
-        
-        candidatos_dict_list = [c.dict(exclude_none=True) for c in candidatos]
-        df = pd.DataFrame(candidatos_dict_list)
-        df = df.reindex(columns=colunas_ordenadas)
-
-        df['chamada'] = df['chamada'].apply(lambda x: f"{int(x)}ª chamada" if pd.notna(x) else "")
-        df['opcao'] = df['opcao'].apply(lambda x: f"{int(x)}ª opção" if pd.notna(x) else "")
-        for col in [c for c in colunas_ordenadas if c.startswith('class_')]:
-            if col in df:
-                df[col] = df[col].apply(lambda x: format_ordinal(x, 'm'))
-
-        stream = io.StringIO()
-        df.to_csv(stream, index=False, sep=';', decimal=',')
-        
-        response = StreamingResponse(
-            iter([stream.getvalue()]),
-            media_type="text/csv",
-            headers={
-                "Content-Disposition": f"attachment; filename=relatorio_final_chamada_{chamada_num}.csv"
-            }
-        )
-        return response
-    except NotFoundException as e:
+
+        return _resposta_exportacao(export_service, chamada_service, ids, f"relatorio_final_chamada_{chamada_num}", formato)
+    except (NotFoundException, UnsupportedFormatException) as e:
         logging.warning(f"Exportação do relatório falhou para chamada {chamada_num}: {e.detail}")
         raise HTTPException(status_code=e.status_code, detail=e.detail)
     except Exception as e:
@@ -282,46 +424,21 @@ async def exportar_relatorio_completo(
 
 
 @router.get("/relatorio-geral-curso", summary="Exportar relatório geral de todos os candidatos do curso filtrado")
-async def exportar_relatorio_geral_curso(
-    chamada_service: ChamadaService = Depends(get_chamada_service)
+def exportar_relatorio_geral_curso(
+    formato: FormatoArquivo = Query(FormatoArquivo.CSV, description="Formato do arquivo exportado (csv, parquet ou arrow)."),
+    chamada_service: ChamadaService = Depends(get_chamada_service),
+    export_service: ExportService = Depends(get_export_service)
 ):
     try:
-        candidatos = chamada_service.gerar_relatorio_geral_por_curso()
+        ids = chamada_service.ids_relatorio_geral_por_curso()
         
         context = chamada_service.repo.get_view_context()
         curso_nome = context.get('curso', 'curso').replace(' ', '_')
         turno_nome = context.get('turno', 'turno').replace(' ', '_')
-        filename = f"relatorio_geral_{curso_nome}_{turno_nome}.csv"
-
-        colunas_ordenadas = [
-            "id", "campus", "curso", "turno", "nome", "nota_final",
-            "cota", "vaga_selecionada", "status", "opcao", "chamada",
-            "class_AC", "class_LI_EP", "class_LI_PCD", "class_LI_Q", "class_LI_PPI",
-            "class_LB_EP", "class_LB_PCD", "class_LB_Q", "class_LB_PPI"
-        ]
-        
-        candidatos_dict_list = [c.dict(exclude_none=True) for c in candidatos]
-        df = pd.DataFrame(candidatos_dict_list)
-        df = df.reindex(columns=colunas_ordenadas)
-
-        df['chamada'] = df['chamada'].apply(lambda x: f"{int(x)}ª chamada" if pd.notna(x) else "")
-        df['opcao'] = df['opcao'].apply(lambda x: f"{int(x)}ª opção" if pd.notna(x) else "")
-        for col in [c for c in colunas_ordenadas if c.startswith('class_')]:
-            if col in df:
-                df[col] = df[col].apply(lambda x: format_ordinal(x, 'm'))
-        
-        stream = io.StringIO()
-        df.to_csv(stream, index=False, sep=';', decimal=',')
-        
-        response = StreamingResponse(
-            iter([stream.getvalue()]),
-            media_type="text/csv",
-            headers={
-                "Content-Disposition": f"attachment; filename={filename}"
-            }
-        )
-        return response
-    except (NotFoundException, ValidationException) as e:
+        filename = f"relatorio_geral_{curso_nome}_{turno_nome}"
+
+        return _resposta_exportacao(export_service, chamada_service, ids, filename, formato)
+    except (NotFoundException, ValidationException, UnsupportedFormatException) as e:
         logging.warning(f"Exportação do relatório geral falhou: {e.detail}")
         raise HTTPException(status_code=e.status_code, detail=e.detail)
     except Exception as e:
@@ -329,7 +446,7 @@ async def exportar_relatorio_geral_curso(
         raise HTTPException(status_code=500, detail="Erro interno ao gerar o relatório.")
 
 @router.post("/reset-sistema", summary="Resetar todo o sistema para o estado inicial")
-async def reset_sistema_endpoint(
+def reset_sistema_endpoint(
     chamada_service: ChamadaService = Depends(get_chamada_service)
 ):
     try:
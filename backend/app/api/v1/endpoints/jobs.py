@@ -0,0 +1,55 @@
+from fastapi import APIRouter, Depends, HTTPException
+from typing import List
+
+from api.dependencies import get_nome_workspace, get_job_manager
+from core.jobs import Job, JobManager
+from domain.entities import JobInfo
+from domain.enums import StatusJob
+
+# Rotas de consulta leves: não usam o lock do workspace, que fica com o job em execução
+router = APIRouter(prefix="/jobs", tags=["jobs"])
+
+def _obter_job(job_id: str, nome_workspace: str, job_manager: JobManager) -> Job:
+    job = job_manager.obter(job_id)
+    if job is None or job.workspace != nome_workspace:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' não encontrado.")
+    return job
+
+@router.get("", response_model=List[JobInfo], summary="Listar os jobs do workspace")
+async def listar_jobs(
+    nome_workspace: str = Depends(get_nome_workspace),
+    job_manager: JobManager = Depends(get_job_manager)
+):
+    return [job.info() for job in job_manager.listar(nome_workspace)]
+
+@router.get("/{job_id}", response_model=JobInfo, summary="Status e progresso de um job")
+async def obter_job(
+    job_id: str,
+    nome_workspace: str = Depends(get_nome_workspace),
+    job_manager: JobManager = Depends(get_job_manager)
+):
+    return _obter_job(job_id, nome_workspace, job_manager).info()
+
+@router.get("/{job_id}/resultado", summary="Resultado de um job concluído")
+async def obter_resultado_job(
+    job_id: str,
+    nome_workspace: str = Depends(get_nome_workspace),
+    job_manager: JobManager = Depends(get_job_manager)
+):
+    job = _obter_job(job_id, nome_workspace, job_manager)
+    if job.status == StatusJob.FALHOU:
+        raise HTTPException(status_code=job.codigo_erro or 500, detail=job.erro)
+    if job.status != StatusJob.CONCLUIDO:
+        raise HTTPException(status_code=409, detail=f"O job ainda não terminou (status: {job.status.value}).")
+    return job.resultado
+
+@router.delete("/{job_id}", summary="Descartar um job finalizado e o seu resultado")
+async def remover_job(
+    job_id: str,
+    nome_workspace: str = Depends(get_nome_workspace),
+    job_manager: JobManager = Depends(get_job_manager)
+):
+    job = _obter_job(job_id, nome_workspace, job_manager)
+    if not job_manager.remover(job.id):
+        raise HTTPException(status_code=409, detail="Apenas jobs finalizados podem ser descartados.")
+    return {"status": "success", "message": f"Job '{job_id}' descartado."}
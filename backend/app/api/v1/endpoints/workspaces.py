@@ -0,0 +1,42 @@
+from fastapi import APIRouter, HTTPException
+from typing import Any, Dict, List
+
+import logging
+
+from api.dependencies import workspaces
+from core.workspaces import WORKSPACE_PADRAO
+
+router = APIRouter(prefix="/workspaces", tags=["workspaces"])
+
+# Rotas síncronas: esperam pelo lock dos workspaces em uma thread, sem bloquear o event loop
+@router.get("", summary="Listar os workspaces abertos neste processo")
+def listar_workspaces() -> List[Dict[str, Any]]:
+    """
+    Resumo de cada workspace. Jobs e exportações transmitidas seguram o lock do
+    workspace até terminar; em vez de esperar por eles, o workspace ocupado é
+    listado só com o nome e `ocupado: true`.
+    """
+    resumos = []
+    for workspace in workspaces.listar():
+        if not workspace.lock.acquire(blocking=False):
+            resumos.append({"nome": workspace.nome, "ocupado": True})
+            continue
+        try:
+            resumos.append({**workspace.resumo(), "ocupado": False})
+        finally:
+            workspace.lock.release()
+    return resumos
+
+@router.delete("/{nome}", summary="Descartar um workspace e o seu estado persistido")
+def remover_workspace(nome: str):
+    if nome == WORKSPACE_PADRAO:
+        raise HTTPException(status_code=422, detail="O workspace padrão não pode ser removido; use /chamadas/reset-sistema.")
+    try:
+        if not workspaces.remover(nome):
+            raise HTTPException(status_code=404, detail=f"Workspace '{nome}' não encontrado.")
+        return {"status": "success", "message": f"Workspace '{nome}' removido."}
+    except HTTPException:
+        raise
+    except Exception:
+        logging.exception(f"Erro ao remover o workspace '{nome}'")
+        raise HTTPException(status_code=500, detail="Erro interno ao remover o workspace.")
@@ -0,0 +1,61 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class LRUCache:
+    """
+    Memória de resultados com descarte do item usado há mais tempo.
+
+    As chaves devem incluir tudo de que o resultado depende — em geral
+    (tipo do resultado, curso, versão de estado do curso, fator de
+    multiplicação) —, de modo que uma entrada nunca precisa ser invalidada:
+    quando o curso muda, a versão muda e a entrada antiga apenas deixa de ser
+    consultada até ser descartada. Os valores guardados são compartilhados e
+    não devem ser alterados por quem os recebe.
+    """
+
+    def __init__(self, max_itens: int):
+        self.max_itens = max_itens
+        self._itens: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = Lock()
+        self.acertos = 0
+        self.falhas = 0
+
+    def obter(self, chave: Hashable) -> Optional[Any]:
+        with self._lock:
+            if chave not in self._itens:
+                self.falhas += 1
+                return None
+            self._itens.move_to_end(chave)
+            self.acertos += 1
+            return self._itens[chave]
+
+    def guardar(self, chave: Hashable, valor: Any) -> None:
+        if self.max_itens <= 0:
+            return
+        with self._lock:
+            self._itens[chave] = valor
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.max_itens:
+                self._itens.popitem(last=False)
+
+    def retirar(self, chave: Hashable) -> Optional[Any]:
+        """Remove e retorna a entrada: o valor passa a pertencer a quem o retirou e pode ser alterado."""
+        with self._lock:
+            return self._itens.pop(chave, None)
+
+    def obter_ou_calcular(self, chave: Hashable, calcular: Callable[[], Any]) -> Any:
+        valor = self.obter(chave)
+        if valor is None:
+            valor = calcular()
+            self.guardar(chave, valor)
+        return valor
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._itens.clear()
+
+    def estatisticas(self) -> Dict[str, int]:
+        with self._lock:
+            return {"itens": len(self._itens), "acertos": self.acertos, "falhas": self.falhas}
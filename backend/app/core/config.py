@@ -4,6 +4,31 @@ class Settings(BaseSettings):
     app_name: str = "Sistema de Chamadas Universitárias"
     debug: bool = False
     max_file_size: int = 10 * 1024 * 1024 * 1024  # 10 GB
+    upload_chunk_rows: int = 100_000  # linhas do CSV processadas por bloco no upload
+    export_chunk_rows: int = 10_000  # linhas por pedaço enviado nas exportações CSV
+    # Repositório: "memoria" ou "sqlite" (banco em sqlite_caminho, compartilhável entre processos:
+    # cada operação é uma transação, mas o filtro de curso é um só para todos, então clientes
+    # concorrentes informam campus/curso/turno; workspaces além do padrão usam "<nome>-<workspace>.db")
+    repositorio: str = "memoria"
+    sqlite_caminho: str = "sistema_vagas.db"
+    max_workspaces: int = 32  # workspaces isolados por processo (cabeçalho X-Workspace)
+    # Persistência do repositório em memória (snapshot + diário, um subdiretório por workspace); vazio desativa
+    persistencia_diretorio: str = ""
+    persistencia_fsync: bool = False  # fsync a cada operação registrada no diário
+    # Jobs (operações longas fora do event loop): threads de execução e jobs finalizados retidos
+    jobs_max_workers: int = 2
+    jobs_max_retidos: int = 100
+    cache_max_itens: int = 512  # resultados memorizados por (curso, versão, fator); 0 desativa
+    # Chamadas seguintes de um curso retomam o motor de alocação memorizado (exige o cache)
+    chamada_incremental: bool = True
+    simulacao_max_cenarios: int = 50  # combinações de fator e vagas por simulação
+    # Métricas em /metrics (formato Prometheus) e log JSON com as fases de cada requisição
+    metricas_habilitadas: bool = True
+    metricas_log_requisicoes: bool = False
+    # Chamada em lote: número de processos (0 = número de CPUs) e tamanho mínimo
+    # (em candidatos) para valer a pena distribuir os cursos entre processos
+    chamada_lote_max_workers: int = 0
+    chamada_lote_min_candidatos_paralelo: int = 200_000
     
     class Config:
         env_file = ".env"
@@ -23,4 +23,11 @@ class ValidationException(CustomHTTPException):
         super().__init__(
             status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
             detail=detail
+        )
+
+class UnsupportedFormatException(CustomHTTPException):
+    def __init__(self, detail: str = "Formato de arquivo não suportado"):
+        super().__init__(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=detail
         )
\ No newline at end of file
@@ -0,0 +1,111 @@
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional
+import logging
+import uuid
+from fastapi import HTTPException
+from domain.entities import JobInfo
+from domain.enums import StatusJob
+from core.workspaces import Workspace
+
+
+@dataclass
+class Job:
+    """Operação longa executada fora da requisição; o resultado fica guardado até ser descartado."""
+    id: str
+    tipo: str
+    workspace: str
+    status: StatusJob = StatusJob.PENDENTE
+    progresso: Optional[float] = None
+    mensagem: Optional[str] = None
+    resultado: Any = None
+    erro: Optional[str] = None
+    codigo_erro: Optional[int] = None
+    criado_em: datetime = field(default_factory=datetime.now)
+    iniciado_em: Optional[datetime] = None
+    concluido_em: Optional[datetime] = None
+
+    def relatar(self, progresso: Optional[float] = None, mensagem: Optional[str] = None) -> None:
+        """Atualiza o andamento informado em GET /jobs/{id}."""
+        if progresso is not None:
+            self.progresso = min(max(progresso, 0.0), 1.0)
+        if mensagem is not None:
+            self.mensagem = mensagem
+
+    @property
+    def finalizado(self) -> bool:
+        return self.status in (StatusJob.CONCLUIDO, StatusJob.FALHOU)
+
+    def info(self) -> JobInfo:
+        return JobInfo(
+            id=self.id, tipo=self.tipo, workspace=self.workspace, status=self.status,
+            progresso=self.progresso, mensagem=self.mensagem, erro=self.erro,
+            criado_em=self.criado_em, iniciado_em=self.iniciado_em, concluido_em=self.concluido_em,
+        )
+
+
+class JobManager:
+    """
+    Executa operações longas (carga de arquivo, geração de chamadas) em um
+    pool de threads, fora do event loop. Cada job segura o lock do seu
+    workspace enquanto executa, como uma requisição comum; os jobs finalizados
+    mais antigos são descartados além de `max_retidos`.
+    """
+
+    def __init__(self, max_workers: int, max_retidos: int):
+        self.max_retidos = max_retidos
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._jobs: Dict[str, Job] = {}
+        self._lock = Lock()
+
+    def submeter(self, tipo: str, workspace: Workspace, funcao: Callable[[Job], Any]) -> Job:
+        """Agenda `funcao(job)` e retorna o job imediatamente."""
+        job = Job(id=uuid.uuid4().hex, tipo=tipo, workspace=workspace.nome)
+        with self._lock:
+            self._jobs[job.id] = job
+            self._descartar_finalizados()
+        self._executor.submit(self._executar, job, workspace, funcao)
+        return job
+
+    @staticmethod
+    def _executar(job: Job, workspace: Workspace, funcao: Callable[[Job], Any]) -> None:
+        with workspace.lock:
+            job.status, job.iniciado_em = StatusJob.EXECUTANDO, datetime.now()
+            try:
+                job.resultado = funcao(job)
+                job.progresso = 1.0
+                job.status = StatusJob.CONCLUIDO
+            except HTTPException as e:
+                logging.warning(f"Job {job.tipo} {job.id} falhou: {e.detail}")
+                job.erro, job.codigo_erro, job.status = str(e.detail), e.status_code, StatusJob.FALHOU
+            except Exception as e:
+                logging.exception(f"Erro interno não esperado no job {job.tipo} {job.id}")
+                job.erro, job.codigo_erro, job.status = str(e), 500, StatusJob.FALHOU
+            finally:
+                job.concluido_em = datetime.now()
+
+    def _descartar_finalizados(self) -> None:
+        finalizados = [job for job in self._jobs.values() if job.finalizado]
+        for job in sorted(finalizados, key=lambda j: j.concluido_em)[:max(0, len(finalizados) - self.max_retidos)]:
+            del self._jobs[job.id]
+
+    def obter(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def listar(self, workspace: Optional[str] = None) -> List[Job]:
+        with self._lock:
+            return [job for job in self._jobs.values() if workspace is None or job.workspace == workspace]
+
+    def remover(self, job_id: str) -> bool:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or not job.finalizado:
+                return False
+            del self._jobs[job_id]
+            return True
+
+    def encerrar(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,181 @@
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from threading import Lock
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+import json
+import logging
+import time
+from core.config import settings
+
+PREFIXO = "sistema_vagas_"
+LIMITES_SEGUNDOS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+DESCRICOES = {
+    "fase_duracao_segundos": "Duração das fases do processamento (carga, classificação, alocação, gravação...)",
+    "requisicao_duracao_segundos": "Duração das requisições HTTP, até o envio do último byte da resposta",
+    "linhas_processadas_total": "Linhas de arquivo lidas e convertidas",
+    "linhas_rejeitadas_total": "Linhas de arquivo descartadas por erro de validação",
+    "repositorio_operacoes_total": "Operações de escrita em lote no repositório",
+    "repositorio_linhas_escritas_total": "Candidatos inseridos ou atualizados no repositório",
+    "chamadas_geradas_total": "Chamadas geradas por curso (modo incremental ou completo)",
+    "candidatos_selecionados_total": "Candidatos selecionados pelas chamadas",
+    "workspace_candidatos": "Candidatos carregados em cada workspace",
+    "workspace_cache_acertos": "Acertos acumulados do cache de resultados de cada workspace",
+    "workspace_cache_falhas": "Falhas acumuladas do cache de resultados de cada workspace",
+}
+
+Rotulos = Tuple[Tuple[str, str], ...]
+
+# Fases medidas durante a requisição atual (para o log estruturado por requisição)
+_fases_da_requisicao: ContextVar[Optional[List[Tuple[str, float]]]] = ContextVar("fases_da_requisicao", default=None)
+
+_logger_requisicoes = logging.getLogger("sistema_vagas.requisicoes")
+
+
+class _Histograma:
+    def __init__(self):
+        self.contagens = [0] * (len(LIMITES_SEGUNDOS) + 1)
+        self.soma = 0.0
+
+    def observar(self, valor: float) -> None:
+        self.contagens[bisect_left(LIMITES_SEGUNDOS, valor)] += 1
+        self.soma += valor
+
+
+class Metricas:
+    """
+    Registro de métricas do processo (contadores, medidores e histogramas de
+    duração), exportado no formato de texto do Prometheus. Os nomes recebem o
+    prefixo `sistema_vagas_`; os rótulos são passados como argumentos nomeados.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._contadores: Dict[str, Dict[Rotulos, float]] = {}
+        self._medidores: Dict[str, Dict[Rotulos, float]] = {}
+        self._histogramas: Dict[str, Dict[Rotulos, _Histograma]] = {}
+
+    @staticmethod
+    def _rotulos(rotulos: Dict[str, Any]) -> Rotulos:
+        return tuple(sorted((chave, str(valor)) for chave, valor in rotulos.items()))
+
+    def incrementar(self, nome: str, valor: float = 1, **rotulos: Any) -> None:
+        if not settings.metricas_habilitadas: return
+        chave = self._rotulos(rotulos)
+        with self._lock:
+            serie = self._contadores.setdefault(nome, {})
+            serie[chave] = serie.get(chave, 0) + valor
+
+    def definir(self, nome: str, valor: float, **rotulos: Any) -> None:
+        """Atualiza um medidor (valor instantâneo, ex.: candidatos carregados)."""
+        if not settings.metricas_habilitadas: return
+        with self._lock:
+            self._medidores.setdefault(nome, {})[self._rotulos(rotulos)] = valor
+
+    def observar(self, nome: str, segundos: float, **rotulos: Any) -> None:
+        if not settings.metricas_habilitadas: return
+        chave = self._rotulos(rotulos)
+        with self._lock:
+            self._histogramas.setdefault(nome, {}).setdefault(chave, _Histograma()).observar(segundos)
+
+    def observar_fase(self, fase: str, segundos: float) -> None:
+        self.observar("fase_duracao_segundos", segundos, fase=fase)
+        fases = _fases_da_requisicao.get()
+        if fases is not None:
+            fases.append((fase, segundos))
+
+    @contextmanager
+    def medir(self, fase: str) -> Iterator[None]:
+        """Mede o bloco como uma fase (`sistema_vagas_fase_duracao_segundos{fase=...}`)."""
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observar_fase(fase, time.perf_counter() - inicio)
+
+    def limpar(self) -> None:
+        with self._lock:
+            self._contadores.clear()
+            self._medidores.clear()
+            self._histogramas.clear()
+
+    @staticmethod
+    def _formatar_rotulos(rotulos: Rotulos, extra: Tuple[str, str] = None) -> str:
+        pares = list(rotulos) + ([extra] if extra else [])
+        if not pares: return ""
+        escapar = lambda v: v.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+        return "{" + ",".join(f'{chave}="{escapar(valor)}"' for chave, valor in pares) + "}"
+
+    def exportar_prometheus(self) -> str:
+        """Texto no formato de exposição do Prometheus (versão 0.0.4)."""
+        linhas: List[str] = []
+
+        def cabecalho(nome: str, tipo: str) -> None:
+            if nome in DESCRICOES:
+                linhas.append(f"# HELP {PREFIXO}{nome} {DESCRICOES[nome]}")
+            linhas.append(f"# TYPE {PREFIXO}{nome} {tipo}")
+
+        with self._lock:
+            for tipo, series in (("counter", self._contadores), ("gauge", self._medidores)):
+                for nome, valores in sorted(series.items()):
+                    cabecalho(nome, tipo)
+                    for rotulos, valor in sorted(valores.items()):
+                        linhas.append(f"{PREFIXO}{nome}{self._formatar_rotulos(rotulos)} {valor:g}")
+            for nome, valores in sorted(self._histogramas.items()):
+                cabecalho(nome, "histogram")
+                for rotulos, histograma in sorted(valores.items()):
+                    acumulado = 0
+                    for limite, contagem in zip(LIMITES_SEGUNDOS + ("+Inf",), histograma.contagens):
+                        acumulado += contagem
+                        linhas.append(f"{PREFIXO}{nome}_bucket{self._formatar_rotulos(rotulos, ('le', str(limite)))} {acumulado}")
+                    linhas.append(f"{PREFIXO}{nome}_sum{self._formatar_rotulos(rotulos)} {histograma.soma:.6f}")
+                    linhas.append(f"{PREFIXO}{nome}_count{self._formatar_rotulos(rotulos)} {acumulado}")
+        return "\n".join(linhas) + "\n"
+
+
+metricas = Metricas()
+
+
+async def medir_requisicoes(request, call_next: Callable):
+    """
+    Middleware HTTP: mede cada requisição até o último byte da resposta (inclusive
+    as exportações em streaming) por método, rota e status e, com
+    `metricas_log_requisicoes`, registra um log JSON com as fases medidas nela.
+    """
+    if not settings.metricas_habilitadas:
+        return await call_next(request)
+
+    inicio = time.perf_counter()
+    fases: List[Tuple[str, float]] = []
+    token = _fases_da_requisicao.set(fases)
+    try:
+        resposta = await call_next(request)
+    finally:
+        _fases_da_requisicao.reset(token)
+
+    def registrar() -> None:
+        duracao = time.perf_counter() - inicio
+        rota = getattr(request.scope.get("route"), "path", "<sem rota>")
+        metricas.observar("requisicao_duracao_segundos", duracao, metodo=request.method, rota=rota, status=resposta.status_code)
+        if settings.metricas_log_requisicoes:
+            por_fase: Dict[str, float] = {}
+            for fase, segundos in fases:
+                por_fase[fase] = por_fase.get(fase, 0.0) + segundos * 1000
+            _logger_requisicoes.info(json.dumps({
+                "metodo": request.method, "rota": rota, "caminho": request.url.path, "status": resposta.status_code,
+                "workspace": request.headers.get("x-workspace") or request.query_params.get("workspace"),
+                "duracao_ms": round(duracao * 1000, 2), "fases_ms": {fase: round(ms, 2) for fase, ms in por_fase.items()},
+            }, ensure_ascii=False))
+
+    corpo = resposta.body_iterator
+
+    async def corpo_medido():
+        try:
+            async for parte in corpo:
+                yield parte
+        finally:
+            registrar()
+
+    resposta.body_iterator = corpo_medido()
+    return resposta
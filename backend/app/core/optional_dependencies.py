@@ -0,0 +1,27 @@
+from core.exceptions import UnsupportedFormatException
+
+
+def importar_pyarrow():
+    """
+    Importa o pyarrow sob demanda: ele só é necessário para arquivos Parquet e
+    Arrow IPC, e a aplicação continua funcionando com CSV sem ele.
+    """
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError:
+        raise UnsupportedFormatException("Suporte a Parquet/Arrow indisponível: o pacote 'pyarrow' não está instalado.")
+    return pyarrow
+
+
+def importar_orjson():
+    """
+    orjson, se instalado: serializa as listas grandes de candidatos mais rápido.
+    Sem ele, a serialização fica com o pydantic-core (retorna None).
+    """
+    try:
+        import orjson
+    except ImportError:
+        return None
+    return orjson
@@ -0,0 +1,45 @@
+from typing import Any, Dict, Iterable, Iterator, List
+import pydantic_core
+from pydantic import BaseModel
+from fastapi.responses import Response
+from core.optional_dependencies import importar_orjson
+
+MEDIA_TYPE_NDJSON = "application/x-ndjson"
+
+_orjson = importar_orjson()
+
+
+def _padrao_orjson(objeto: Any) -> Any:
+    if isinstance(objeto, BaseModel):
+        return objeto.model_dump(mode="json")
+    raise TypeError(f"Tipo não serializável em JSON: {type(objeto).__name__}")
+
+
+def para_json(conteudo: Any) -> bytes:
+    """
+    Serializa o conteúdo direto em bytes JSON, sem revalidá-lo: modelos pydantic
+    pelo serializador do pydantic-core e dados simples (como os dicionários de
+    `projetar`) pelo orjson, se instalado.
+    """
+    if _orjson is None or isinstance(conteudo, BaseModel):
+        return pydantic_core.to_json(conteudo)
+    return _orjson.dumps(conteudo, default=_padrao_orjson, option=_orjson.OPT_NON_STR_KEYS | _orjson.OPT_SERIALIZE_NUMPY)
+
+
+def linhas_ndjson(blocos: Iterable[List[Dict[str, Any]]]) -> Iterator[bytes]:
+    """NDJSON (um registro JSON por linha), um pedaço por bloco de registros."""
+    for registros in blocos:
+        if registros:
+            yield b"\n".join(map(para_json, registros)) + b"\n"
+
+
+class RespostaJSON(Response):
+    """
+    Resposta JSON serializada com `para_json`. Retornada diretamente pelas
+    rotas, dispensa a revalidação e a conversão genérica do `response_model`,
+    que continua documentando o formato.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return para_json(content)
@@ -0,0 +1,127 @@
+from dataclasses import dataclass, field
+from threading import Lock
+from typing import Any, Dict, List, Optional, Union
+import logging
+import os
+import re
+import shutil
+import time
+from core.cache import LRUCache
+from core.config import settings
+from core.exceptions import ValidationException
+from repositories.in_memory_repository import InMemoryRepository
+from repositories.persistence import RepositoryPersistence
+from repositories.sqlite_repository import SqliteRepository
+
+Repositorio = Union[InMemoryRepository, SqliteRepository]
+
+WORKSPACE_PADRAO = "default"
+_NOME_VALIDO = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+@dataclass
+class Workspace:
+    """
+    Espaço de trabalho isolado: repositório (candidatos, vagas, contexto e
+    número da chamada), resultados memorizados e persistência próprios.
+    O lock serializa as operações do workspace; workspaces diferentes são
+    processados em paralelo.
+    """
+    nome: str
+    repositorio: Repositorio
+    cache: LRUCache
+    persistencia: Optional[RepositoryPersistence] = None
+    lock: Lock = field(default_factory=Lock)
+
+    def resumo(self) -> Dict[str, Any]:
+        return {
+            "nome": self.nome,
+            "candidatos": self.repositorio.total_candidatos(),
+            "chamada_num": self.repositorio.get_chamada_num(),
+            "contexto": self.repositorio.get_view_context(),
+        }
+
+
+class WorkspaceRegistry:
+    """Cria (sob demanda), lista e remove os workspaces do processo."""
+
+    def __init__(self):
+        self._workspaces: Dict[str, Workspace] = {}
+        self._lock = Lock()
+
+    @staticmethod
+    def _caminho_sqlite(nome: str) -> str:
+        if nome == WORKSPACE_PADRAO:
+            return settings.sqlite_caminho
+        raiz, extensao = os.path.splitext(settings.sqlite_caminho)
+        return f"{raiz}-{nome}{extensao}"
+
+    @staticmethod
+    def _diretorio_persistencia(nome: str) -> str:
+        return os.path.join(settings.persistencia_diretorio, nome)
+
+    def _criar(self, nome: str) -> Workspace:
+        if settings.repositorio == "sqlite":
+            return Workspace(nome, SqliteRepository(self._caminho_sqlite(nome)), LRUCache(settings.cache_max_itens))
+        if settings.repositorio != "memoria":
+            raise ValueError(f"Repositório desconhecido: '{settings.repositorio}' (use 'memoria' ou 'sqlite').")
+
+        workspace = Workspace(nome, InMemoryRepository(), LRUCache(settings.cache_max_itens))
+        # O banco SQLite já é durável: snapshot e diário só se aplicam ao repositório em memória
+        if settings.persistencia_diretorio:
+            workspace.persistencia = RepositoryPersistence(self._diretorio_persistencia(nome), settings.persistencia_fsync)
+            inicio = time.perf_counter()
+            resumo = workspace.persistencia.restaurar(workspace.repositorio)
+            logging.info(f"Workspace '{nome}' restaurado em {(time.perf_counter() - inicio) * 1000:.0f} ms: {resumo}")
+        return workspace
+
+    def obter(self, nome: str = WORKSPACE_PADRAO) -> Workspace:
+        """Retorna o workspace, criando-o (e restaurando seu estado persistido) no primeiro acesso."""
+        if not _NOME_VALIDO.match(nome or ""):
+            raise ValidationException("Nome de workspace inválido: use de 1 a 64 letras, dígitos, '-' ou '_'.")
+        with self._lock:
+            workspace = self._workspaces.get(nome)
+            if workspace is None:
+                if len(self._workspaces) >= settings.max_workspaces:
+                    raise ValidationException(f"Limite de {settings.max_workspaces} workspaces atingido.")
+                workspace = self._workspaces[nome] = self._criar(nome)
+            return workspace
+
+    def listar(self) -> List[Workspace]:
+        with self._lock:
+            return list(self._workspaces.values())
+
+    def restaurar_persistidos(self) -> None:
+        """Abre, na inicialização, os workspaces que têm estado persistido em disco."""
+        if settings.repositorio == "memoria" and settings.persistencia_diretorio and os.path.isdir(settings.persistencia_diretorio):
+            for nome in sorted(os.listdir(settings.persistencia_diretorio)):
+                if _NOME_VALIDO.match(nome) and os.path.isdir(self._diretorio_persistencia(nome)):
+                    self.obter(nome)
+
+    @staticmethod
+    def _fechar(workspace: Workspace) -> None:
+        if workspace.persistencia is not None:
+            workspace.persistencia.fechar()
+        if isinstance(workspace.repositorio, SqliteRepository):
+            workspace.repositorio.fechar()
+
+    def remover(self, nome: str) -> bool:
+        """Descarta o workspace e apaga o seu estado persistido. Retorna False se ele não existir."""
+        with self._lock:
+            workspace = self._workspaces.pop(nome, None)
+        if workspace is None:
+            return False
+        with workspace.lock:
+            self._fechar(workspace)
+            if workspace.persistencia is not None:
+                shutil.rmtree(workspace.persistencia.diretorio, ignore_errors=True)
+            if isinstance(workspace.repositorio, SqliteRepository):
+                for sufixo in ("", "-wal", "-shm"):
+                    if os.path.exists(workspace.repositorio.caminho + sufixo):
+                        os.remove(workspace.repositorio.caminho + sufixo)
+        return True
+
+    def fechar(self) -> None:
+        for workspace in self.listar():
+            self._fechar(workspace)
+
@@ -1,6 +1,7 @@
-from typing import Dict, List, Optional
+from datetime import datetime
+from typing import Any, Dict, List, Optional
 from pydantic import BaseModel
-from .enums import TipoCota, StatusCandidato
+from .enums import TipoCota, StatusCandidato, StatusJob
 
 class CandidatoBase(BaseModel):
     cpf: str
@@ -58,12 +59,74 @@ class ChamadaResult(BaseModel):
     saldo_candidatos_chamada_atual: Optional[Dict[TipoCota, int]] = None
     saldo_candidatos_chamada_atual_ajustado: Optional[Dict[TipoCota, int]] = None
 
+class ChamadaCursoResumo(BaseModel):
+    campus: str
+    curso: str
+    turno: str
+    total_chamados: int
+    vagas_selecionadas: Dict[TipoCota, int]
+    saldo_remanescente_proxima_chamada: Dict[TipoCota, int]
+    tamanho_lista: Dict[TipoCota, int]
+    saldo_candidatos_chamada_atual: Optional[Dict[TipoCota, int]] = None
+    saldo_candidatos_chamada_atual_ajustado: Optional[Dict[TipoCota, int]] = None
+
+class ChamadaLoteResult(BaseModel):
+    chamada_num: int
+    cursos: List[ChamadaCursoResumo]
+    total_chamados: int
+    processos: int
+    tempos_ms: Dict[str, float]
+
+class CenarioSimulado(BaseModel):
+    fator_multiplicacao: int
+    vagas: Vagas  # saldo de vagas ofertado no cenário
+    total_chamados: int
+    vagas_selecionadas: Dict[TipoCota, int]
+    saldo_remanescente_proxima_chamada: Dict[TipoCota, int]
+    tamanho_lista: Dict[TipoCota, int]
+    saldo_candidatos_chamada_atual: Optional[Dict[TipoCota, int]] = None
+    saldo_candidatos_chamada_atual_ajustado: Optional[Dict[TipoCota, int]] = None
+
+class SimulacaoResult(BaseModel):
+    campus: str
+    curso: str
+    turno: str
+    chamada_num: int
+    cenarios: List[CenarioSimulado]
+
+class LinhaRejeitada(BaseModel):
+    linha: int
+    cpf: Optional[str] = None
+    erros: List[str]
+
+class ResumoCursoCarga(BaseModel):
+    campus: Optional[str] = None
+    curso: Optional[str] = None
+    turno: Optional[str] = None
+    total: int
+    por_cota: Dict[TipoCota, int]
+    nota_minima: Optional[float] = None
+    nota_maxima: Optional[float] = None
+
 class FileUploadResponse(BaseModel):
     filename: str
     size: int
     content_type: str
     records_processed: int
-    candidatos: List[Candidato]
+    por_cota: Dict[TipoCota, int]
+    nota_minima: Optional[float] = None
+    nota_maxima: Optional[float] = None
+    cursos: List[ResumoCursoCarga]
+    linhas_rejeitadas: int = 0
+    amostra_linhas_rejeitadas: List[LinhaRejeitada] = []
+
+class CandidatosPagina(BaseModel):
+    total: int
+    offset: int
+    limit: int
+    campos: List[str]
+    itens: List[Dict[str, Any]]
+    proximo_cursor: Optional[str] = None  # cursor da página seguinte; None na última
 
 class UploadSuccessResponse(BaseModel):
     status: str
@@ -72,4 +135,16 @@ class UploadSuccessResponse(BaseModel):
 class FiltroPayload(BaseModel):
     campus: str
     curso: str
-    turno: str
\ No newline at end of file
+    turno: str
+
+class JobInfo(BaseModel):
+    id: str
+    tipo: str
+    workspace: str
+    status: StatusJob
+    progresso: Optional[float] = None  # fração concluída (0 a 1), quando conhecida
+    mensagem: Optional[str] = None
+    erro: Optional[str] = None
+    criado_em: datetime
+    iniciado_em: Optional[datetime] = None
+    concluido_em: Optional[datetime] = None
@@ -14,4 +14,27 @@ class TipoCota(str, Enum):
 class StatusCandidato(str, Enum):
     SELECIONADO = "SELECIONADO"
     NAO_HOMOLOGADO = "NAO_HOMOLOGADO"
-    PENDENTE = "PENDENTE"
\ No newline at end of file
+    PENDENTE = "PENDENTE"
+
+class FormatoArquivo(str, Enum):
+    CSV = "csv"
+    PARQUET = "parquet"
+    ARROW = "arrow"
+
+class OrdemCandidatos(str, Enum):
+    ID = "id"  # ordem de carga
+    NOTA = "nota"  # nota decrescente, empates por id
+
+class StatusJob(str, Enum):
+    PENDENTE = "pendente"
+    EXECUTANDO = "executando"
+    CONCLUIDO = "concluido"
+    FALHOU = "falhou"
+
+# Ordem canônica das cotas e status; o índice de cada item é o código inteiro
+# usado nas colunas do repositório.
+COTAS = tuple(TipoCota)
+STATUS = tuple(StatusCandidato)
+
+# Valor usado nas colunas inteiras para representar None
+SEM_VALOR = -1
@@ -1,7 +1,17 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from core.config import settings
-from api.v1.endpoints import chamadas
+from core.metrics import metricas, medir_requisicoes
+from api.dependencies import restaurar_estado, encerrar_repositorio, workspaces as registro_workspaces
+from api.v1.endpoints import chamadas, jobs, workspaces
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    restaurar_estado()
+    yield
+    encerrar_repositorio()
 
 app = FastAPI(
     title=settings.app_name,
@@ -9,7 +19,8 @@ app = FastAPI(
     version="1.0.0",
     docs_url="/docs",
     redoc_url="/redoc",
-    openapi_url="/openapi.json"
+    openapi_url="/openapi.json",
+    lifespan=lifespan
 )
 
 # Configuração de CORS
@@ -20,9 +31,12 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.middleware("http")(medir_requisicoes)
 
 # Incluir rotas
 app.include_router(chamadas.router)
+app.include_router(workspaces.router)
+app.include_router(jobs.router)
 
 @app.get("/")
 async def root():
@@ -30,4 +44,13 @@ async def root():
         "message": "Bem-vindo ao Sistema de Chamadas Universitárias",
         "docs": "/docs",
         "redoc": "/redoc"
-    }
\ No newline at end of file
+    }
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def exportar_metricas():
+    for workspace in registro_workspaces.listar():
+        cache = workspace.cache.estatisticas()
+        metricas.definir("workspace_candidatos", workspace.repositorio.total_candidatos(), workspace=workspace.nome)
+        metricas.definir("workspace_cache_acertos", cache["acertos"], workspace=workspace.nome)
+        metricas.definir("workspace_cache_falhas", cache["falhas"], workspace=workspace.nome)
+    return PlainTextResponse(metricas.exportar_prometheus(), media_type="text/plain; version=0.0.4")
\ No newline at end of file
@@ -0,0 +1,79 @@
+from typing import Any, Iterable
+import hashlib
+import re
+import numpy as np
+from domain.enums import TipoCota, StatusCandidato, COTAS, STATUS, SEM_VALOR
+
+# Representação dos campos do candidato compartilhada pelos repositórios:
+# cota, vaga_selecionada e status como códigos inteiros (índices em COTAS/STATUS)
+# e SEM_VALOR no lugar de None nas colunas inteiras opcionais.
+
+CAMPOS_CLASSIFICACAO = tuple(f"class_{cota.value}" for cota in COTAS)
+CAMPOS_DO_CURSO = ("campus", "curso", "turno")
+CAMPOS_TEXTO = ("cpf", "nome", "email")
+
+# Colunas de texto: strings de tamanho variável do NumPy (textos curtos, como o
+# CPF, ficam dentro do próprio elemento, sem um objeto Python por linha)
+TIPO_TEXTO = np.dtypes.StringDType(na_object=None)
+
+# Maior número de dígitos de uma chave de CPF numérica que cabe em um int64
+_MAX_DIGITOS_CHAVE = 18
+
+COTA_PARA_CODIGO = {cota: i for i, cota in enumerate(COTAS)}
+STATUS_PARA_CODIGO = {status: i for i, status in enumerate(STATUS)}
+
+# Tabelas de decodificação: o último item (None) é alcançado pelo índice SEM_VALOR
+TABELA_COTAS = np.array(COTAS + (None,), dtype=object)
+TABELA_STATUS = np.array(STATUS + (None,), dtype=object)
+
+
+def codificar(campo: str, valor: Any) -> Any:
+    """Converte (e valida) o valor de um campo para a representação colunar."""
+    if campo in ("cota", "vaga_selecionada"):
+        return SEM_VALOR if valor is None else COTA_PARA_CODIGO[TipoCota(valor)]
+    if campo == "status":
+        return STATUS_PARA_CODIGO[StatusCandidato(valor)]
+    if campo == "chamada" or campo in CAMPOS_CLASSIFICACAO:
+        return SEM_VALOR if valor is None else int(valor)
+    if campo == "nota_final":
+        return float(valor)
+    if campo == "opcao":
+        return int(valor)
+    return valor
+
+
+def validar_lote(campo: str, valores: np.ndarray, tamanho: int) -> np.ndarray:
+    """Valida, uma vez para o lote inteiro, um array de valores já codificados."""
+    if valores.shape != (tamanho,):
+        raise ValueError(f"O campo '{campo}' deve ter um valor por id ({tamanho}), recebido {valores.shape}.")
+    limites = {"cota": (0, len(COTAS) - 1), "vaga_selecionada": (SEM_VALOR, len(COTAS) - 1), "status": (0, len(STATUS) - 1)}
+    if campo in limites and valores.size:
+        minimo, maximo = limites[campo]
+        if valores.min() < minimo or valores.max() > maximo:
+            raise ValueError(f"Código inválido no campo '{campo}'.")
+    return valores
+
+
+def chave_cpf(cpf: Any) -> int:
+    """
+    Chave canônica de 64 bits de um CPF: os seus dígitos como inteiro, de modo
+    que pontuação e zeros à esquerda perdidos (CPF lido como número) não
+    importam. Identificadores que não são só dígitos (ex.: com letras) recebem
+    uma chave negativa derivada de um hash do texto sem pontuação.
+    """
+    texto = re.sub(r"[\W_]", "", str(cpf)).upper()
+    if texto.isdecimal() and len(texto) <= _MAX_DIGITOS_CHAVE:
+        return int(texto)
+    resumo = hashlib.blake2b(texto.encode("utf-8", "surrogatepass"), digest_size=8).digest()
+    return -1 - (int.from_bytes(resumo, "big") >> 1)
+
+
+def chaves_cpf(cpfs: Iterable[Any]) -> np.ndarray:
+    """`chave_cpf` de cada CPF do lote, convertendo de uma vez os que já são só dígitos."""
+    textos = np.asarray(cpfs, dtype=TIPO_TEXTO)
+    chaves = np.empty(textos.shape[0], dtype=np.int64)
+    simples = np.strings.isdecimal(textos) & (np.strings.str_len(textos) <= _MAX_DIGITOS_CHAVE)
+    chaves[simples] = textos[simples].astype(np.int64)
+    for posicao in np.flatnonzero(~simples).tolist():
+        chaves[posicao] = chave_cpf(textos[posicao])
+    return chaves
@@ -1,21 +1,300 @@
-from typing import Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+from contextlib import contextmanager
+from functools import wraps
+from itertools import chain
+import numpy as np
 from domain.entities import Candidato, Vagas
+from domain.enums import StatusCandidato, SEM_VALOR
+from core.metrics import metricas
+from repositories.codificacao import (
+    CAMPOS_CLASSIFICACAO, CAMPOS_DO_CURSO, CAMPOS_TEXTO, STATUS_PARA_CODIGO, TABELA_COTAS, TABELA_STATUS,
+    TIPO_TEXTO, chave_cpf, chaves_cpf, codificar, validar_lote,
+)
+
+# Posição de cada campo de classificação na matriz de classificações
+_COLUNA_CLASSE = {campo: k for k, campo in enumerate(CAMPOS_CLASSIFICACAO)}
+# (chamada, status) da imensa maioria das linhas: sem chamada e pendentes. Essa
+# chave não entra no índice; as consultas que podem alcançá-la varrem as colunas.
+_CHAVE_PADRAO = (SEM_VALOR, STATUS_PARA_CODIGO[StatusCandidato.PENDENTE])
+_SELECIONADO = STATUS_PARA_CODIGO[StatusCandidato.SELECIONADO]
+
+
+def _registrado(metodo):
+    """
+    Registra no diário (quando houver um) as operações que alteram o estado,
+    depois de concluídas com sucesso. Chamadas aninhadas (ex.: `update_candidato`
+    chamando `update_many`) geram um único registro, o da operação externa.
+    """
+    @wraps(metodo)
+    def registrar(self, *args, **kwargs):
+        if self.diario is None:
+            return metodo(self, *args, **kwargs)
+        self._profundidade_registro += 1
+        try:
+            resultado = metodo(self, *args, **kwargs)
+        finally:
+            self._profundidade_registro -= 1
+        if self._profundidade_registro == 0:
+            self.diario.registrar(metodo.__name__, args, kwargs)
+        return resultado
+    return registrar
+
 
 class InMemoryRepository:
+    """
+    Repositório em memória com armazenamento colunar.
+
+    Cada atributo do candidato fica em um array NumPy (uma posição por
+    inscrição): cota, vaga e status como códigos de 1 byte, as nove
+    classificações em uma única matriz inteira, cpf/nome/email como strings do
+    NumPy e campus/curso/turno como um código categórico da tupla do curso.
+    O id de um candidato é sempre a sua linha + 1, o que permite que os
+    serviços trabalhem com máscaras vetorizadas sobre os ids em vez de
+    percorrer objetos `Candidato`, materializados apenas na borda da API.
+
+    Cada inscrição aponta para uma pessoa: um id denso, atribuído na ordem em
+    que cada CPF aparece, pela chave canônica do CPF (ver `chave_cpf`). Para
+    cada pessoa é mantido o número de inscrições selecionadas, de modo que
+    "já selecionada em algum curso" é uma consulta a um array.
+
+    Três índices secundários aceleram as consultas mais frequentes: pessoa ->
+    ids, código do curso -> ids (ordenados, em arrays int32) e (chamada,
+    status) -> ids, este sem a chave das linhas pendentes sem chamada, que são
+    quase todas. Os dois primeiros são reconstruídos sob demanda quando uma
+    restauração ou remoção os invalida.
+
+    Cada curso tem ainda uma versão de estado, que cresce monotonicamente a
+    cada alteração em seus candidatos ou vagas (e em todo reset). Ela serve de
+    chave para resultados memorizados: uma versão igual garante dados iguais.
+    """
+
+    CAPACIDADE_INICIAL = 1024
+
     def __init__(self):
-        self.candidatos: Dict[int, Candidato] = {}
         self.vagas_por_curso: Dict[Tuple[str, str, str], Vagas] = {}
         self.vagas_originais_por_curso: Dict[Tuple[str, str, str], Vagas] = {}
-        
+
         self.view_context: Optional[Dict[str, str]] = None
-        
+
         self.chamada_num: int = 1
-        self.next_id = 1
+        # Diário de operações (ver repositories.persistence); None desativa o registro
+        self.diario = None
+        self._profundidade_registro = 0
+        self._relogio = 0
+        # Muda sempre que alguma coluna de texto (cpf, nome, email) muda
+        self.versao_textos = 0
+        self._versao_curso: Dict[Tuple[str, str, str], int] = {}
+        self._limpar_candidatos()
+
+    def _limpar_candidatos(self) -> None:
+        self._tocar_cursos(list(self._versao_curso))
+        self.versao_textos += 1
+        self._n = 0
+        self._capacidade = 0
+        self._nota = np.empty(0, dtype=np.float64)
+        self._opcao = np.empty(0, dtype=np.int32)
+        self._cota = np.empty(0, dtype=np.int8)
+        self._status = np.empty(0, dtype=np.int8)
+        self._vaga = np.empty(0, dtype=np.int8)
+        self._chamada = np.empty(0, dtype=np.int32)
+        self._curso = np.empty(0, dtype=np.int32)
+        self._ativo = np.empty(0, dtype=bool)
+        self._pessoa = np.empty(0, dtype=np.int32)
+        self._classes = np.empty((0, len(CAMPOS_CLASSIFICACAO)), dtype=np.int32)
+        self._cpf = np.empty(0, dtype=TIPO_TEXTO)
+        self._nome = np.empty(0, dtype=TIPO_TEXTO)
+        self._email = np.empty(0, dtype=TIPO_TEXTO)
+        self._cursos: List[Tuple[str, str, str]] = []
+        self._codigo_curso: Dict[Tuple[str, str, str], int] = {}
+        # Por pessoa: chave do CPF e número de inscrições selecionadas
+        self._chave_da_pessoa = np.empty(0, dtype=np.int64)
+        self._selecoes_da_pessoa = np.empty(0, dtype=np.int32)
+        # Chaves de CPF em ordem crescente e a pessoa de cada uma (buscas com searchsorted)
+        self._chaves_ordenadas = np.empty(0, dtype=np.int64)
+        self._pessoas_ordenadas = np.empty(0, dtype=np.int32)
+        self._indice_pessoa: Optional[Tuple[np.ndarray, np.ndarray]] = None
+        self._indice_curso: Optional[Dict[int, List[np.ndarray]]] = {}
+        self._indice_chamada_status: Dict[Tuple[int, int], Set[int]] = {}
+
+    @property
+    def next_id(self) -> int:
+        return self._n + 1
+
+    def _colunas_numericas(self) -> Dict[str, np.ndarray]:
+        return {
+            "_nota": self._nota, "_opcao": self._opcao, "_cota": self._cota, "_status": self._status,
+            "_vaga": self._vaga, "_chamada": self._chamada, "_curso": self._curso, "_ativo": self._ativo,
+            "_pessoa": self._pessoa, "_classes": self._classes,
+        }
+
+    def _colunas_texto(self) -> Dict[str, np.ndarray]:
+        return {"_cpf": self._cpf, "_nome": self._nome, "_email": self._email}
+
+    def _reservar(self, quantidade: int) -> None:
+        """Garante capacidade para mais `quantidade` linhas, dobrando os arrays quando preciso."""
+        necessario = self._n + quantidade
+        if necessario <= self._capacidade:
+            return
+        nova_capacidade = max(self.CAPACIDADE_INICIAL, self._capacidade * 2, necessario)
+        for atributo, coluna in chain(self._colunas_numericas().items(), self._colunas_texto().items()):
+            nova = np.empty((nova_capacidade,) + coluna.shape[1:], dtype=coluna.dtype)
+            nova[:self._n] = coluna[:self._n]
+            setattr(self, atributo, nova)
+        self._capacidade = nova_capacidade
+
+    def _tocar_cursos(self, cursos: Iterable[Tuple[str, str, str]]) -> None:
+        """Avança a versão de estado dos cursos informados."""
+        self._relogio += 1
+        for curso_key in cursos:
+            self._versao_curso[curso_key] = self._relogio
+
+    def _tocar_codigos(self, codigos: np.ndarray) -> None:
+        self._tocar_cursos(self._cursos[codigo] for codigo in np.unique(codigos).tolist())
+
+    def versao_global(self) -> int:
+        """Versão de estado do repositório: muda sempre que algum curso muda."""
+        return self._relogio
+
+    def versao_do_curso(self, curso_key: Tuple[str, str, str]) -> int:
+        """Versão de estado do curso: muda sempre que candidatos ou vagas do curso mudam."""
+        return self._versao_curso.get(curso_key, 0)
+
+    def _codigo_do_curso(self, curso_key: Tuple[str, str, str]) -> int:
+        codigo = self._codigo_curso.get(curso_key)
+        if codigo is None:
+            codigo = len(self._cursos)
+            self._cursos.append(curso_key)
+            self._codigo_curso[curso_key] = codigo
+        return codigo
+
+    def _pessoas_das_chaves(self, chaves: np.ndarray) -> np.ndarray:
+        """Pessoa de cada chave de CPF, cadastrando as novas na ordem em que aparecem."""
+        unicas, primeiras, inversa = np.unique(chaves, return_index=True, return_inverse=True)
+        posicoes = np.searchsorted(self._chaves_ordenadas, unicas)
+        existentes = posicoes < self._chaves_ordenadas.size
+        existentes[existentes] = self._chaves_ordenadas[posicoes[existentes]] == unicas[existentes]
+        pessoas = np.empty(unicas.size, dtype=np.int32)
+        pessoas[existentes] = self._pessoas_ordenadas[posicoes[existentes]]
+        novas = np.flatnonzero(~existentes)
+        if novas.size:
+            total = self._chave_da_pessoa.size
+            novas_em_ordem = novas[np.argsort(primeiras[novas], kind="stable")]
+            pessoas[novas_em_ordem] = np.arange(total, total + novas.size, dtype=np.int32)
+            self._chave_da_pessoa = np.concatenate([self._chave_da_pessoa, unicas[novas_em_ordem]])
+            self._selecoes_da_pessoa = np.concatenate([self._selecoes_da_pessoa, np.zeros(novas.size, dtype=np.int32)])
+            self._chaves_ordenadas = np.insert(self._chaves_ordenadas, posicoes[novas], unicas[novas])
+            self._pessoas_ordenadas = np.insert(self._pessoas_ordenadas, posicoes[novas], pessoas[novas])
+        return pessoas[inversa]
+
+    def _pessoa_do_cpf(self, cpf: str) -> Optional[int]:
+        chave = chave_cpf(cpf)
+        posicao = int(np.searchsorted(self._chaves_ordenadas, chave))
+        if posicao < self._chaves_ordenadas.size and self._chaves_ordenadas[posicao] == chave:
+            return int(self._pessoas_ordenadas[posicao])
+        return None
+
+    def _indice_por_pessoa(self) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Índice pessoa -> ids: os ids ativos agrupados por pessoa e os limites
+        de cada grupo. Reconstruído na primeira consulta depois de uma inclusão,
+        remoção ou troca de CPF.
+        """
+        if self._indice_pessoa is None:
+            ids = np.flatnonzero(self._ativo[:self._n]) + 1
+            pessoas = self._pessoa[ids - 1]
+            limites = np.zeros(self._chave_da_pessoa.size + 1, dtype=np.int64)
+            np.cumsum(np.bincount(pessoas, minlength=self._chave_da_pessoa.size), out=limites[1:])
+            self._indice_pessoa = (ids[np.argsort(pessoas, kind="stable")].astype(np.int32), limites)
+        return self._indice_pessoa
+
+    def _contar_selecoes(self, linhas: np.ndarray, sinal: int) -> None:
+        """Soma `sinal` ao número de inscrições selecionadas das pessoas das linhas SELECIONADO."""
+        selecionadas = linhas[self._status[linhas] == _SELECIONADO]
+        np.add.at(self._selecoes_da_pessoa, self._pessoa[selecionadas], sinal)
+
+    def pessoas_selecionadas(self) -> np.ndarray:
+        """Mapa (indexado pela pessoa) das pessoas com alguma inscrição SELECIONADO."""
+        return self._selecoes_da_pessoa > 0
+
+    def _indexar_cursos_lote(self, ids: np.ndarray) -> None:
+        """Acrescenta ao índice de curso um bloco de ids (int32) maiores que todos os já indexados."""
+        cursos = self._curso[ids - 1]
+        ordem = np.argsort(cursos, kind="stable")
+        cursos_ordenados, ids_ordenados = cursos[ordem], ids[ordem].astype(np.int32)
+        inicios = np.flatnonzero(np.r_[True, cursos_ordenados[1:] != cursos_ordenados[:-1]]) if ids.size else np.empty(0, dtype=np.int64)
+        for a, b in zip(inicios.tolist(), np.r_[inicios[1:], ids.size].tolist()):
+            self._indice_curso.setdefault(int(cursos_ordenados[a]), []).append(ids_ordenados[a:b])
+
+    def _ids_por_curso(self, codigo_curso: int) -> np.ndarray:
+        """
+        Ids do curso em ordem crescente. O índice guarda um bloco por carga,
+        unidos na primeira consulta; depois de uma remoção ou troca de curso, é
+        reconstruído por inteiro com uma única ordenação.
+        """
+        if self._indice_curso is None:
+            self._indice_curso = {}
+            self._indexar_cursos_lote(np.flatnonzero(self._ativo[:self._n]) + 1)
+        blocos = self._indice_curso.get(codigo_curso)
+        if not blocos:
+            return np.empty(0, dtype=np.int64)
+        if len(blocos) > 1:
+            blocos[:] = [np.concatenate(blocos)]
+        return blocos[0].astype(np.int64)
+
+    def _chave_chamada_status(self, candidato_id: int) -> Tuple[int, int]:
+        i = candidato_id - 1
+        return int(self._chamada[i]), int(self._status[i])
+
+    def _indexar_chamada_status(self, candidato_id: int) -> None:
+        chave = self._chave_chamada_status(candidato_id)
+        if chave != _CHAVE_PADRAO:
+            self._indice_chamada_status.setdefault(chave, set()).add(candidato_id)
+
+    def _desindexar_chamada_status(self, candidato_id: int) -> None:
+        chave = self._chave_chamada_status(candidato_id)
+        if chave == _CHAVE_PADRAO: return
+        ids = self._indice_chamada_status[chave]
+        ids.discard(candidato_id)
+        if not ids:
+            del self._indice_chamada_status[chave]
+
+    def _agrupar_por_chamada_status(self, ids: np.ndarray):
+        """Agrupa ids pela chave (chamada, status) atual, sem laço por candidato."""
+        linhas = ids - 1
+        chamadas, status = self._chamada[linhas], self._status[linhas]
+        ordem = np.lexsort((status, chamadas))
+        ids, chamadas, status = ids[ordem], chamadas[ordem], status[ordem]
+        inicios = np.flatnonzero(np.r_[True, (chamadas[1:] != chamadas[:-1]) | (status[1:] != status[:-1])])
+        for inicio, fim in zip(inicios.tolist(), np.r_[inicios[1:], ids.size].tolist()):
+            yield (int(chamadas[inicio]), int(status[inicio])), ids[inicio:fim].tolist()
+
+    def _indexar_chamada_status_lote(self, ids: np.ndarray) -> None:
+        for chave, grupo in self._agrupar_por_chamada_status(ids):
+            if chave != _CHAVE_PADRAO:
+                self._indice_chamada_status.setdefault(chave, set()).update(grupo)
 
+    def _desindexar_chamada_status_lote(self, ids: np.ndarray) -> None:
+        for chave, grupo in self._agrupar_por_chamada_status(ids):
+            if chave == _CHAVE_PADRAO: continue
+            restantes = self._indice_chamada_status[chave]
+            restantes.difference_update(grupo)
+            if not restantes:
+                del self._indice_chamada_status[chave]
+
+    def _linhas(self, ids: Iterable[int]) -> np.ndarray:
+        return np.asarray(ids, dtype=np.int64) - 1
+
+    def _linha_valida(self, candidato_id: Optional[int]) -> bool:
+        return candidato_id is not None and 1 <= candidato_id <= self._n and bool(self._ativo[candidato_id - 1])
+
+    @_registrado
     def set_candidatos(self, candidatos: List[Candidato]):
-        """Substitui a lista de candidatos existente por uma nova."""
-        self.candidatos = {c.id: c for c in candidatos}
-    
+        """Substitui a lista de candidatos existente por uma nova (os ids são reatribuídos)."""
+        self._limpar_candidatos()
+        for candidato in candidatos:
+            self.add_candidato(candidato)
+
+    @_registrado
     def set_view_context(self, campus: str, curso: str, turno: str):
         """Define o contexto de visualização atual (campus, curso, turno)"""
         self.view_context = {"campus": campus, "curso": curso, "turno": turno}
@@ -24,40 +303,308 @@ class InMemoryRepository:
         """Retorna o contexto de visualização atual"""
         return self.view_context
 
+    @contextmanager
+    def transacao(self):
+        """Delimita uma operação de várias etapas; em memória, o lock do workspace já a isola."""
+        yield
+
+    @_registrado
     def add_candidato(self, candidato: Candidato) -> Candidato:
-        candidato.id = self.next_id
-        self.candidatos[self.next_id] = candidato
-        self.next_id += 1
+        self._reservar(1)
+        i = self._n
+        self._nota[i] = codificar("nota_final", candidato.nota_final)
+        self._opcao[i] = codificar("opcao", candidato.opcao)
+        self._cota[i] = codificar("cota", candidato.cota)
+        self._status[i] = codificar("status", candidato.status)
+        self._vaga[i] = codificar("vaga_selecionada", candidato.vaga_selecionada)
+        self._chamada[i] = codificar("chamada", candidato.chamada)
+        self._curso[i] = self._codigo_do_curso((candidato.campus, candidato.curso, candidato.turno))
+        self._ativo[i] = True
+        self._classes[i] = [codificar(campo, getattr(candidato, campo)) for campo in CAMPOS_CLASSIFICACAO]
+        self._cpf[i], self._nome[i], self._email[i] = candidato.cpf, candidato.nome, candidato.email
+        self._pessoa[i] = self._pessoas_das_chaves(np.array([chave_cpf(candidato.cpf)]))[0]
+        self.versao_textos += 1
+        self._n += 1
+        candidato.id = self._n
+        self._contar_selecoes(np.array([i]), 1)
+        self._tocar_codigos(self._curso[i:i + 1])
+        self._indice_pessoa = None
+        if self._indice_curso is not None:
+            self._indice_curso.setdefault(int(self._curso[i]), []).append(np.array([candidato.id], dtype=np.int32))
+        self._indexar_chamada_status(candidato.id)
         return candidato
 
+    @_registrado
+    def add_candidatos_em_lote(self, colunas: Dict[str, Any]) -> np.ndarray:
+        """
+        Inclui de uma vez um lote de candidatos novos (PENDENTE, sem chamada nem
+        classificação) a partir de colunas já validadas: `cota` em códigos de
+        COTAS e os demais campos em arrays ou listas do mesmo tamanho. Retorna
+        os ids atribuídos.
+        """
+        quantidade = len(colunas["cpf"])
+        if not quantidade:
+            return np.empty(0, dtype=np.int64)
+        self._reservar(quantidade)
+        inicio, fim = self._n, self._n + quantidade
+        self._nota[inicio:fim] = colunas["nota_final"]
+        self._opcao[inicio:fim] = colunas["opcao"]
+        self._cota[inicio:fim] = colunas["cota"]
+        self._status[inicio:fim] = STATUS_PARA_CODIGO[StatusCandidato.PENDENTE]
+        self._vaga[inicio:fim] = SEM_VALOR
+        self._chamada[inicio:fim] = SEM_VALOR
+        self._ativo[inicio:fim] = True
+        self._classes[inicio:fim] = SEM_VALOR
+        self._curso[inicio:fim] = [
+            self._codigo_do_curso(curso_key)
+            for curso_key in zip(colunas["campus"], colunas["curso"], colunas["turno"])
+        ]
+        self._cpf[inicio:fim] = colunas["cpf"]
+        self._nome[inicio:fim] = colunas["nome"]
+        self._email[inicio:fim] = colunas["email"]
+        self._pessoa[inicio:fim] = self._pessoas_das_chaves(chaves_cpf(self._cpf[inicio:fim]))
+        self.versao_textos += 1
+        self._n = fim
+
+        ids = np.arange(inicio + 1, fim + 1, dtype=np.int64)
+        self._indice_pessoa = None
+        if self._indice_curso is not None:
+            self._indexar_cursos_lote(ids)
+        self._tocar_codigos(self._curso[inicio:fim])
+        metricas.incrementar("repositorio_operacoes_total", repositorio="memoria", operacao="insercao")
+        metricas.incrementar("repositorio_linhas_escritas_total", quantidade, repositorio="memoria", operacao="insercao")
+        return ids
+
     def get_candidato(self, candidato_id: int) -> Optional[Candidato]:
-        return self.candidatos.get(candidato_id)
+        if not self._linha_valida(candidato_id):
+            return None
+        return self.materializar([candidato_id])[0]
 
     def get_candidatos_by_cpf(self, cpf: str) -> List[Candidato]:
-        """Retorna uma lista de todas as inscrições de um candidato pelo CPF."""
-        return [cand for cand in self.candidatos.values() if cand.cpf == cpf]
+        """Retorna uma lista de todas as inscrições de um candidato pelo CPF (em qualquer formato)."""
+        pessoa = self._pessoa_do_cpf(cpf)
+        if pessoa is None:
+            return []
+        ids, limites = self._indice_por_pessoa()
+        return self.materializar(ids[limites[pessoa]:limites[pessoa + 1]])
 
     def list_candidatos(self) -> List[Candidato]:
-        return list(self.candidatos.values())
+        return self.materializar(self.filtrar_ids())
+
+    def total_candidatos(self) -> int:
+        return int(np.count_nonzero(self._ativo[:self._n]))
 
+    @_registrado
     def update_candidato(self, candidato_id: int, candidato_update: dict) -> Optional[Candidato]:
-        if candidato_id not in self.candidatos:
+        if not self._linha_valida(candidato_id):
             return None
 
-        current_data = self.candidatos[candidato_id].model_dump()
-        current_data.update(candidato_update)
-        self.candidatos[candidato_id] = Candidato(**current_data)
-        return self.candidatos[candidato_id]
+        self.update_many([candidato_id], candidato_update)
+        return self.materializar([candidato_id])[0]
+
+    @_registrado
+    def update_many(self, ids: Iterable[int], fields: Dict[str, Any]) -> int:
+        """
+        Atualiza em lote, no lugar, as colunas dos candidatos informados.
+
+        Cada valor de `fields` pode ser um escalar de domínio (ex.: um
+        `StatusCandidato`), validado uma única vez e aplicado a todos os ids, ou
+        um array com um valor por id na mesma codificação devolvida por
+        `get_colunas` (códigos inteiros e SEM_VALOR no lugar de None).
+        Ids inexistentes são ignorados. Retorna o número de candidatos atualizados.
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        validos = (ids >= 1) & (ids <= self._n)
+        validos[validos] = self._ativo[ids[validos] - 1]
+        if not fields or not validos.any():
+            return 0
+
+        valores: Dict[str, Any] = {}
+        for campo, valor in fields.items():
+            if isinstance(valor, (np.ndarray, list, tuple)):
+                valores[campo] = validar_lote(campo, np.asarray(valor), ids.size)[validos]
+            else:
+                valores[campo] = codificar(campo, valor)
+        ids = ids[validos]
+        linhas = ids - 1
+
+        muda_selecoes = "status" in valores or "cpf" in valores
+        muda_curso = any(campo in valores for campo in CAMPOS_DO_CURSO)
+        muda_chamada_status = "chamada" in valores or "status" in valores
+        if muda_selecoes: self._contar_selecoes(linhas, -1)
+        if muda_chamada_status: self._desindexar_chamada_status_lote(ids)
+        cursos_afetados = self._curso[linhas]
+
+        for campo, valor in valores.items():
+            self._escrever(campo, linhas, valor)
+
+        if muda_selecoes: self._contar_selecoes(linhas, 1)
+        if muda_curso:
+            self._indice_curso = None
+        if muda_chamada_status: self._indexar_chamada_status_lote(ids)
+        self._tocar_codigos(np.concatenate([cursos_afetados, self._curso[linhas]]) if muda_curso else cursos_afetados)
+        metricas.incrementar("repositorio_operacoes_total", repositorio="memoria", operacao="atualizacao")
+        metricas.incrementar("repositorio_linhas_escritas_total", ids.size, repositorio="memoria", operacao="atualizacao")
+        return int(ids.size)
+
+    def _escrever(self, campo: str, linhas, valor) -> None:
+        if campo == "nota_final": self._nota[linhas] = valor
+        elif campo == "opcao": self._opcao[linhas] = valor
+        elif campo == "cota": self._cota[linhas] = valor
+        elif campo == "status": self._status[linhas] = valor
+        elif campo == "vaga_selecionada": self._vaga[linhas] = valor
+        elif campo == "chamada": self._chamada[linhas] = valor
+        elif campo in _COLUNA_CLASSE: self._classes[linhas, _COLUNA_CLASSE[campo]] = valor
+        elif campo in CAMPOS_TEXTO:
+            self.versao_textos += 1
+            getattr(self, f"_{campo}")[linhas] = valor
+            if campo == "cpf":
+                self._pessoa[linhas] = self._pessoas_das_chaves(chaves_cpf(self._cpf[linhas]))
+                self._indice_pessoa = None
+        elif campo in CAMPOS_DO_CURSO:
+            for linha, v in zip(linhas.tolist(), self._por_linha(valor, linhas.size)):
+                campus, curso, turno = self._cursos[self._curso[linha]]
+                atual = {"campus": campus, "curso": curso, "turno": turno}
+                atual[campo] = v
+                self._curso[linha] = self._codigo_do_curso((atual["campus"], atual["curso"], atual["turno"]))
+        elif campo != "id":
+            raise KeyError(f"Campo desconhecido: {campo}")
+
+    @staticmethod
+    def _por_linha(valor, tamanho: int) -> List[Any]:
+        return valor.tolist() if isinstance(valor, np.ndarray) else [valor] * tamanho
 
+    @_registrado
     def delete_candidato(self, candidato_id: int) -> bool:
-        if candidato_id in self.candidatos:
-            del self.candidatos[candidato_id]
+        if self._linha_valida(candidato_id):
+            self._contar_selecoes(np.array([candidato_id - 1]), -1)
+            self._desindexar_chamada_status(candidato_id)
+            self._ativo[candidato_id - 1] = False
+            self._indice_pessoa = None
+            self._indice_curso = None
+            self._tocar_codigos(self._curso[candidato_id - 1:candidato_id])
             return True
         return False
 
+    def ids_do_curso(self, curso_key: Tuple[str, str, str], ordenar_por_nota: bool = False) -> np.ndarray:
+        """Ids de todos os candidatos de um curso (em ordem crescente ou por nota decrescente)."""
+        return self.filtrar_ids(curso_key=curso_key, ordenar_por_nota=ordenar_por_nota)
+
+    def filtrar_ids(
+        self,
+        curso_key: Optional[Tuple[str, str, str]] = None,
+        chamada: Optional[int] = None,
+        status: Optional[StatusCandidato] = None,
+        ordenar_por_nota: bool = False,
+    ) -> np.ndarray:
+        """
+        Retorna os ids dos candidatos que atendem a todos os critérios informados,
+        em ordem crescente ou, com `ordenar_por_nota`, por nota decrescente (empates
+        em ordem de id). Usa o índice (chamada, status) ou o índice de curso,
+        de modo que o custo é proporcional ao tamanho da resposta; apenas
+        consultas que podem incluir linhas pendentes sem chamada varrem as
+        colunas (do curso, quando informado).
+        """
+        resultado = self._filtrar_ids(curso_key, chamada, status)
+        if ordenar_por_nota:
+            resultado = resultado[np.argsort(-self._nota[resultado - 1], kind="stable")]
+        return resultado
+
+    def _filtrar_ids(self, curso_key, chamada, status) -> np.ndarray:
+        codigo_curso = None
+        if curso_key is not None:
+            codigo_curso = self._codigo_curso.get(curso_key)
+            if codigo_curso is None:
+                return np.empty(0, dtype=np.int64)
+
+        codigo_status = None if status is None else STATUS_PARA_CODIGO[StatusCandidato(status)]
+        if chamada in (None, _CHAVE_PADRAO[0]) and codigo_status in (None, _CHAVE_PADRAO[1]):
+            if codigo_curso is not None:
+                candidatos = self._ids_por_curso(codigo_curso)
+            else:
+                candidatos = np.flatnonzero(self._ativo[:self._n]) + 1
+            if chamada is None and status is None:
+                return candidatos
+            linhas = candidatos - 1
+            mascara = np.ones(linhas.size, dtype=bool)
+            if chamada is not None: mascara &= self._chamada[linhas] == chamada
+            if codigo_status is not None: mascara &= self._status[linhas] == codigo_status
+            return candidatos[mascara]
+
+        conjuntos = [
+            ids for (chave_chamada, chave_status), ids in self._indice_chamada_status.items()
+            if (chamada is None or chave_chamada == chamada) and (codigo_status is None or chave_status == codigo_status)
+        ]
+        total = sum(len(ids) for ids in conjuntos)
+        resultado = np.sort(np.fromiter(chain.from_iterable(conjuntos), dtype=np.int64, count=total))
+        if codigo_curso is not None:
+            resultado = resultado[self._curso[resultado - 1] == codigo_curso]
+        return resultado
+
+    def get_colunas(self, ids: Iterable[int], campos: Iterable[str]) -> Dict[str, np.ndarray]:
+        """
+        Retorna cópias das colunas pedidas para os ids informados.
+        Cota, vaga_selecionada e status vêm como códigos inteiros (índices em
+        COTAS/STATUS), colunas inteiras usam SEM_VALOR no lugar de None e
+        `pessoa` é o id denso da pessoa (CPF) da inscrição.
+        """
+        linhas = self._linhas(ids)
+        colunas: Dict[str, np.ndarray] = {}
+        for campo in campos:
+            if campo == "id": colunas[campo] = linhas + 1
+            elif campo == "nota_final": colunas[campo] = self._nota[linhas]
+            elif campo == "opcao": colunas[campo] = self._opcao[linhas]
+            elif campo == "cota": colunas[campo] = self._cota[linhas]
+            elif campo == "status": colunas[campo] = self._status[linhas]
+            elif campo == "vaga_selecionada": colunas[campo] = self._vaga[linhas]
+            elif campo == "chamada": colunas[campo] = self._chamada[linhas]
+            elif campo == "curso_key": colunas[campo] = self._curso[linhas]
+            elif campo == "pessoa": colunas[campo] = self._pessoa[linhas]
+            elif campo in _COLUNA_CLASSE: colunas[campo] = self._classes[linhas, _COLUNA_CLASSE[campo]]
+            elif campo in CAMPOS_TEXTO: colunas[campo] = getattr(self, f"_{campo}")[linhas].astype(object)
+            else:
+                raise KeyError(f"Campo desconhecido: {campo}")
+        return colunas
+
+    def get_curso(self, codigo: int) -> Tuple[str, str, str]:
+        """Retorna a tupla (campus, curso, turno) de um código categórico de curso."""
+        return self._cursos[codigo]
+
+    def _valores(self, linhas: np.ndarray, campo: str) -> List[Any]:
+        """Valores de um campo do `Candidato` (já decodificados) para as linhas informadas."""
+        if campo == "id": return (linhas + 1).tolist()
+        if campo in CAMPOS_TEXTO: return getattr(self, f"_{campo}")[linhas].tolist()
+        if campo in CAMPOS_DO_CURSO:
+            posicao = CAMPOS_DO_CURSO.index(campo)
+            return [self._cursos[c][posicao] for c in self._curso[linhas].tolist()]
+        if campo == "nota_final": return self._nota[linhas].tolist()
+        if campo == "opcao": return self._opcao[linhas].tolist()
+        if campo == "cota": return TABELA_COTAS[self._cota[linhas]].tolist()
+        if campo == "vaga_selecionada": return TABELA_COTAS[self._vaga[linhas]].tolist()
+        if campo == "status": return TABELA_STATUS[self._status[linhas]].tolist()
+        if campo == "chamada" or campo in _COLUNA_CLASSE:
+            coluna = self._chamada[linhas] if campo == "chamada" else self._classes[linhas, _COLUNA_CLASSE[campo]]
+            valores = coluna.astype(object)
+            valores[coluna == SEM_VALOR] = None
+            return valores.tolist()
+        raise KeyError(f"Campo desconhecido: {campo}")
+
+    def projetar(self, ids: Iterable[int], campos: Iterable[str]) -> List[Dict[str, Any]]:
+        """Dicionários apenas com os campos pedidos para os ids informados, na ordem dada, sem construir `Candidato`."""
+        linhas = self._linhas(ids)
+        campos = list(campos)
+        colunas = [self._valores(linhas, campo) for campo in campos]
+        return [dict(zip(campos, valores)) for valores in zip(*colunas)]
+
+    def materializar(self, ids: Iterable[int]) -> List[Candidato]:
+        """Constrói objetos `Candidato` (sem revalidação) para os ids informados, na ordem dada."""
+        return [Candidato.model_construct(**dados) for dados in self.projetar(ids, Candidato.model_fields)]
+
+    @_registrado
     def set_vagas_para_curso(self, curso_key: Tuple[str, str, str], vagas: Vagas):
         """Define as vagas para um curso específico."""
         self.vagas_por_curso[curso_key] = vagas
+        self._tocar_cursos([curso_key])
         if curso_key not in self.vagas_originais_por_curso:
              self.vagas_originais_por_curso[curso_key] = vagas.model_copy()
 
@@ -68,10 +615,11 @@ class InMemoryRepository:
     def get_vagas_originais_para_curso(self, curso_key: Tuple[str, str, str]) -> Optional[Vagas]:
         """Obtém as vagas originais para um curso específico."""
         return self.vagas_originais_por_curso.get(curso_key)
-        
+
     def list_cursos_com_vagas_definidas(self) -> List[Tuple[str, str, str]]:
         return list(self.vagas_por_curso.keys())
 
+    @_registrado
     def increment_chamada_num(self) -> int:
         self.chamada_num += 1
         return self.chamada_num
@@ -79,10 +627,72 @@ class InMemoryRepository:
     def get_chamada_num(self) -> int:
         return self.chamada_num
 
+    @_registrado
+    def set_chamada_num(self, chamada_num: int) -> None:
+        self.chamada_num = chamada_num
+
+    @_registrado
     def reset(self) -> None:
-        self.candidatos = {}
+        self._limpar_candidatos()
         self.vagas_por_curso = {}
         self.vagas_originais_por_curso = {}
         self.view_context = None
         self.chamada_num = 1
-        self.next_id = 1
\ No newline at end of file
+
+    def exportar_estado(self) -> Dict[str, Any]:
+        """
+        Estado completo do repositório para um snapshot: arrays com as linhas
+        ocupadas (as classificações como uma matriz n x 9) e a chave do CPF de
+        cada pessoa, colunas de textos e um dicionário de metadados simples. Os índices não entram; são
+        reconstruídos em `importar_estado`.
+        """
+        n = self._n
+        arrays = {atributo.lstrip("_"): coluna[:n] for atributo, coluna in self._colunas_numericas().items()}
+        arrays["chave_da_pessoa"] = self._chave_da_pessoa
+        return {
+            "arrays": arrays,
+            "textos": {atributo.lstrip("_"): coluna[:n] for atributo, coluna in self._colunas_texto().items()},
+            "metadados": {
+                "cursos": [list(curso_key) for curso_key in self._cursos],
+                "vagas_por_curso": [[list(k), v.model_dump()] for k, v in self.vagas_por_curso.items()],
+                "vagas_originais_por_curso": [[list(k), v.model_dump()] for k, v in self.vagas_originais_por_curso.items()],
+                "view_context": self.view_context,
+                "chamada_num": self.chamada_num,
+                "relogio": self._relogio,
+                "versao_curso": [[list(k), v] for k, v in self._versao_curso.items()],
+            },
+        }
+
+    def importar_estado(self, estado: Dict[str, Any]) -> None:
+        """Substitui o estado pelo de um snapshot (ver `exportar_estado`) e reconstrói os índices."""
+        arrays, textos, metadados = estado["arrays"], estado["textos"], estado["metadados"]
+        n = int(arrays["ativo"].shape[0])
+        self._limpar_candidatos()
+        for atributo, coluna in self._colunas_numericas().items():
+            setattr(self, atributo, np.asarray(arrays[atributo.lstrip("_")], dtype=coluna.dtype))
+        for atributo in self._colunas_texto():
+            setattr(self, atributo, np.array(textos[atributo.lstrip("_")], dtype=TIPO_TEXTO))
+        self._n = self._capacidade = n
+        self._chave_da_pessoa = np.asarray(arrays["chave_da_pessoa"], dtype=np.int64)
+        self._chaves_ordenadas = np.sort(self._chave_da_pessoa)
+        self._pessoas_ordenadas = np.argsort(self._chave_da_pessoa).astype(np.int32)
+        self._cursos = [tuple(curso_key) for curso_key in metadados["cursos"]]
+        self._codigo_curso = {curso_key: codigo for codigo, curso_key in enumerate(self._cursos)}
+
+        self.vagas_por_curso = {tuple(k): Vagas(**v) for k, v in metadados["vagas_por_curso"]}
+        self.vagas_originais_por_curso = {tuple(k): Vagas(**v) for k, v in metadados["vagas_originais_por_curso"]}
+        self.view_context = metadados["view_context"]
+        self.chamada_num = metadados["chamada_num"]
+        self._relogio = max(self._relogio, metadados["relogio"]) + 1
+        self._versao_curso = {tuple(k): self._relogio for k, _ in metadados["versao_curso"]}
+        self._reconstruir_indices()
+
+    def _reconstruir_indices(self) -> None:
+        ids = np.flatnonzero(self._ativo[:self._n]) + 1
+        self._indice_pessoa = None
+        self._indice_curso = None
+        self._selecoes_da_pessoa = np.zeros(self._chave_da_pessoa.size, dtype=np.int32)
+        self._contar_selecoes(ids - 1, 1)
+        self._indice_chamada_status = {}
+        if ids.size:
+            self._indexar_chamada_status_lote(ids)
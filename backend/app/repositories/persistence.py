@@ -0,0 +1,251 @@
+from typing import Any, Dict, List, Optional
+from contextlib import contextmanager
+from threading import Lock
+import json
+import logging
+import os
+import pickle
+import shutil
+import struct
+import zlib
+import numpy as np
+from repositories.in_memory_repository import InMemoryRepository
+
+_CABECALHO_REGISTRO = struct.Struct("<II")  # tamanho e CRC32 de cada registro do diário
+_CAMPOS_TEXTO = ("cpf", "nome", "email")
+_SEPARADOR = "\x00"
+
+
+class RepositoryPersistence:
+    """
+    Persistência do repositório em memória: snapshot binário + diário de operações.
+
+    O snapshot é um diretório com um `.npy` por coluna numérica (carregados por
+    memory map, em modo copy-on-write), os textos de cada coluna concatenados
+    em um único arquivo (separados por um caractere nulo), e os metadados (cursos,
+    vagas, chamada atual, contexto) em JSON. Entre dois snapshots, cada
+    operação que altera o repositório é acrescentada ao diário (append-only);
+    na restauração, o snapshot é carregado e o diário é reaplicado.
+
+    Cada snapshot tem um número de geração, e o arquivo ATUAL aponta para o
+    vigente: o snapshot novo é escrito por completo e levado ao disco (fsync
+    dos arquivos e dos diretórios) antes de ATUAL ser trocado (de forma
+    atômica), e só depois que a troca também chega ao disco a geração anterior
+    é apagada.
+    """
+
+    def __init__(self, diretorio: str, fsync: bool = False):
+        self.diretorio = diretorio
+        self.fsync = fsync
+        self._lock = Lock()
+        self._geracao = 0
+        self._arquivo_diario = None
+        self._versao_textos_salva: Optional[int] = None
+        os.makedirs(diretorio, exist_ok=True)
+
+    def _caminho(self, *partes: str) -> str:
+        return os.path.join(self.diretorio, *partes)
+
+    def _ler_geracao_atual(self) -> int:
+        try:
+            with open(self._caminho("ATUAL"), encoding="utf-8") as arquivo:
+                return int(arquivo.read().strip())
+        except FileNotFoundError:
+            return 0
+
+    # ---- diário ----
+
+    def registrar(self, operacao: str, args: tuple, kwargs: dict) -> None:
+        """Acrescenta uma operação ao diário (chamado pelo repositório após cada alteração)."""
+        dados = pickle.dumps((operacao, args, kwargs), protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._arquivo_diario.write(_CABECALHO_REGISTRO.pack(len(dados), zlib.crc32(dados)))
+            self._arquivo_diario.write(dados)
+            self._arquivo_diario.flush()
+            if self.fsync:
+                os.fsync(self._arquivo_diario.fileno())
+
+    def _reaplicar_diario(self, repo: InMemoryRepository, caminho: str) -> int:
+        """Reaplica os registros íntegros do diário e descarta um eventual registro final incompleto."""
+        if not os.path.exists(caminho):
+            return 0
+        aplicados, fim_valido = 0, 0
+        with open(caminho, "rb") as arquivo:
+            while True:
+                cabecalho = arquivo.read(_CABECALHO_REGISTRO.size)
+                if len(cabecalho) < _CABECALHO_REGISTRO.size:
+                    break
+                tamanho, crc = _CABECALHO_REGISTRO.unpack(cabecalho)
+                dados = arquivo.read(tamanho)
+                if len(dados) < tamanho or zlib.crc32(dados) != crc:
+                    break
+                operacao, args, kwargs = pickle.loads(dados)
+                getattr(repo, operacao)(*args, **kwargs)
+                aplicados += 1
+                fim_valido = arquivo.tell()
+        if fim_valido < os.path.getsize(caminho):
+            logging.warning(f"Diário {caminho} com registro final incompleto; descartado a partir do byte {fim_valido}.")
+            with open(caminho, "r+b") as arquivo:
+                arquivo.truncate(fim_valido)
+        return aplicados
+
+    def _abrir_diario(self, geracao: int) -> None:
+        if self._arquivo_diario is not None:
+            self._arquivo_diario.close()
+        self._arquivo_diario = open(self._caminho(f"diario-{geracao}.log"), "ab")
+
+    # ---- snapshot ----
+
+    @staticmethod
+    def _salvar_textos(diretorio: str, campo: str, valores: List[Optional[str]]) -> None:
+        """
+        Grava os textos de uma coluna em um único arquivo, separados por
+        _SEPARADOR, o que permite recarregá-los com um único `split`. Se algum
+        texto contém o separador, grava também os deslocamentos de cada texto.
+        """
+        n = len(valores)
+        nulos = np.fromiter((v is None for v in valores), dtype=bool, count=n)
+        textos = ["" if v is None else str(v) for v in valores]
+        conteudo = _SEPARADOR.join(textos)
+        if conteudo.count(_SEPARADOR) != max(n - 1, 0):
+            conteudo = "".join(textos)
+            deslocamentos = np.zeros(n + 1, dtype=np.int64)
+            np.cumsum(np.fromiter(map(len, textos), dtype=np.int64, count=n), out=deslocamentos[1:])
+            np.save(os.path.join(diretorio, f"{campo}_deslocamentos.npy"), deslocamentos)
+        with open(os.path.join(diretorio, f"{campo}.txt"), "wb") as arquivo:
+            arquivo.write(conteudo.encode("utf-8", "surrogatepass"))
+        np.save(os.path.join(diretorio, f"{campo}_nulos.npy"), nulos)
+
+    @staticmethod
+    def _carregar_textos(diretorio: str, campo: str, n: int) -> List[Optional[str]]:
+        with open(os.path.join(diretorio, f"{campo}.txt"), "rb") as arquivo:
+            texto = arquivo.read().decode("utf-8", "surrogatepass")
+        caminho_deslocamentos = os.path.join(diretorio, f"{campo}_deslocamentos.npy")
+        if os.path.exists(caminho_deslocamentos):
+            deslocamentos = np.load(caminho_deslocamentos).tolist()
+            valores = [texto[a:b] for a, b in zip(deslocamentos[:-1], deslocamentos[1:])]
+        else:
+            valores = texto.split(_SEPARADOR) if n else []
+        nulos = np.load(os.path.join(diretorio, f"{campo}_nulos.npy"))
+        if nulos.any():
+            valores = np.array(valores, dtype=object)
+            valores[nulos] = None
+            valores = valores.tolist()
+        return valores
+
+    def salvar_snapshot(self, repo: InMemoryRepository) -> None:
+        """Grava o estado atual como uma nova geração e inicia um diário vazio para ela."""
+        with self._lock:
+            anterior = self._geracao
+            geracao = anterior + 1
+            destino = self._caminho(f"snapshot-{geracao}")
+            shutil.rmtree(destino, ignore_errors=True)
+            os.makedirs(destino)
+
+            estado = repo.exportar_estado()
+            for nome, array in estado["arrays"].items():
+                np.save(os.path.join(destino, f"{nome}.npy"), array)
+
+            # Os textos só mudam na carga: se não mudaram, os arquivos da geração anterior são reaproveitados
+            origem_textos = self._caminho(f"snapshot-{anterior}")
+            reaproveitar = self._versao_textos_salva == repo.versao_textos and os.path.isdir(origem_textos)
+            for campo in _CAMPOS_TEXTO:
+                if reaproveitar:
+                    for sufixo in (".txt", "_deslocamentos.npy", "_nulos.npy"):
+                        if os.path.exists(os.path.join(origem_textos, campo + sufixo)):
+                            self._ligar_ou_copiar(os.path.join(origem_textos, campo + sufixo), os.path.join(destino, campo + sufixo))
+                else:
+                    self._salvar_textos(destino, campo, estado["textos"][campo])
+
+            metadados = dict(estado["metadados"], versao_textos=repo.versao_textos)
+            with open(os.path.join(destino, "metadados.json"), "w", encoding="utf-8") as arquivo:
+                json.dump(metadados, arquivo, ensure_ascii=False)
+
+            open(self._caminho(f"diario-{geracao}.log"), "wb").close()
+
+            # Tudo o que a nova geração referencia precisa estar no disco antes de ATUAL apontar para ela
+            for nome in os.listdir(destino):
+                self._fsync_arquivo(os.path.join(destino, nome))
+            self._fsync_diretorio(destino)
+            self._fsync_arquivo(self._caminho(f"diario-{geracao}.log"))
+            temporario = self._caminho("ATUAL.tmp")
+            with open(temporario, "w", encoding="utf-8") as arquivo:
+                arquivo.write(str(geracao))
+                arquivo.flush()
+                os.fsync(arquivo.fileno())
+            self._fsync_diretorio(self.diretorio)
+            os.replace(temporario, self._caminho("ATUAL"))
+            self._fsync_diretorio(self.diretorio)
+
+            self._geracao = geracao
+            self._versao_textos_salva = repo.versao_textos
+            self._abrir_diario(geracao)
+            shutil.rmtree(self._caminho(f"snapshot-{anterior}"), ignore_errors=True)
+            if os.path.exists(self._caminho(f"diario-{anterior}.log")):
+                os.remove(self._caminho(f"diario-{anterior}.log"))
+
+    @staticmethod
+    def _fsync_arquivo(caminho: str) -> None:
+        with open(caminho, "rb") as arquivo:
+            os.fsync(arquivo.fileno())
+
+    @staticmethod
+    def _fsync_diretorio(caminho: str) -> None:
+        """Leva ao disco as entradas do diretório (arquivos criados, renomeados ou removidos nele)."""
+        if os.name == "nt":
+            return  # o Windows não permite abrir diretórios para fsync
+        descritor = os.open(caminho, os.O_RDONLY)
+        try:
+            os.fsync(descritor)
+        finally:
+            os.close(descritor)
+
+    @staticmethod
+    def _ligar_ou_copiar(origem: str, destino: str) -> None:
+        try:
+            os.link(origem, destino)
+        except OSError:
+            shutil.copyfile(origem, destino)
+
+    def restaurar(self, repo: InMemoryRepository) -> Dict[str, Any]:
+        """
+        Restaura o repositório a partir do snapshot vigente e do seu diário e
+        passa a registrar as próximas operações. Retorna um resumo da restauração.
+        """
+        with self._lock:
+            repo.diario = None
+            geracao = self._ler_geracao_atual()
+            diretorio = self._caminho(f"snapshot-{geracao}")
+            if geracao and os.path.isdir(diretorio):
+                with open(os.path.join(diretorio, "metadados.json"), encoding="utf-8") as arquivo:
+                    metadados = json.load(arquivo)
+                arrays = {
+                    nome[:-len(".npy")]: np.load(os.path.join(diretorio, nome), mmap_mode="c")
+                    for nome in os.listdir(diretorio)
+                    if nome.endswith(".npy") and not nome.endswith(("_deslocamentos.npy", "_nulos.npy"))
+                }
+                n = int(arrays["classes"].shape[0])
+                textos = {campo: self._carregar_textos(diretorio, campo, n) for campo in _CAMPOS_TEXTO}
+                repo.importar_estado({"arrays": arrays, "textos": textos, "metadados": metadados})
+                repo.versao_textos = metadados["versao_textos"]
+                self._versao_textos_salva = repo.versao_textos
+            aplicados = self._reaplicar_diario(repo, self._caminho(f"diario-{geracao}.log"))
+            self._geracao = geracao
+            self._abrir_diario(geracao)
+            repo.diario = self
+        return {"geracao": geracao, "candidatos": repo.total_candidatos(), "operacoes_reaplicadas": aplicados}
+
+    @contextmanager
+    def sem_registro(self, repo: InMemoryRepository):
+        """Suspende o diário durante uma operação que termina com um snapshot (ex.: a carga do arquivo)."""
+        diario, repo.diario = repo.diario, None
+        try:
+            yield
+        finally:
+            repo.diario = diario
+
+    def fechar(self) -> None:
+        with self._lock:
+            if self._arquivo_diario is not None:
+                self._arquivo_diario.close()
+                self._arquivo_diario = None
@@ -0,0 +1,572 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from contextlib import contextmanager
+from itertools import repeat
+from threading import RLock
+import json
+import sqlite3
+import numpy as np
+from domain.entities import Candidato, Vagas
+from domain.enums import StatusCandidato, COTAS, STATUS, SEM_VALOR
+from core.metrics import metricas
+from repositories.codificacao import (
+    CAMPOS_CLASSIFICACAO, CAMPOS_DO_CURSO, STATUS_PARA_CODIGO,
+    chave_cpf, chaves_cpf, codificar, validar_lote,
+)
+
+# campo (como em `get_colunas`) -> coluna da tabela candidatos
+_COLUNAS = {
+    "id": "id", "cpf": "cpf", "pessoa": "pessoa", "nome": "nome", "email": "email", "curso_key": "curso",
+    "nota_final": "nota_final", "opcao": "opcao", "cota": "cota", "status": "status",
+    "vaga_selecionada": "vaga", "chamada": "chamada",
+    **{campo: campo for campo in CAMPOS_CLASSIFICACAO},
+}
+_TIPOS = {
+    "id": np.int64, "pessoa": np.int32, "curso_key": np.int32, "nota_final": np.float64, "opcao": np.int32,
+    "cota": np.int8, "status": np.int8, "vaga_selecionada": np.int8, "chamada": np.int32,
+    **{campo: np.int32 for campo in CAMPOS_CLASSIFICACAO},
+}
+
+_ESQUEMA = f"""
+CREATE TABLE IF NOT EXISTS candidatos (
+    id INTEGER PRIMARY KEY,
+    cpf TEXT NOT NULL,
+    pessoa INTEGER NOT NULL,
+    nome TEXT,
+    email TEXT,
+    curso INTEGER NOT NULL,
+    nota_final REAL NOT NULL,
+    opcao INTEGER NOT NULL,
+    cota INTEGER NOT NULL,
+    status INTEGER NOT NULL,
+    vaga INTEGER NOT NULL,
+    chamada INTEGER NOT NULL,
+    {", ".join(f"{campo} INTEGER NOT NULL" for campo in CAMPOS_CLASSIFICACAO)}
+);
+CREATE INDEX IF NOT EXISTS idx_candidatos_curso_nota ON candidatos (curso, nota_final DESC, id);
+CREATE INDEX IF NOT EXISTS idx_candidatos_chamada_status ON candidatos (chamada, status);
+CREATE INDEX IF NOT EXISTS idx_candidatos_pessoa ON candidatos (pessoa);
+
+-- Uma linha por pessoa (chave canônica do CPF, ver `chave_cpf`)
+CREATE TABLE IF NOT EXISTS pessoas (
+    id INTEGER PRIMARY KEY,
+    chave INTEGER NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS cursos (
+    codigo INTEGER PRIMARY KEY,
+    campus TEXT,
+    curso TEXT,
+    turno TEXT,
+    versao INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_cursos_chave ON cursos (campus, curso, turno);
+
+CREATE TABLE IF NOT EXISTS vagas (
+    curso INTEGER NOT NULL,
+    original INTEGER NOT NULL,
+    dados TEXT NOT NULL,
+    PRIMARY KEY (curso, original)
+);
+
+CREATE TABLE IF NOT EXISTS estado (
+    chave TEXT PRIMARY KEY,
+    valor TEXT NOT NULL
+);
+"""
+
+_INSERIR_CANDIDATO = (
+    f"INSERT INTO candidatos (id, cpf, pessoa, nome, email, curso, nota_final, opcao, cota, status, vaga, chamada, "
+    f"{', '.join(CAMPOS_CLASSIFICACAO)}) VALUES ({', '.join('?' * (12 + len(CAMPOS_CLASSIFICACAO)))})"
+)
+
+
+def _decodificador(campo: str):
+    """Função que converte o valor armazenado de um campo no valor do `Candidato`."""
+    if campo in ("cota", "vaga_selecionada"):
+        return lambda codigo: None if codigo == SEM_VALOR else COTAS[codigo]
+    if campo == "status":
+        return lambda codigo: STATUS[codigo]
+    if campo == "chamada" or campo in CAMPOS_CLASSIFICACAO:
+        return lambda valor: None if valor == SEM_VALOR else valor
+    return None
+
+
+class SqliteRepository:
+    """
+    Repositório em um banco SQLite embutido, com a mesma interface de
+    `InMemoryRepository`.
+
+    Os candidatos ficam em uma tabela com a mesma codificação das colunas do
+    repositório em memória (códigos de COTAS/STATUS e SEM_VALOR no lugar de
+    None) e campus/curso/turno em uma tabela de cursos referenciada por código.
+    Cada CPF é reduzido a uma chave inteira canônica e a uma pessoa (tabela
+    pessoas), referenciada pelas inscrições. Curso (com a nota, para as listas
+    ordenadas), pessoa e (chamada, status) são indexados, e as ordenações por
+    nota são feitas pelo próprio banco.
+
+    O estado fica inteiramente no arquivo (inclusive vagas, contexto, número da
+    chamada e versões dos cursos), de modo que sobrevive a reinícios e pode ser
+    compartilhado por vários processos: cada alteração é uma transação
+    `BEGIN IMMEDIATE`, as operações de várias etapas (gerar chamada, marcar não
+    homologados) rodam inteiras dentro de `transacao()`, e o banco usa WAL para
+    que leitores não bloqueiem. O contexto de visualização também é
+    compartilhado: processos que operam sobre cursos diferentes ao mesmo tempo
+    devem informar o curso a cada operação em vez de depender do filtro.
+    """
+
+    def __init__(self, caminho: str):
+        self.caminho = caminho
+        self._lock = RLock()
+        self._profundidade_transacao = 0
+        self._cursos: Dict[int, Tuple[str, str, str]] = {}
+        self._conexao = sqlite3.connect(caminho, check_same_thread=False, isolation_level=None, timeout=30)
+        self._conexao.execute("PRAGMA journal_mode=WAL")
+        self._conexao.execute("PRAGMA synchronous=NORMAL")
+        self._conexao.executescript(_ESQUEMA)
+
+    def fechar(self) -> None:
+        with self._lock:
+            self._conexao.close()
+
+    @contextmanager
+    def _transacao(self):
+        """Transação de escrita; chamadas aninhadas fazem parte da transação mais externa."""
+        with self._lock:
+            externa = self._profundidade_transacao == 0
+            if externa:
+                self._conexao.execute("BEGIN IMMEDIATE")
+            self._profundidade_transacao += 1
+            try:
+                yield self._conexao
+            except BaseException:
+                self._profundidade_transacao -= 1
+                if externa:
+                    self._conexao.execute("ROLLBACK")
+                raise
+            self._profundidade_transacao -= 1
+            if externa:
+                self._conexao.execute("COMMIT")
+
+    def transacao(self):
+        """
+        Transação de escrita (`BEGIN IMMEDIATE`) em torno de uma operação de
+        várias etapas (ex.: ler a chamada atual e os selecionados, alocar e
+        gravar): outros processos esperam o fim dela para escrever, de modo que
+        tudo o que ela lê continua valendo até as suas gravações.
+        """
+        return self._transacao()
+
+    def _consultar(self, sql: str, parametros: Iterable[Any] = ()) -> List[tuple]:
+        with self._lock:
+            return self._conexao.execute(sql, tuple(parametros)).fetchall()
+
+    def _consultar_ids(self, sql: str, parametros: Iterable[Any] = ()) -> np.ndarray:
+        with self._lock:
+            cursor = self._conexao.execute(sql, tuple(parametros))
+            return np.fromiter((linha[0] for linha in cursor), dtype=np.int64)
+
+    @staticmethod
+    def _lista_json(ids: np.ndarray) -> str:
+        return json.dumps(np.asarray(ids, dtype=np.int64).tolist())
+
+    # ---- estado simples (chamada atual, contexto, relógio de versões, próximo id) ----
+
+    def _ler_estado(self, chave: str, padrao: Any) -> Any:
+        linhas = self._consultar("SELECT valor FROM estado WHERE chave = ?", (chave,))
+        return json.loads(linhas[0][0]) if linhas else padrao
+
+    def _gravar_estado(self, chave: str, valor: Any) -> None:
+        with self._transacao() as conexao:
+            conexao.execute(
+                "INSERT INTO estado (chave, valor) VALUES (?, ?) ON CONFLICT (chave) DO UPDATE SET valor = excluded.valor",
+                (chave, json.dumps(valor))
+            )
+
+    @property
+    def next_id(self) -> int:
+        return self._ler_estado("proximo_id", 1)
+
+    # ---- cursos e versões ----
+
+    def _tocar_codigos(self, codigos: Iterable[int]) -> None:
+        """Avança a versão de estado dos cursos informados (por código)."""
+        with self._transacao() as conexao:
+            relogio = self._ler_estado("relogio", 0) + 1
+            self._gravar_estado("relogio", relogio)
+            conexao.execute(
+                "UPDATE cursos SET versao = ? WHERE codigo IN (SELECT value FROM json_each(?))",
+                (relogio, json.dumps(sorted(set(int(codigo) for codigo in codigos))))
+            )
+
+    def versao_global(self) -> int:
+        """Versão de estado do repositório: muda sempre que algum curso muda."""
+        return self._ler_estado("relogio", 0)
+
+    def versao_do_curso(self, curso_key: Tuple[str, str, str]) -> int:
+        """Versão de estado do curso: muda sempre que candidatos ou vagas do curso mudam."""
+        linhas = self._consultar("SELECT versao FROM cursos WHERE campus IS ? AND curso IS ? AND turno IS ?", curso_key)
+        return linhas[0][0] if linhas else 0
+
+    def _codigo_existente(self, curso_key: Tuple[str, str, str]) -> Optional[int]:
+        linhas = self._consultar("SELECT codigo FROM cursos WHERE campus IS ? AND curso IS ? AND turno IS ?", curso_key)
+        return linhas[0][0] if linhas else None
+
+    def _codigos_dos_cursos(self, cursos: Iterable[Tuple[str, str, str]]) -> List[int]:
+        """Códigos dos cursos informados, cadastrando os que ainda não existem. Códigos nunca são reaproveitados."""
+        with self._transacao() as conexao:
+            codigos = {tuple(linha[1:]): linha[0] for linha in conexao.execute("SELECT codigo, campus, curso, turno FROM cursos")}
+            proximo = max(codigos.values(), default=-1) + 1
+            resultado = []
+            for curso_key in cursos:
+                codigo = codigos.get(curso_key)
+                if codigo is None:
+                    codigo = codigos[curso_key] = proximo
+                    proximo += 1
+                    conexao.execute("INSERT INTO cursos (codigo, campus, curso, turno) VALUES (?, ?, ?, ?)", (codigo, *curso_key))
+                resultado.append(codigo)
+            return resultado
+
+    def get_curso(self, codigo: int) -> Tuple[str, str, str]:
+        """Retorna a tupla (campus, curso, turno) de um código categórico de curso."""
+        curso_key = self._cursos.get(codigo)
+        if curso_key is None:
+            linhas = self._consultar("SELECT campus, curso, turno FROM cursos WHERE codigo = ?", (int(codigo),))
+            if not linhas:
+                raise IndexError(f"Código de curso inexistente: {codigo}")
+            curso_key = self._cursos[codigo] = tuple(linhas[0])
+        return curso_key
+
+    # ---- pessoas ----
+
+    def _pessoas_das_chaves(self, chaves: List[int]) -> List[int]:
+        """Pessoa de cada chave de CPF, cadastrando as chaves novas (na ordem em que aparecem)."""
+        with self._transacao() as conexao:
+            distintas = list(dict.fromkeys(chaves))
+            conexao.executemany("INSERT OR IGNORE INTO pessoas (chave) VALUES (?)", ((chave,) for chave in distintas))
+            pessoa_por_chave = dict(conexao.execute(
+                "SELECT p.chave, p.id FROM json_each(?) AS j JOIN pessoas AS p ON p.chave = j.value", (json.dumps(distintas),)
+            ))
+            return [pessoa_por_chave[chave] for chave in chaves]
+
+    def pessoas_selecionadas(self) -> np.ndarray:
+        """Máscara indexada pela pessoa: True para as que estão selecionadas em algum curso."""
+        total = self._consultar("SELECT COALESCE(MAX(id), 0) + 1 FROM pessoas")[0][0]
+        selecionadas = np.zeros(total, dtype=bool)
+        selecionadas[self._consultar_ids(
+            "SELECT DISTINCT pessoa FROM candidatos WHERE status = ?", (STATUS_PARA_CODIGO[StatusCandidato.SELECIONADO],)
+        )] = True
+        return selecionadas
+
+    # ---- candidatos ----
+
+    def _limpar_candidatos(self) -> None:
+        with self._transacao() as conexao:
+            conexao.execute("DELETE FROM candidatos")
+            conexao.execute("DELETE FROM pessoas")
+            self._gravar_estado("proximo_id", 1)
+            self._tocar_codigos(linha[0] for linha in conexao.execute("SELECT codigo FROM cursos").fetchall())
+
+    def set_candidatos(self, candidatos: List[Candidato]):
+        """Substitui a lista de candidatos existente por uma nova (os ids são reatribuídos)."""
+        with self._transacao():
+            self._limpar_candidatos()
+            for candidato in candidatos:
+                self.add_candidato(candidato)
+
+    def set_view_context(self, campus: str, curso: str, turno: str):
+        """Define o contexto de visualização atual (campus, curso, turno)"""
+        self._gravar_estado("view_context", {"campus": campus, "curso": curso, "turno": turno})
+
+    def get_view_context(self) -> Optional[Dict[str, str]]:
+        """Retorna o contexto de visualização atual"""
+        return self._ler_estado("view_context", None)
+
+    def add_candidato(self, candidato: Candidato) -> Candidato:
+        with self._transacao() as conexao:
+            candidato_id = self.next_id
+            codigo = self._codigos_dos_cursos([(candidato.campus, candidato.curso, candidato.turno)])[0]
+            pessoa = self._pessoas_das_chaves([chave_cpf(candidato.cpf)])[0]
+            conexao.execute(_INSERIR_CANDIDATO, (
+                candidato_id, candidato.cpf, pessoa, candidato.nome, candidato.email, codigo,
+                codificar("nota_final", candidato.nota_final), codificar("opcao", candidato.opcao),
+                codificar("cota", candidato.cota), codificar("status", candidato.status),
+                codificar("vaga_selecionada", candidato.vaga_selecionada), codificar("chamada", candidato.chamada),
+                *(codificar(campo, getattr(candidato, campo)) for campo in CAMPOS_CLASSIFICACAO),
+            ))
+            self._gravar_estado("proximo_id", candidato_id + 1)
+            self._tocar_codigos([codigo])
+        candidato.id = candidato_id
+        return candidato
+
+    def add_candidatos_em_lote(self, colunas: Dict[str, Any]) -> np.ndarray:
+        """
+        Inclui de uma vez um lote de candidatos novos (PENDENTE, sem chamada nem
+        classificação) a partir de colunas já validadas, com um único
+        `executemany` em uma transação. Retorna os ids atribuídos.
+        """
+        quantidade = len(colunas["cpf"])
+        if not quantidade:
+            return np.empty(0, dtype=np.int64)
+        with self._transacao() as conexao:
+            inicio = self.next_id
+            ids = np.arange(inicio, inicio + quantidade, dtype=np.int64)
+            codigos = self._codigos_dos_cursos(zip(colunas["campus"], colunas["curso"], colunas["turno"]))
+            pessoas = self._pessoas_das_chaves(chaves_cpf(colunas["cpf"]).tolist())
+            constantes = (STATUS_PARA_CODIGO[StatusCandidato.PENDENTE], SEM_VALOR, SEM_VALOR, *([SEM_VALOR] * len(CAMPOS_CLASSIFICACAO)))
+            conexao.executemany(_INSERIR_CANDIDATO, (
+                (*linha, *constantes) for linha in zip(
+                    ids.tolist(), colunas["cpf"], pessoas, colunas["nome"], colunas["email"], codigos,
+                    np.asarray(colunas["nota_final"], dtype=np.float64).tolist(),
+                    np.asarray(colunas["opcao"]).tolist(), np.asarray(colunas["cota"]).tolist(),
+                )
+            ))
+            self._gravar_estado("proximo_id", inicio + quantidade)
+            self._tocar_codigos(codigos)
+        metricas.incrementar("repositorio_operacoes_total", repositorio="sqlite", operacao="insercao")
+        metricas.incrementar("repositorio_linhas_escritas_total", quantidade, repositorio="sqlite", operacao="insercao")
+        return ids
+
+    def get_candidato(self, candidato_id: int) -> Optional[Candidato]:
+        candidatos = self.materializar([candidato_id])
+        return candidatos[0] if candidatos else None
+
+    def get_candidatos_by_cpf(self, cpf: str) -> List[Candidato]:
+        """Retorna uma lista de todas as inscrições de um candidato pelo CPF (em qualquer formatação)."""
+        return self.materializar(self._consultar_ids(
+            "SELECT id FROM candidatos WHERE pessoa = (SELECT id FROM pessoas WHERE chave = ?) ORDER BY id", (chave_cpf(cpf),)
+        ))
+
+    def list_candidatos(self) -> List[Candidato]:
+        return self.materializar(self.filtrar_ids())
+
+    def total_candidatos(self) -> int:
+        return self._consultar("SELECT COUNT(*) FROM candidatos")[0][0]
+
+    def update_candidato(self, candidato_id: int, candidato_update: dict) -> Optional[Candidato]:
+        with self._transacao():
+            if not self._consultar("SELECT 1 FROM candidatos WHERE id = ?", (candidato_id,)):
+                return None
+            self.update_many([candidato_id], candidato_update)
+            return self.get_candidato(candidato_id)
+
+    def update_many(self, ids: Iterable[int], fields: Dict[str, Any]) -> int:
+        """
+        Atualiza em lote as colunas dos candidatos informados, com a mesma
+        semântica de `InMemoryRepository.update_many`: escalares de domínio são
+        aplicados a todos os ids com um único UPDATE; arrays já codificados (um
+        valor por id) são gravados com `executemany`. Ids inexistentes são
+        ignorados. Retorna o número de candidatos atualizados.
+        """
+        ids = np.asarray(ids, dtype=np.int64)
+        for campo in fields:
+            if campo == "pessoa" or (campo not in _COLUNAS and campo not in CAMPOS_DO_CURSO):
+                raise KeyError(f"Campo desconhecido: {campo}")
+        if not fields or not ids.size:
+            return 0
+
+        with self._transacao() as conexao:
+            posicoes = self._consultar_ids(
+                "SELECT j.key FROM json_each(?) AS j JOIN candidatos AS c ON c.id = j.value", (self._lista_json(ids),)
+            )
+            if not posicoes.size:
+                return 0
+            validos = np.zeros(ids.size, dtype=bool)
+            validos[posicoes] = True
+
+            valores: Dict[str, Any] = {}
+            for campo, valor in fields.items():
+                if campo == "id": continue
+                if isinstance(valor, (np.ndarray, list, tuple)):
+                    valores[campo] = validar_lote(campo, np.asarray(valor), ids.size)[validos]
+                else:
+                    valores[campo] = codificar(campo, valor)
+            ids = ids[validos]
+
+            cursos_afetados = self.get_colunas(ids, ["curso_key"])["curso_key"]
+            atribuicoes = {_COLUNAS[campo]: valor for campo, valor in valores.items() if campo not in CAMPOS_DO_CURSO}
+            if "cpf" in valores:
+                # A pessoa acompanha o CPF
+                cpf = valores["cpf"]
+                if isinstance(cpf, np.ndarray):
+                    atribuicoes["pessoa"] = np.array(self._pessoas_das_chaves(chaves_cpf(cpf).tolist()), dtype=np.int64)
+                else:
+                    atribuicoes["pessoa"] = self._pessoas_das_chaves([chave_cpf(cpf)])[0]
+            novos_cursos = None
+            if any(campo in valores for campo in CAMPOS_DO_CURSO):
+                novos_cursos = np.array(self._recodificar_cursos(cursos_afetados, valores), dtype=np.int64)
+                atribuicoes["curso"] = novos_cursos
+
+            if atribuicoes:
+                sql = f"UPDATE candidatos SET {', '.join(f'{coluna} = ?' for coluna in atribuicoes)}"
+                if any(isinstance(valor, np.ndarray) for valor in atribuicoes.values()):
+                    por_coluna = [valor.tolist() if isinstance(valor, np.ndarray) else repeat(valor) for valor in atribuicoes.values()]
+                    conexao.executemany(f"{sql} WHERE id = ?", zip(*por_coluna, ids.tolist()))
+                else:
+                    conexao.execute(f"{sql} WHERE id IN (SELECT value FROM json_each(?))", (*atribuicoes.values(), self._lista_json(ids)))
+            self._tocar_codigos(np.concatenate([cursos_afetados, novos_cursos]) if novos_cursos is not None else cursos_afetados)
+        metricas.incrementar("repositorio_operacoes_total", repositorio="sqlite", operacao="atualizacao")
+        metricas.incrementar("repositorio_linhas_escritas_total", ids.size, repositorio="sqlite", operacao="atualizacao")
+        return int(ids.size)
+
+    def _recodificar_cursos(self, codigos: np.ndarray, valores: Dict[str, Any]) -> List[int]:
+        """Códigos de curso resultantes de alterar campus/curso/turno de cada candidato."""
+        novas_chaves = []
+        for posicao, codigo in enumerate(codigos.tolist()):
+            atual = dict(zip(CAMPOS_DO_CURSO, self.get_curso(codigo)))
+            for campo in CAMPOS_DO_CURSO:
+                if campo in valores:
+                    valor = valores[campo]
+                    atual[campo] = valor[posicao] if isinstance(valor, np.ndarray) else valor
+            novas_chaves.append((atual["campus"], atual["curso"], atual["turno"]))
+        return self._codigos_dos_cursos(novas_chaves)
+
+    def delete_candidato(self, candidato_id: int) -> bool:
+        with self._transacao() as conexao:
+            linhas = conexao.execute("SELECT curso FROM candidatos WHERE id = ?", (candidato_id,)).fetchall()
+            if not linhas:
+                return False
+            conexao.execute("DELETE FROM candidatos WHERE id = ?", (candidato_id,))
+            self._tocar_codigos([linhas[0][0]])
+        return True
+
+    def ids_do_curso(self, curso_key: Tuple[str, str, str], ordenar_por_nota: bool = False) -> np.ndarray:
+        """Ids de todos os candidatos de um curso (em ordem crescente ou por nota decrescente)."""
+        return self.filtrar_ids(curso_key=curso_key, ordenar_por_nota=ordenar_por_nota)
+
+    def filtrar_ids(
+        self,
+        curso_key: Optional[Tuple[str, str, str]] = None,
+        chamada: Optional[int] = None,
+        status: Optional[StatusCandidato] = None,
+        ordenar_por_nota: bool = False,
+    ) -> np.ndarray:
+        """
+        Retorna os ids dos candidatos que atendem a todos os critérios informados,
+        em ordem crescente ou, com `ordenar_por_nota`, por nota decrescente (empates
+        em ordem de id). A lista de um curso por nota sai pronta do índice
+        (curso, nota_final DESC, id).
+        """
+        condicoes, parametros = [], []
+        if curso_key is not None:
+            codigo = self._codigo_existente(curso_key)
+            if codigo is None:
+                return np.empty(0, dtype=np.int64)
+            condicoes.append("curso = ?")
+            parametros.append(codigo)
+        if chamada is not None:
+            condicoes.append("chamada = ?")
+            parametros.append(int(chamada))
+        if status is not None:
+            condicoes.append("status = ?")
+            parametros.append(STATUS_PARA_CODIGO[StatusCandidato(status)])
+        onde = f" WHERE {' AND '.join(condicoes)}" if condicoes else ""
+        ordem = "nota_final DESC, id" if ordenar_por_nota else "id"
+        return self._consultar_ids(f"SELECT id FROM candidatos{onde} ORDER BY {ordem}", parametros)
+
+    def _linhas(self, ids: Iterable[int], colunas: List[str], com_curso: bool = False) -> List[tuple]:
+        """Linhas dos ids informados, na ordem dada, com as colunas pedidas (qualificadas por tabela)."""
+        juncao_curso = " JOIN cursos AS k ON k.codigo = c.curso" if com_curso else ""
+        return self._consultar(
+            f"SELECT {', '.join(colunas) or 'NULL'} FROM json_each(?) AS j "
+            f"JOIN candidatos AS c ON c.id = j.value{juncao_curso} ORDER BY j.key",
+            (self._lista_json(ids),)
+        )
+
+    def get_colunas(self, ids: Iterable[int], campos: Iterable[str]) -> Dict[str, np.ndarray]:
+        """
+        Retorna as colunas pedidas para os ids informados, com a mesma
+        codificação de `InMemoryRepository.get_colunas`.
+        """
+        campos = list(campos)
+        for campo in campos:
+            if campo not in _COLUNAS:
+                raise KeyError(f"Campo desconhecido: {campo}")
+        linhas = self._linhas(ids, [f"c.{_COLUNAS[campo]}" for campo in campos])
+        valores_por_campo = list(zip(*linhas)) if linhas else [()] * len(campos)
+        return {
+            campo: np.array(valores, dtype=_TIPOS.get(campo, object))
+            for campo, valores in zip(campos, valores_por_campo)
+        }
+
+    def projetar(self, ids: Iterable[int], campos: Iterable[str]) -> List[Dict[str, Any]]:
+        """Dicionários apenas com os campos pedidos para os ids informados, na ordem dada, sem construir `Candidato`."""
+        campos = list(campos)
+        colunas = []
+        for campo in campos:
+            if campo in CAMPOS_DO_CURSO:
+                colunas.append(f"k.{campo}")
+            elif campo in _COLUNAS and campo not in ("curso_key", "pessoa"):
+                colunas.append(f"c.{_COLUNAS[campo]}")
+            else:
+                raise KeyError(f"Campo desconhecido: {campo}")
+        com_curso = any(campo in CAMPOS_DO_CURSO for campo in campos)
+        decodificadores = [(posicao, funcao) for posicao, funcao in enumerate(map(_decodificador, campos)) if funcao]
+
+        resultado = []
+        for linha in self._linhas(ids, colunas, com_curso):
+            valores = list(linha)
+            for posicao, funcao in decodificadores:
+                valores[posicao] = funcao(valores[posicao])
+            resultado.append(dict(zip(campos, valores)))
+        return resultado
+
+    def materializar(self, ids: Iterable[int]) -> List[Candidato]:
+        """Constrói objetos `Candidato` (sem revalidação) para os ids informados, na ordem dada."""
+        return [Candidato.model_construct(**dados) for dados in self.projetar(ids, Candidato.model_fields)]
+
+    # ---- vagas e chamada ----
+
+    def set_vagas_para_curso(self, curso_key: Tuple[str, str, str], vagas: Vagas):
+        """Define as vagas para um curso específico (as originais são gravadas só na primeira vez)."""
+        with self._transacao() as conexao:
+            codigo = self._codigos_dos_cursos([curso_key])[0]
+            dados = vagas.model_dump_json()
+            conexao.execute(
+                "INSERT INTO vagas (curso, original, dados) VALUES (?, 0, ?) ON CONFLICT (curso, original) DO UPDATE SET dados = excluded.dados",
+                (codigo, dados)
+            )
+            conexao.execute("INSERT INTO vagas (curso, original, dados) VALUES (?, 1, ?) ON CONFLICT (curso, original) DO NOTHING", (codigo, dados))
+            self._tocar_codigos([codigo])
+
+    def _get_vagas(self, curso_key: Tuple[str, str, str], original: bool) -> Optional[Vagas]:
+        linhas = self._consultar(
+            "SELECT v.dados FROM vagas AS v JOIN cursos AS k ON k.codigo = v.curso "
+            "WHERE k.campus IS ? AND k.curso IS ? AND k.turno IS ? AND v.original = ?",
+            (*curso_key, int(original))
+        )
+        return Vagas.model_validate_json(linhas[0][0]) if linhas else None
+
+    def get_vagas_para_curso(self, curso_key: Tuple[str, str, str]) -> Optional[Vagas]:
+        """Obtém as vagas para um curso específico."""
+        return self._get_vagas(curso_key, original=False)
+
+    def get_vagas_originais_para_curso(self, curso_key: Tuple[str, str, str]) -> Optional[Vagas]:
+        """Obtém as vagas originais para um curso específico."""
+        return self._get_vagas(curso_key, original=True)
+
+    def list_cursos_com_vagas_definidas(self) -> List[Tuple[str, str, str]]:
+        # O rowid da linha de vagas é mantido pelo upsert: a ordem é a da primeira definição
+        linhas = self._consultar(
+            "SELECT k.campus, k.curso, k.turno FROM vagas AS v JOIN cursos AS k ON k.codigo = v.curso "
+            "WHERE v.original = 0 ORDER BY v.rowid"
+        )
+        return [tuple(linha) for linha in linhas]
+
+    def increment_chamada_num(self) -> int:
+        with self._transacao():
+            chamada_num = self.get_chamada_num() + 1
+            self._gravar_estado("chamada_num", chamada_num)
+        return chamada_num
+
+    def get_chamada_num(self) -> int:
+        return self._ler_estado("chamada_num", 1)
+
+    def set_chamada_num(self, chamada_num: int) -> None:
+        self._gravar_estado("chamada_num", chamada_num)
+
+    def reset(self) -> None:
+        with self._transacao() as conexao:
+            self._limpar_candidatos()
+            conexao.execute("DELETE FROM vagas")
+            self._gravar_estado("view_context", None)
+            self._gravar_estado("chamada_num", 1)
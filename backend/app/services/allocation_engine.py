@@ -0,0 +1,311 @@
+from dataclasses import dataclass
+from heapq import heappop, heappush
+from typing import Dict, Iterable, List, Sequence, Tuple
+import copy
+import numpy as np
+from domain.enums import TipoCota, COTAS, STATUS, StatusCandidato
+from services.ranking_engine import ELEGIBILIDADE, RankingEngine
+
+_PENDENTE = STATUS.index(StatusCandidato.PENDENTE)
+_CODIGO = {cota: i for i, cota in enumerate(COTAS)}
+
+PRIORIDADE_PREENCHIMENTO = {
+    TipoCota.LB_PPI: [TipoCota.LB_Q, TipoCota.LB_PCD, TipoCota.LB_EP, TipoCota.LI_PPI, TipoCota.LI_PCD, TipoCota.LI_EP, TipoCota.AC],
+    TipoCota.LB_Q: [TipoCota.LB_PPI, TipoCota.LB_PCD, TipoCota.LB_EP, TipoCota.LI_PPI, TipoCota.LI_PCD, TipoCota.LI_EP, TipoCota.AC],
+    TipoCota.LB_PCD: [TipoCota.LB_PPI, TipoCota.LB_Q, TipoCota.LB_EP, TipoCota.LI_PPI, TipoCota.LI_Q, TipoCota.LI_EP, TipoCota.AC],
+    TipoCota.LB_EP: [TipoCota.LB_PPI, TipoCota.LB_Q, TipoCota.LB_PCD, TipoCota.LI_EP, TipoCota.LI_PPI, TipoCota.LI_Q, TipoCota.LI_PCD, TipoCota.AC],
+    TipoCota.LI_PPI: [TipoCota.LB_PPI, TipoCota.LB_Q, TipoCota.LB_PCD, TipoCota.LB_EP, TipoCota.LI_Q, TipoCota.LI_PCD, TipoCota.LI_EP, TipoCota.AC],
+    TipoCota.LI_Q: [TipoCota.LB_PPI, TipoCota.LB_Q, TipoCota.LB_PCD, TipoCota.LB_EP, TipoCota.LI_PPI, TipoCota.LI_PCD, TipoCota.LI_EP, TipoCota.AC],
+    TipoCota.LI_PCD: [TipoCota.LB_PPI, TipoCota.LB_Q, TipoCota.LB_PCD, TipoCota.LB_EP, TipoCota.LI_PPI, TipoCota.LI_Q, TipoCota.LI_EP, TipoCota.AC],
+    TipoCota.LI_EP: [TipoCota.LB_PPI, TipoCota.LB_Q, TipoCota.LB_PCD, TipoCota.LB_EP, TipoCota.LI_PPI, TipoCota.LI_Q, TipoCota.LI_PCD, TipoCota.AC],
+    TipoCota.AC: [TipoCota.LB_PPI, TipoCota.LB_Q, TipoCota.LB_PCD, TipoCota.LB_EP, TipoCota.LI_PPI, TipoCota.LI_PCD, TipoCota.LI_EP]
+}
+
+# Mesmas regras em códigos inteiros: cotas de origem de cada passo e ordem de fallback
+_ORIGENS_DO_PASSO = [np.flatnonzero(ELEGIBILIDADE[alvo]).tolist() for alvo in range(len(COTAS))]
+_FALLBACK = [[_CODIGO[cota] for cota in PRIORIDADE_PREENCHIMENTO[alvo]] for alvo in COTAS]
+
+FASES = (1, 2)
+
+
+@dataclass
+class TarefaCurso:
+    """Colunas de um curso e seu saldo de vagas, prontas para serem enviadas a outro processo."""
+    curso_key: Tuple[str, str, str]
+    ids: np.ndarray
+    notas: np.ndarray
+    cotas: np.ndarray
+    status: np.ndarray
+    opcoes: np.ndarray
+    pessoas: np.ndarray  # id denso da pessoa (CPF) de cada inscrição
+    saldo: np.ndarray
+
+
+@dataclass
+class ResultadoAlocacao:
+    ids: np.ndarray
+    vagas: np.ndarray
+    preenchidas: np.ndarray
+    saldo: np.ndarray
+
+
+class _FilaFase:
+    """
+    Candidatos de uma fase ordenados por nota, com uma fila de posições por cota
+    de origem. Os cursores dos passos e do fallback, e as posições reabertas
+    atrás deles, são mantidos entre chamadas.
+    """
+
+    def __init__(self, ids: np.ndarray, cotas: np.ndarray, status: np.ndarray, pessoas: np.ndarray, ordem: np.ndarray):
+        cotas = cotas[ordem]
+        self.ids = ids[ordem].tolist()
+        self.cotas = cotas.tolist()
+        self.pendente = (status[ordem] == _PENDENTE).tolist()
+        self.pessoas = pessoas[ordem].tolist()
+        self.filas: List[List[int]] = [np.flatnonzero(cotas == q).tolist() for q in range(len(COTAS))]
+        self.cursor_passo = [0] * len(COTAS)
+        self.cursor_fallback = [0] * len(COTAS)
+        # Heaps (por cota de origem) de posições já ultrapassadas pelos cursores que voltaram a concorrer
+        self.reabertas_passo: List[List[int]] = [[] for _ in COTAS]
+        self.reabertas_fallback: List[List[int]] = [[] for _ in COTAS]
+        self._posicao_por_id: Dict[int, int] = None
+
+    def reabrir(self, ids: Iterable[int]) -> None:
+        """Devolve às filas as posições dos ids informados que os cursores já ultrapassaram."""
+        if self._posicao_por_id is None:
+            self._posicao_por_id = {id_: posicao for posicao, id_ in enumerate(self.ids)}
+        for id_ in ids:
+            posicao = self._posicao_por_id.get(id_)
+            if posicao is None: continue
+            q = self.cotas[posicao]
+            fila_q = self.filas[q]
+            if self.pendente[posicao] and self._ultrapassada(fila_q, self.cursor_passo[q], posicao):
+                heappush(self.reabertas_passo[q], posicao)
+            if self._ultrapassada(fila_q, self.cursor_fallback[q], posicao):
+                heappush(self.reabertas_fallback[q], posicao)
+
+    def copiar(self) -> "_FilaFase":
+        """Cópia que compartilha as filas ordenadas e duplica só o que uma execução altera."""
+        copia = copy.copy(self)
+        copia.pendente = self.pendente.copy()
+        copia.cursor_passo = self.cursor_passo.copy()
+        copia.cursor_fallback = self.cursor_fallback.copy()
+        copia.reabertas_passo = [heap.copy() for heap in self.reabertas_passo]
+        copia.reabertas_fallback = [heap.copy() for heap in self.reabertas_fallback]
+        return copia
+
+    @staticmethod
+    def _ultrapassada(fila_q: List[int], cursor: int, posicao: int) -> bool:
+        return cursor >= len(fila_q) or posicao < fila_q[cursor]
+
+
+class AllocationEngine:
+    """
+    Motor de alocação de uma chamada para um curso.
+
+    A ordenação por nota é feita uma única vez por fase e cada cota de origem
+    vira uma fila de posições. Os passos percorrem as filas com cursores que só
+    avançam, pulando quem já foi selecionado, de modo que a chamada custa
+    O(N log N) no total. As regras dos 9 passos e do preenchimento por
+    PRIORIDADE_PREENCHIMENTO são as mesmas do algoritmo original; em particular,
+    o fallback considera todo candidato da cota cujo CPF ainda não foi
+    selecionado, independentemente do status. Cada inscrição traz o id denso
+    da sua pessoa, e "CPF já selecionado" é uma posição de um mapa de bytes.
+
+    O motor pode ser reaproveitado nas chamadas seguintes do curso: quem ficou
+    para trás dos cursores só volta a concorrer se a sua pessoa deixar de estar
+    selecionada (não homologação), e essas posições são devolvidas com
+    `reabrir`. A chamada seguinte retoma dos cursores e custa proporcionalmente
+    às vagas liberadas, com o mesmo resultado de recalcular do início.
+    """
+
+    def __init__(self, ids: np.ndarray, notas: np.ndarray, cotas: np.ndarray, status: np.ndarray, opcoes: np.ndarray, pessoas: np.ndarray):
+        self.fases: Dict[int, _FilaFase] = {}
+        for fase in FASES:
+            posicoes = np.flatnonzero(opcoes == fase)
+            ordem = posicoes[RankingEngine.ordenar_por_nota(notas[posicoes])]
+            self.fases[fase] = _FilaFase(ids, cotas, status, pessoas, ordem)
+
+    def executar(self, saldo: np.ndarray, fator_multiplicacao: int, selecionados: bytearray) -> ResultadoAlocacao:
+        """
+        Executa as fases 1 e 2 a partir do saldo de vagas por cota (códigos de
+        COTAS). `selecionados` é o mapa (1 = já selecionada) indexado pela
+        pessoa, compartilhado entre cursos e atualizado no lugar.
+        """
+        saldo = np.asarray(saldo, dtype=np.int64).copy()
+        ids_selecionados: List[int] = []
+        vagas_selecionadas: List[int] = []
+        preenchidas_total = np.zeros(len(COTAS), dtype=np.int64)
+
+        for fase in FASES:
+            preenchidas = self.executar_fase(fase, saldo, fator_multiplicacao, selecionados, ids_selecionados, vagas_selecionadas)
+            saldo = np.maximum(0, saldo - preenchidas)
+            preenchidas_total += preenchidas
+
+        return ResultadoAlocacao(
+            ids=np.array(ids_selecionados, dtype=np.int64),
+            vagas=np.array(vagas_selecionadas, dtype=np.int8),
+            preenchidas=preenchidas_total,
+            saldo=saldo,
+        )
+
+    def executar_fase(self, fase: int, saldo: np.ndarray, fator_multiplicacao: int, selecionados: bytearray, ids_selecionados: List[int], vagas_selecionadas: List[int]) -> np.ndarray:
+        """Executa uma única fase, acrescentando os selecionados às listas dadas. Retorna as vagas preenchidas por cota."""
+        ofertadas = (np.asarray(saldo, dtype=np.int64) * fator_multiplicacao).astype(np.int64)
+        return self._alocar_fase(self.fases[fase], ofertadas.tolist(), selecionados, ids_selecionados, vagas_selecionadas)
+
+    def copiar(self) -> "AllocationEngine":
+        """Motor independente no mesmo estado, para simular uma execução sem alterar este."""
+        motor = copy.copy(self)
+        motor.fases = {fase: fila.copiar() for fase, fila in self.fases.items()}
+        return motor
+
+    def reabrir(self, ids: Iterable[int]) -> None:
+        """Informa os ids do curso cuja pessoa deixou de estar selecionada desde a última execução."""
+        ids = list(ids)
+        for fila in self.fases.values():
+            fila.reabrir(ids)
+
+    @staticmethod
+    def _alocar_fase(fila: _FilaFase, ofertadas: List[int], selecionados: bytearray, ids_selecionados: List[int], vagas_selecionadas: List[int]) -> np.ndarray:
+        pessoas, pendente, filas = fila.pessoas, fila.pendente, fila.filas
+        cursor_passo, cursor_fallback = fila.cursor_passo, fila.cursor_fallback
+        reabertas_passo, reabertas_fallback = fila.reabertas_passo, fila.reabertas_fallback
+        preenchidas = [0] * len(COTAS)
+
+        def selecionar(posicao: int, alvo: int) -> None:
+            selecionados[pessoas[posicao]] = 1
+            pendente[posicao] = False
+            ids_selecionados.append(fila.ids[posicao])
+            vagas_selecionadas.append(alvo)
+
+        for alvo in range(len(COTAS)):
+            vagas = ofertadas[alvo]
+            if vagas <= 0: continue
+
+            # Quem é selecionado deixa de ser elegível, então os cursores o pulam na próxima busca
+            origens = _ORIGENS_DO_PASSO[alvo]
+            while preenchidas[alvo] < vagas:
+                melhor_posicao = -1
+                for q in origens:
+                    fila_q, c = filas[q], cursor_passo[q]
+                    while c < len(fila_q) and (not pendente[fila_q[c]] or selecionados[pessoas[fila_q[c]]]):
+                        c += 1
+                    cursor_passo[q] = c
+                    posicao = fila_q[c] if c < len(fila_q) else -1
+                    reabertas = reabertas_passo[q]
+                    while reabertas and (not pendente[reabertas[0]] or selecionados[pessoas[reabertas[0]]]):
+                        heappop(reabertas)
+                    if reabertas and (posicao < 0 or reabertas[0] < posicao):
+                        posicao = reabertas[0]
+                    if posicao >= 0 and (melhor_posicao < 0 or posicao < melhor_posicao):
+                        melhor_posicao = posicao
+                if melhor_posicao < 0: break
+                selecionar(melhor_posicao, alvo)
+                preenchidas[alvo] += 1
+
+            for q in _FALLBACK[alvo]:
+                if preenchidas[alvo] >= vagas: break
+                fila_q, c, reabertas = filas[q], cursor_fallback[q], reabertas_fallback[q]
+                while preenchidas[alvo] < vagas:
+                    while c < len(fila_q) and selecionados[pessoas[fila_q[c]]]:
+                        c += 1
+                    while reabertas and selecionados[pessoas[reabertas[0]]]:
+                        heappop(reabertas)
+                    if reabertas and (c >= len(fila_q) or reabertas[0] < fila_q[c]):
+                        posicao = heappop(reabertas)
+                    elif c < len(fila_q):
+                        posicao = fila_q[c]
+                        c += 1
+                    else:
+                        break
+                    selecionar(posicao, alvo)
+                    preenchidas[alvo] += 1
+                cursor_fallback[q] = c
+
+        return np.array(preenchidas, dtype=np.int64)
+
+
+def executar_cursos_em_ordem(tarefas: List[TarefaCurso], fator_multiplicacao: int, selecionados: bytearray) -> List[ResultadoAlocacao]:
+    """
+    Executa a chamada de cada curso na ordem dada, compartilhando o mapa de
+    pessoas selecionadas. É uma função de módulo para poder rodar em um processo do pool.
+    """
+    resultados = []
+    for tarefa in tarefas:
+        motor = AllocationEngine(tarefa.ids, tarefa.notas, tarefa.cotas, tarefa.status, tarefa.opcoes, tarefa.pessoas)
+        resultados.append(motor.executar(tarefa.saldo, fator_multiplicacao, selecionados))
+    return resultados
+
+
+def executar_cursos_por_fase(tarefas: List[TarefaCurso], fator_multiplicacao: int, selecionados: bytearray) -> List[ResultadoAlocacao]:
+    """
+    Alocação global: executa a fase 1 de todos os cursos e só depois a fase 2,
+    na ordem dada, compartilhando o mapa de pessoas selecionadas. Assim a 2ª
+    opção de uma pessoa só concorre depois que todas as 1ª opções foram
+    atendidas, e o resultado não depende da ordem em que os cursos foram
+    configurados (cada pessoa tem no máximo uma inscrição por fase).
+    """
+    motores = [
+        AllocationEngine(tarefa.ids, tarefa.notas, tarefa.cotas, tarefa.status, tarefa.opcoes, tarefa.pessoas)
+        for tarefa in tarefas
+    ]
+    saldos = [np.asarray(tarefa.saldo, dtype=np.int64).copy() for tarefa in tarefas]
+    preenchidas_total = [np.zeros(len(COTAS), dtype=np.int64) for _ in tarefas]
+    ids_selecionados: List[List[int]] = [[] for _ in tarefas]
+    vagas_selecionadas: List[List[int]] = [[] for _ in tarefas]
+
+    for fase in FASES:
+        for i, motor in enumerate(motores):
+            if not saldos[i].any(): continue
+            preenchidas = motor.executar_fase(fase, saldos[i], fator_multiplicacao, selecionados, ids_selecionados[i], vagas_selecionadas[i])
+            saldos[i] = np.maximum(0, saldos[i] - preenchidas)
+            preenchidas_total[i] += preenchidas
+
+    return [
+        ResultadoAlocacao(
+            ids=np.array(ids_selecionados[i], dtype=np.int64),
+            vagas=np.array(vagas_selecionadas[i], dtype=np.int8),
+            preenchidas=preenchidas_total[i],
+            saldo=saldos[i],
+        )
+        for i in range(len(tarefas))
+    ]
+
+
+def agrupar_cursos_dependentes(pessoas_por_curso: Sequence[np.ndarray], selecionados: bytearray) -> List[List[int]]:
+    """
+    Agrupa os cursos (por índice) em componentes que compartilham alguma pessoa
+    ainda não selecionada. Cursos de componentes diferentes não interferem entre
+    si e podem ser processados em paralelo; dentro de um componente, a ordem
+    original dos cursos é mantida.
+    """
+    if not pessoas_por_curso:
+        return []
+    pai = list(range(len(pessoas_por_curso)))
+
+    def raiz(i: int) -> int:
+        while pai[i] != i:
+            pai[i] = pai[pai[i]]
+            i = pai[i]
+        return i
+
+    # Pares (pessoa livre, curso) ordenados por pessoa: cada pessoa liga os seus cursos ao primeiro deles
+    pessoas = np.concatenate(pessoas_por_curso).astype(np.int64)
+    cursos = np.repeat(np.arange(len(pessoas_por_curso)), [len(p) for p in pessoas_por_curso])
+    livres = np.frombuffer(selecionados, dtype=np.uint8)[pessoas] == 0
+    pessoas, cursos = pessoas[livres], cursos[livres]
+    if pessoas.size == 0:
+        # Sem pessoas livres (ou sem candidatos), nenhum curso depende de outro
+        return [[indice] for indice in range(len(pessoas_por_curso))]
+    ordem = np.lexsort((cursos, pessoas))
+    pessoas, cursos = pessoas[ordem], cursos[ordem]
+    inicio_da_pessoa = np.flatnonzero(np.r_[True, pessoas[1:] != pessoas[:-1]])
+    primeiro_curso = np.repeat(cursos[inicio_da_pessoa], np.diff(np.r_[inicio_da_pessoa, pessoas.size]))
+    for indice, outro in set(zip(cursos[cursos != primeiro_curso].tolist(), primeiro_curso[cursos != primeiro_curso].tolist())):
+        pai[raiz(indice)] = raiz(outro)
+
+    componentes: Dict[int, List[int]] = {}
+    for indice in range(len(pessoas_por_curso)):
+        componentes.setdefault(raiz(indice), []).append(indice)
+    return list(componentes.values())
@@ -1,10 +1,28 @@
-from typing import List, Dict, Any, Tuple
+from typing import Callable, Iterable, Iterator, List, Dict, Any, Optional, Tuple
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+import base64
+import json
+import os
+import time
+import numpy as np
 from domain.entities import (
-    Candidato, Vagas, ChamadaResult, CandidatoCreate
+    Candidato, Vagas, ChamadaResult, CandidatoCreate, ChamadaCursoResumo, ChamadaLoteResult,
+    CenarioSimulado, SimulacaoResult
 )
-from domain.enums import TipoCota, StatusCandidato
-from repositories.in_memory_repository import InMemoryRepository
+from domain.enums import TipoCota, StatusCandidato, OrdemCandidatos, COTAS
+from repositories.in_memory_repository import InMemoryRepository, CAMPOS_CLASSIFICACAO
+from repositories.codificacao import chave_cpf
+from services.ranking_engine import RankingEngine, ELEGIBILIDADE
+from services.allocation_engine import (
+    AllocationEngine, ResultadoAlocacao, TarefaCurso, PRIORIDADE_PREENCHIMENTO,
+    executar_cursos_em_ordem, executar_cursos_por_fase, agrupar_cursos_dependentes
+)
+from core.config import settings
+from core.cache import LRUCache
+from core.metrics import metricas
+from repositories.persistence import RepositoryPersistence
 from core.exceptions import (
     NotFoundException, ValidationException
 )
@@ -15,86 +33,206 @@ class ChamadaService:
         5: TipoCota.LB_EP, 6: TipoCota.LB_PCD, 7: TipoCota.LB_Q, 8: TipoCota.LB_PPI
     }
 
-    PRIORIDADE_PREENCHIMENTO = {
-        TipoCota.LB_PPI: [TipoCota.LB_Q, TipoCota.LB_PCD, TipoCota.LB_EP, TipoCota.LI_PPI, TipoCota.LI_PCD, TipoCota.LI_EP, TipoCota.AC],
-        TipoCota.LB_Q: [TipoCota.LB_PPI, TipoCota.LB_PCD, TipoCota.LB_EP, TipoCota.LI_PPI, TipoCota.LI_PCD, TipoCota.LI_EP, TipoCota.AC],
-        TipoCota.LB_PCD: [TipoCota.LB_PPI, TipoCota.LB_Q, TipoCota.LB_EP, TipoCota.LI_PPI, TipoCota.LI_Q, TipoCota.LI_EP, TipoCota.AC],
-        TipoCota.LB_EP: [TipoCota.LB_PPI, TipoCota.LB_Q, TipoCota.LB_PCD, TipoCota.LI_EP, TipoCota.LI_PPI, TipoCota.LI_Q, TipoCota.LI_PCD, TipoCota.AC],
-        TipoCota.LI_PPI: [TipoCota.LB_PPI, TipoCota.LB_Q, TipoCota.LB_PCD, TipoCota.LB_EP, TipoCota.LI_Q, TipoCota.LI_PCD, TipoCota.LI_EP, TipoCota.AC],
-        TipoCota.LI_Q: [TipoCota.LB_PPI, TipoCota.LB_Q, TipoCota.LB_PCD, TipoCota.LB_EP, TipoCota.LI_PPI, TipoCota.LI_PCD, TipoCota.LI_EP, TipoCota.AC],
-        TipoCota.LI_PCD: [TipoCota.LB_PPI, TipoCota.LB_Q, TipoCota.LB_PCD, TipoCota.LB_EP, TipoCota.LI_PPI, TipoCota.LI_Q, TipoCota.LI_EP, TipoCota.AC],
-        TipoCota.LI_EP: [TipoCota.LB_PPI, TipoCota.LB_Q, TipoCota.LB_PCD, TipoCota.LB_EP, TipoCota.LI_PPI, TipoCota.LI_Q, TipoCota.LI_PCD, TipoCota.AC],
-        TipoCota.AC: [TipoCota.LB_PPI, TipoCota.LB_Q, TipoCota.LB_PCD, TipoCota.LB_EP, TipoCota.LI_PPI, TipoCota.LI_PCD, TipoCota.LI_EP]
-    }
+    PRIORIDADE_PREENCHIMENTO = PRIORIDADE_PREENCHIMENTO
 
     COTA_PARA_PASSO = {v: k + 1 for k, v in INDICE_PARA_COTA.items()}
 
-    def __init__(self, repository: InMemoryRepository):
+    def __init__(self, repository: InMemoryRepository, cache: LRUCache = None, persistencia: RepositoryPersistence = None):
         self.repo = repository
+        self.cache = cache if cache is not None else LRUCache(settings.cache_max_itens)
+        self.persistencia = persistencia
+
+    def _salvar_snapshot(self) -> None:
+        """Grava um snapshot do repositório ao fim das etapas do ciclo de chamadas (se a persistência estiver ativa)."""
+        if self.persistencia is not None:
+            self.persistencia.salvar_snapshot(self.repo)
+
+    def _chave_cache(self, tipo: str, curso_key: Tuple[str, str, str], fator_multiplicacao: int = None) -> Tuple:
+        """Chave de memorização de um resultado do curso no estado (versão) atual."""
+        return (tipo, curso_key, self.repo.versao_do_curso(curso_key), fator_multiplicacao)
 
     def carregar_candidatos(self, candidatos: List[CandidatoCreate]) -> int:
         total = 0
         for candidato_data in candidatos:
-            self.repo.add_candidato(Candidato(**candidato_data.model_dump()))
+            self.repo.add_candidato(Candidato.model_construct(**candidato_data.model_dump()))
             total += 1
         return total
 
+    def carregar_colunas_candidatos(self, colunas: Dict[str, Any]) -> int:
+        """Inclui um lote já validado no formato colunar de `FileService.convert_dataframe`."""
+        return len(self.repo.add_candidatos_em_lote(colunas))
+
+    def carregar_candidatos_em_lotes(self, lotes: Iterable[Dict[str, Any]]) -> int:
+        """
+        Substitui os candidatos carregados pelos lotes colunares recebidos,
+        incluídos no repositório à medida que chegam. Se algum lote falhar, o
+        repositório é limpo para não ficar com uma carga parcial.
+        """
+        # A carga não passa pelo diário: ao final, com sucesso ou não, um snapshot registra o resultado
+        with self.persistencia.sem_registro(self.repo) if self.persistencia is not None else nullcontext():
+            try:
+                self.repo.reset()
+                total = 0
+                try:
+                    for lote in lotes:
+                        with metricas.medir("upload.carga"):
+                            total += self.carregar_colunas_candidatos(lote)
+                except Exception:
+                    self.repo.reset()
+                    raise
+            finally:
+                self._salvar_snapshot()
+        return total
+
+    def resumir_candidatos(self) -> Dict[str, Any]:
+        """
+        Estatísticas agregadas dos candidatos carregados: total por cota, faixa
+        de notas e, por curso (campus/curso/turno), total, total por cota e faixa
+        de notas. Calculadas sobre as colunas, sem materializar candidatos.
+        """
+        ids = self.repo.filtrar_ids()
+        colunas = self.repo.get_colunas(ids, ["curso_key", "cota", "nota_final"])
+        cursos, cotas, notas = colunas["curso_key"], colunas["cota"], colunas["nota_final"]
+
+        def _faixa(valores: np.ndarray) -> Tuple[Any, Any]:
+            validas = valores[~np.isnan(valores)]
+            if not validas.size:
+                return None, None
+            return float(validas.min()), float(validas.max())
+
+        def _por_cota(contagem: np.ndarray) -> Dict[TipoCota, int]:
+            return {cota: int(total) for cota, total in zip(COTAS, contagem.tolist())}
+
+        nota_minima, nota_maxima = _faixa(notas)
+        resumo_cursos = []
+        if ids.size:
+            ordem = np.argsort(cursos, kind="stable")
+            cursos_ordenados = cursos[ordem]
+            inicios = np.flatnonzero(np.r_[True, cursos_ordenados[1:] != cursos_ordenados[:-1]])
+            for inicio, fim in zip(inicios.tolist(), np.r_[inicios[1:], ids.size].tolist()):
+                linhas = ordem[inicio:fim]
+                campus, curso, turno = self.repo.get_curso(int(cursos_ordenados[inicio]))
+                minima, maxima = _faixa(notas[linhas])
+                resumo_cursos.append({
+                    "campus": campus, "curso": curso, "turno": turno,
+                    "total": int(linhas.size),
+                    "por_cota": _por_cota(np.bincount(cotas[linhas], minlength=len(COTAS))),
+                    "nota_minima": minima, "nota_maxima": maxima,
+                })
+
+        return {
+            "por_cota": _por_cota(np.bincount(cotas, minlength=len(COTAS))),
+            "nota_minima": nota_minima,
+            "nota_maxima": nota_maxima,
+            "cursos": resumo_cursos,
+        }
+
+    def listar_candidatos_paginado(
+        self, offset: int, limit: int, campos: List[str], curso_key: Tuple[str, str, str] = None,
+        cursor: Optional[str] = None, chamada: Optional[int] = None, status: Optional[StatusCandidato] = None,
+        cota: Optional[TipoCota] = None, vaga_selecionada: Optional[TipoCota] = None,
+        ordem: OrdemCandidatos = OrdemCandidatos.ID,
+    ) -> Dict[str, Any]:
+        """
+        Página dos candidatos que atendem aos filtros, apenas com os campos pedidos.
+        A página começa em `offset` ou, com `cursor` (o `proximo_cursor` da página
+        anterior), logo depois do último candidato entregue, mesmo que a listagem
+        tenha mudado entre as páginas.
+        """
+        self._validar_campos(campos)
+        ids, notas = self._indice_listagem((curso_key, chamada, status, cota, vaga_selecionada), ordem)
+        inicio = self._posicao_do_cursor(cursor, ids, notas) if cursor else min(offset, ids.size)
+        fim = min(inicio + limit, ids.size)
+        return {
+            "total": int(ids.size),
+            "offset": inicio,
+            "limit": limit,
+            "campos": campos,
+            "itens": self.repo.projetar(ids[inicio:fim], campos),
+            "proximo_cursor": self._codificar_cursor(ids, notas, fim - 1) if fim < ids.size else None,
+        }
+
+    @staticmethod
+    def _validar_campos(campos: List[str]) -> None:
+        desconhecidos = [campo for campo in campos if campo not in Candidato.model_fields]
+        if desconhecidos:
+            raise ValidationException(f"Campos desconhecidos: {', '.join(desconhecidos)}")
+
+    def _indice_listagem(self, filtros: Tuple, ordem: OrdemCandidatos) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """
+        Ids filtrados e ordenados de uma listagem (com as notas ao lado, na ordem
+        por nota), memorizados na versão atual do repositório: as páginas
+        seguintes e as listagens repetidas não refazem o filtro nem a ordenação.
+        """
+        chave = ("listagem", filtros, ordem, self.repo.versao_global())
+        return self.cache.obter_ou_calcular(chave, lambda: self._calcular_listagem(filtros, ordem))
+
+    def _calcular_listagem(self, filtros: Tuple, ordem: OrdemCandidatos) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        curso_key, chamada, status, cota, vaga_selecionada = filtros
+        por_nota = ordem == OrdemCandidatos.NOTA
+        ids = self.repo.filtrar_ids(curso_key=curso_key, chamada=chamada, status=status, ordenar_por_nota=por_nota)
+        campos = [campo for campo, valor in (("cota", cota), ("vaga_selecionada", vaga_selecionada)) if valor is not None]
+        colunas = self.repo.get_colunas(ids, campos + (["nota_final"] if por_nota else []))
+        manter = np.ones(ids.size, dtype=bool)
+        for campo, valor in (("cota", cota), ("vaga_selecionada", vaga_selecionada)):
+            if valor is not None:
+                manter &= colunas[campo] == COTAS.index(TipoCota(valor))
+        return ids[manter], colunas["nota_final"][manter] if por_nota else None
+
+    @staticmethod
+    def _codificar_cursor(ids: np.ndarray, notas: Optional[np.ndarray], posicao: int) -> str:
+        """Cursor opaco com a chave de ordenação do último candidato entregue: [id] ou [nota, id]."""
+        chave = [int(ids[posicao])] if notas is None else [float(notas[posicao]), int(ids[posicao])]
+        return base64.urlsafe_b64encode(json.dumps(chave).encode()).decode().rstrip("=")
+
+    @staticmethod
+    def _posicao_do_cursor(cursor: str, ids: np.ndarray, notas: Optional[np.ndarray]) -> int:
+        """Posição, na listagem ordenada, do primeiro candidato depois da chave do cursor (busca binária)."""
+        try:
+            chave = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+            if notas is None:
+                (ultimo_id,) = chave
+                return int(np.searchsorted(ids, int(ultimo_id), side="right"))
+            nota, ultimo_id = chave
+            nota, ultimo_id = float(nota), int(ultimo_id)
+        except (ValueError, TypeError, IndexError, KeyError):
+            raise ValidationException("Cursor inválido para esta listagem.")
+        # Nota decrescente e, nas notas iguais, id crescente
+        negativas = -notas
+        inicio = int(np.searchsorted(negativas, -nota, side="left"))
+        fim = int(np.searchsorted(negativas, -nota, side="right"))
+        return inicio + int(np.searchsorted(ids[inicio:fim], ultimo_id, side="right"))
+
     def aplicar_filtro_candidatos(self, campus: str, curso: str, turno: str) -> int:
-        if not self.repo.list_candidatos():
+        if not self.repo.total_candidatos():
             raise ValidationException("Nenhum candidato carregado para aplicar o filtro.")
         self.repo.set_view_context(campus, curso, turno)
-        candidatos_no_contexto = [
-            c for c in self.repo.list_candidatos()
-            if c.campus == campus and c.curso == curso and c.turno == turno
-        ]
-        if not candidatos_no_contexto:
+        ids_no_contexto = self.repo.ids_do_curso((campus, curso, turno))
+        if not len(ids_no_contexto):
             raise NotFoundException(f"Nenhum candidato encontrado para o filtro: Campus='{campus}', Curso='{curso}', Turno='{turno}'.")
-        return len(candidatos_no_contexto)
+        return len(ids_no_contexto)
 
-    def definir_vagas(self, vagas: Vagas) -> None:
+    def _curso_da_operacao(self, curso_key: Optional[Tuple[str, str, str]], mensagem: str) -> Tuple[str, str, str]:
+        """
+        Curso informado na operação ou, sem ele, o do filtro aplicado. O filtro é
+        um só para todos os clientes do repositório (no SQLite, para todos os
+        processos), então clientes concorrentes devem informar o curso.
+        """
+        if curso_key is not None: return curso_key
         context = self.repo.get_view_context()
-        if not context:
-            raise ValidationException("Filtro de curso não foi aplicado. Aplique um filtro antes de definir as vagas.")
-        curso_key = (context['campus'], context['curso'], context['turno'])
-        self.repo.set_vagas_para_curso(curso_key, vagas)
-        if self.repo.get_chamada_num() > 1: return
-        self.repo.chamada_num = 1
-
-    def _ordenar_por_nota(self, candidatos: List[Candidato]) -> List[Candidato]:
-        return sorted(candidatos, key=lambda c: c.nota_final, reverse=True)
-
-    def _filtrar_candidatos_para_passo(self, candidatos_do_curso: List[Candidato], passo: int, cpfs_ja_selecionados: set, ignore_status: bool = False) -> List[Candidato]:
-        if ignore_status:
-            candidatos_elegiveis = [
-                c for c in candidatos_do_curso
-                if c.cpf not in cpfs_ja_selecionados
-            ]
-        else:
-            candidatos_elegiveis = [
-                c for c in candidatos_do_curso
-                if c.status == StatusCandidato.PENDENTE and c.cpf not in cpfs_ja_selecionados
-            ]
-
-        if passo == 1: return candidatos_elegiveis
-        elif passo == 2: return [c for c in candidatos_elegiveis if c.cota != TipoCota.AC]
-        elif passo == 3: return [c for c in candidatos_elegiveis if c.cota in [TipoCota.LI_PCD, TipoCota.LB_PCD]]
-        elif passo == 4: return [c for c in candidatos_elegiveis if c.cota in [TipoCota.LI_Q, TipoCota.LB_Q]]
-        elif passo == 5: return [c for c in candidatos_elegiveis if c.cota in [TipoCota.LI_PPI, TipoCota.LB_PPI]]
-        elif passo == 6: return [c for c in candidatos_elegiveis if c.cota in [TipoCota.LB_EP, TipoCota.LB_PCD, TipoCota.LB_Q, TipoCota.LB_PPI]]
-        elif passo == 7: return [c for c in candidatos_elegiveis if c.cota == TipoCota.LB_PCD]
-        elif passo == 8: return [c for c in candidatos_elegiveis if c.cota == TipoCota.LB_Q]
-        elif passo == 9: return [c for c in candidatos_elegiveis if c.cota == TipoCota.LB_PPI]
-        else: raise ValidationException(f"Passo {passo} inválido")
-
-    def _executar_passo(self, cota_alvo_do_passo: TipoCota, vagas_ofertadas: int, chamada_num: int, candidatos_para_passo: List[Candidato], cpfs_ja_selecionados_nesta_chamada: set) -> int:
-        vagas_preenchidas = 0
-        for candidato in candidatos_para_passo:
-            if vagas_preenchidas >= vagas_ofertadas: break
-            if candidato.cpf not in cpfs_ja_selecionados_nesta_chamada:
-                self.repo.update_candidato(candidato.id, {"status": StatusCandidato.SELECIONADO, "vaga_selecionada": cota_alvo_do_passo, "chamada": chamada_num})
-                cpfs_ja_selecionados_nesta_chamada.add(candidato.cpf)
-                vagas_preenchidas += 1
-        return vagas_preenchidas
+        if not context: raise ValidationException(mensagem)
+        return (context['campus'], context['curso'], context['turno'])
+
+    def definir_vagas(self, vagas: Vagas, curso_key: Optional[Tuple[str, str, str]] = None) -> None:
+        curso_key = self._curso_da_operacao(curso_key, "Filtro de curso não foi aplicado. Informe o curso ou aplique um filtro antes de definir as vagas.")
+        with self.repo.transacao():
+            self.repo.set_vagas_para_curso(curso_key, vagas)
+            if self.repo.get_chamada_num() > 1: return
+            self.repo.set_chamada_num(1)
+
+    def _pessoas_selecionadas(self) -> bytearray:
+        """Mapa de bytes (1 = já selecionada em algum curso) indexado pela pessoa, mantido pelo repositório."""
+        return bytearray(self.repo.pessoas_selecionadas())
 
     def _ajustar_saldo_vagas(self, saldo_vagas: List[int]) -> List[int]:
         saldo_ajustado = saldo_vagas.copy()
@@ -104,131 +242,325 @@ class ChamadaService:
                 saldo_ajustado[i+1] = 0
         return saldo_ajustado
 
-    def _calcular_classificacao_por_cota(self, candidatos_do_curso: List[Candidato]) -> Dict[str, Dict[str, int]]:
-        classificacoes: Dict[str, Dict[str, int]] = defaultdict(dict)
-
-        ELIGIBILITY_FOR_RANKING = {
-            TipoCota.AC: [TipoCota.AC, TipoCota.LI_EP, TipoCota.LI_PCD, TipoCota.LI_Q, TipoCota.LI_PPI, TipoCota.LB_EP, TipoCota.LB_PCD, TipoCota.LB_Q, TipoCota.LB_PPI],
-            TipoCota.LI_EP: [TipoCota.LI_EP, TipoCota.LI_PCD, TipoCota.LI_Q, TipoCota.LI_PPI, TipoCota.LB_EP, TipoCota.LB_PCD, TipoCota.LB_Q, TipoCota.LB_PPI],
-            TipoCota.LI_PCD: [TipoCota.LI_PCD, TipoCota.LB_PCD],
-            TipoCota.LI_Q: [TipoCota.LI_Q, TipoCota.LB_Q],
-            TipoCota.LI_PPI: [TipoCota.LI_PPI, TipoCota.LB_PPI],
-            TipoCota.LB_EP: [TipoCota.LB_EP, TipoCota.LB_PCD, TipoCota.LB_Q, TipoCota.LB_PPI],
-            TipoCota.LB_PCD: [TipoCota.LB_PCD],
-            TipoCota.LB_Q: [TipoCota.LB_Q],
-            TipoCota.LB_PPI: [TipoCota.LB_PPI],
-        }
+    def _calcular_classificacao_por_cota(self, ids_do_curso: np.ndarray) -> np.ndarray:
+        """Classificação (n, 9) dos candidatos do curso em cada cota, na ordem dos ids."""
+        colunas = self.repo.get_colunas(ids_do_curso, ["nota_final", "cota"])
+        return RankingEngine.classificar(colunas["nota_final"], colunas["cota"])
 
-        for target_cota, eligible_source_cotas in ELIGIBILITY_FOR_RANKING.items():
-            candidatos_para_ranking = sorted([c for c in candidatos_do_curso if c.cota in eligible_source_cotas], key=lambda c: c.nota_final, reverse=True)
-            class_key = f"class_{target_cota.value}"
-            for i, cand in enumerate(candidatos_para_ranking):
-                if cand.cpf not in classificacoes: classificacoes[cand.cpf] = {}
-                classificacoes[cand.cpf][class_key] = i + 1
-                
-        return classificacoes
-
-    def gerar_chamada(self, fator_multiplicacao: int = 1) -> ChamadaResult:
-        if not self.repo.list_candidatos(): raise NotFoundException("Nenhum candidato carregado.")
+    def classificar_todos_os_cursos(self) -> int:
+        """
+        Calcula e grava as classificações por cota de todos os cursos do arquivo
+        carregado em uma única passada agrupada. Retorna o número de candidatos.
+        """
+        ids = self.repo.filtrar_ids()
+        colunas = self.repo.get_colunas(ids, ["nota_final", "cota", "curso_key"])
+        classificacoes = RankingEngine.classificar(colunas["nota_final"], colunas["cota"], colunas["curso_key"])
+        self._gravar_classificacoes(ids, classificacoes)
+        return len(ids)
+
+    def gerar_chamada(self, fator_multiplicacao: int = 1, incluir_candidatos: bool = True, curso_key: Optional[Tuple[str, str, str]] = None) -> ChamadaResult:
+        """
+        Gera a chamada atual para `curso_key` (padrão: o curso do filtro aplicado).
+        Leitura da chamada e dos já selecionados, alocação e gravação formam uma
+        única transação do repositório.
+        """
+        if not self.repo.total_candidatos(): raise NotFoundException("Nenhum candidato carregado.")
+        curso_key = self._curso_da_operacao(curso_key, "Nenhum curso foi selecionado. Informe o curso ou aplique um filtro primeiro.")
+
+        with self.repo.transacao():
+            chamada_num = self.repo.get_chamada_num()
+            with metricas.medir("chamada.selecionados"):
+                pessoas_ja_selecionadas = self._pessoas_selecionadas()
+
+            motor = self._retirar_motor(curso_key)
+            if motor is not None:
+                # Classificações e filas do curso não mudaram desde a última chamada: só as vagas liberadas são preenchidas
+                metricas.incrementar("chamadas_geradas_total", modo="incremental")
+                self._executar_motor(curso_key, motor, pessoas_ja_selecionadas, fator_multiplicacao)
+            else:
+                metricas.incrementar("chamadas_geradas_total", modo="completo")
+                # Já por nota decrescente: a ordenação feita pelos motores passa a custar O(N)
+                with metricas.medir("chamada.filtro_curso"):
+                    ids_do_curso = self.repo.ids_do_curso(curso_key, ordenar_por_nota=True)
+                with metricas.medir("chamada.classificacao"):
+                    classificacoes = self._calcular_classificacao_por_cota(ids_do_curso)
+
+                if len(ids_do_curso):
+                    motor = self._processar_chamada_para_curso(curso_key, ids_do_curso, pessoas_ja_selecionadas, fator_multiplicacao)
+
+                with metricas.medir("chamada.gravacao_classificacoes"):
+                    self._gravar_classificacoes(ids_do_curso, classificacoes)
+            self._guardar_motor(curso_key, motor)
+            with metricas.medir("chamada.snapshot"):
+                self._salvar_snapshot()
+
+            with metricas.medir("chamada.montagem_resultado"):
+                return self._montar_resultado_para_curso(curso_key, chamada_num, fator_multiplicacao, incluir_candidatos)
+
+    def _retirar_motor(self, curso_key: Tuple[str, str, str]) -> AllocationEngine:
+        """Motor de alocação guardado pela última chamada do curso, se o curso não mudou desde então."""
+        if not settings.chamada_incremental: return None
+        return self.cache.retirar(self._chave_cache("motor_alocacao", curso_key))
+
+    def _guardar_motor(self, curso_key: Tuple[str, str, str], motor: AllocationEngine) -> None:
+        """Guarda o motor na versão atual do curso, depois de gravadas as alterações feitas com ele."""
+        if motor is not None and settings.chamada_incremental:
+            self.cache.guardar(self._chave_cache("motor_alocacao", curso_key), motor)
+
+    def _gravar_classificacoes(self, ids: np.ndarray, classificacoes: np.ndarray) -> None:
+        """Grava as nove colunas class_* de todos os candidatos com uma única atualização em lote."""
+        self.repo.update_many(ids, {campo: classificacoes[:, i] for i, campo in enumerate(CAMPOS_CLASSIFICACAO)})
+
+    def _construir_motor(self, ids_do_curso: np.ndarray) -> AllocationEngine:
+        colunas = self.repo.get_colunas(ids_do_curso, ["nota_final", "cota", "status", "opcao", "pessoa"])
+        return AllocationEngine(ids_do_curso, colunas["nota_final"], colunas["cota"], colunas["status"], colunas["opcao"], colunas["pessoa"])
+
+    def _processar_chamada_para_curso(self, curso_key, ids_do_curso, pessoas_ja_selecionadas, fator_multiplicacao) -> AllocationEngine:
+        if not self.repo.get_vagas_para_curso(curso_key): return None
+
+        with metricas.medir("chamada.preparacao_motor"):
+            motor = self._construir_motor(ids_do_curso)
+        self._executar_motor(curso_key, motor, pessoas_ja_selecionadas, fator_multiplicacao)
+        return motor
+
+    def _executar_motor(self, curso_key, motor: AllocationEngine, pessoas_ja_selecionadas: bytearray, fator_multiplicacao: int) -> None:
+        vagas_obj = self.repo.get_vagas_para_curso(curso_key)
+        saldo = np.array([getattr(vagas_obj, cota.value, 0) for cota in COTAS])
+        with metricas.medir("chamada.alocacao"):
+            resultado = motor.executar(saldo, fator_multiplicacao, pessoas_ja_selecionadas)
+        metricas.incrementar("candidatos_selecionados_total", len(resultado.ids))
+        with metricas.medir("chamada.gravacao_resultado"):
+            self._aplicar_resultado_alocacao(curso_key, resultado, self.repo.get_chamada_num())
+
+    def simular_chamada(self, fatores: List[int], vagas_alternativas: Optional[List[Vagas]] = None) -> SimulacaoResult:
+        """
+        Avalia, sem alterar o repositório, a chamada do curso selecionado para
+        cada combinação de fator de multiplicação e saldo de vagas (as vagas
+        atuais do curso quando `vagas_alternativas` não é informado). Cada
+        cenário traz o mesmo resumo que `gerar_chamada` retornaria naquele caso.
+        A ordenação do curso é feita uma única vez: cada cenário executa uma
+        cópia do motor, que compartilha as filas ordenadas.
+        """
+        if not self.repo.total_candidatos(): raise NotFoundException("Nenhum candidato carregado.")
         view_context = self.repo.get_view_context()
         if not view_context: raise ValidationException("Nenhum curso foi selecionado. Aplique um filtro primeiro.")
+        curso_key = (view_context['campus'], view_context['curso'], view_context['turno'])
 
-        chamada_num = self.repo.get_chamada_num()
-        cpfs_ja_selecionados = {c.cpf for c in self.repo.list_candidatos() if c.status == StatusCandidato.SELECIONADO}
-        
-        candidatos_por_curso = defaultdict(list)
-        for cand in self.repo.list_candidatos():
-            if (cand.campus == view_context['campus'] and cand.curso == view_context['curso'] and cand.turno == view_context['turno']):
-                candidatos_por_curso[(cand.campus, cand.curso, cand.turno)].append(cand)
+        if not vagas_alternativas:
+            vagas_atuais = self.repo.get_vagas_para_curso(curso_key)
+            if not vagas_atuais: raise ValidationException("O curso não tem vagas definidas. Defina as vagas ou informe as vagas a simular.")
+            vagas_alternativas = [vagas_atuais]
+        if not fatores: raise ValidationException("Informe ao menos um fator de multiplicação.")
+        if len(fatores) * len(vagas_alternativas) > settings.simulacao_max_cenarios:
+            raise ValidationException(f"A simulação admite no máximo {settings.simulacao_max_cenarios} combinações de fator e vagas.")
 
-        candidatos_do_curso_completo = candidatos_por_curso.get((view_context['campus'], view_context['curso'], view_context['turno']), [])
-        classificacoes_por_cpf = self._calcular_classificacao_por_cota(candidatos_do_curso_completo)
+        chamada_num = self.repo.get_chamada_num()
+        selecionados = self._pessoas_selecionadas()
+        motor = self._motor_para_simulacao(curso_key)
+        # Selecionados do curso que a chamada atual já tem (gerar_chamada os soma aos novos)
+        vagas_ja_chamadas = self.repo.get_colunas(
+            self.repo.filtrar_ids(curso_key=curso_key, chamada=chamada_num, status=StatusCandidato.SELECIONADO), ["vaga_selecionada"]
+        )["vaga_selecionada"]
+        vagas_ja_chamadas = vagas_ja_chamadas[vagas_ja_chamadas >= 0]
+        vagas_originais = self.repo.get_vagas_originais_para_curso(curso_key)
+
+        cenarios = []
+        for vagas in vagas_alternativas:
+            saldo = np.array([getattr(vagas, cota.value, 0) for cota in COTAS])
+            for fator_multiplicacao in fatores:
+                resultado = motor.copiar().executar(saldo, fator_multiplicacao, bytearray(selecionados))
+                contagem_vagas = np.bincount(np.concatenate([vagas_ja_chamadas, resultado.vagas]), minlength=len(COTAS))
+                # Sem vagas originais, as vagas do cenário passariam a sê-lo (como em definir_vagas)
+                estatisticas_da_lista = self._estatisticas_da_lista(curso_key, fator_multiplicacao, vagas_originais or vagas)
+                cenarios.append(CenarioSimulado(
+                    fator_multiplicacao=fator_multiplicacao,
+                    vagas=vagas,
+                    total_chamados=len(vagas_ja_chamadas) + len(resultado.ids),
+                    vagas_selecionadas={cota: int(contagem_vagas[i]) for i, cota in enumerate(COTAS) if contagem_vagas[i]},
+                    saldo_remanescente_proxima_chamada={cota: int(resultado.saldo[i]) for i, cota in enumerate(COTAS)},
+                    **estatisticas_da_lista
+                ))
+
+        campus, curso, turno = curso_key
+        return SimulacaoResult(campus=campus, curso=curso, turno=turno, chamada_num=chamada_num, cenarios=cenarios)
+
+    def _motor_para_simulacao(self, curso_key: Tuple[str, str, str]) -> AllocationEngine:
+        """Motor do curso no estado atual, apenas copiado pelas simulações (o da chamada incremental, se houver)."""
+        motor = self.cache.obter(self._chave_cache("motor_alocacao", curso_key)) if settings.chamada_incremental else None
+        if motor is not None: return motor
+        return self.cache.obter_ou_calcular(
+            self._chave_cache("motor_simulacao", curso_key),
+            lambda: self._construir_motor(self.repo.ids_do_curso(curso_key, ordenar_por_nota=True))
+        )
 
-        for fase in [1, 2]:
-            for curso_key, candidatos_do_curso in candidatos_por_curso.items():
+    def gerar_chamadas_em_lote(self, fator_multiplicacao: int = 1, relatar: Callable[[float, str], None] = None, por_fase: bool = False) -> ChamadaLoteResult:
+        """
+        Gera a chamada atual para todos os cursos com vagas definidas, com o mesmo
+        resultado de rodar `gerar_chamada` curso a curso na ordem em que as vagas
+        foram definidas. Cursos que não compartilham candidatos ainda não
+        selecionados são independentes e são distribuídos entre processos.
+
+        Com `por_fase`, a alocação é global: a fase 1 (1ª opção) de todos os
+        cursos é executada antes da fase 2, com os cursos em ordem de
+        (campus, curso, turno), de modo que a 2ª opção de uma pessoa nunca toma
+        a vaga de quem a tem como 1ª opção e o resultado não depende da ordem
+        em que os cursos foram configurados.
+        Da leitura da chamada e dos selecionados à gravação, tudo é uma única
+        transação do repositório.
+        `relatar(progresso, mensagem)`, se informado, recebe o andamento das etapas.
+        """
+        relatar = relatar or (lambda progresso, mensagem: None)
+        if not self.repo.total_candidatos(): raise NotFoundException("Nenhum candidato carregado.")
+        cursos = self.repo.list_cursos_com_vagas_definidas()
+        if not cursos: raise ValidationException("Nenhum curso com vagas definidas.")
+        if por_fase:
+            cursos = sorted(cursos, key=lambda curso_key: tuple("" if valor is None else valor for valor in curso_key))
+
+        with self.repo.transacao():
+            inicio = time.perf_counter()
+            chamada_num = self.repo.get_chamada_num()
+            selecionados = self._pessoas_selecionadas()
+
+            tarefas: List[TarefaCurso] = []
+            for curso_key in cursos:
+                ids = self.repo.ids_do_curso(curso_key, ordenar_por_nota=True)
+                if not len(ids): continue
+                colunas = self.repo.get_colunas(ids, ["nota_final", "cota", "status", "opcao", "pessoa"])
                 vagas_obj = self.repo.get_vagas_para_curso(curso_key)
-                if not vagas_obj: continue
-                candidatos_da_fase = [c for c in candidatos_do_curso if c.opcao == fase]
-                candidatos_ordenados = self._ordenar_por_nota(candidatos_da_fase)
-                self._processar_chamada_para_curso(curso_key, candidatos_ordenados, cpfs_ja_selecionados, fator_multiplicacao)
-
-        candidatos_contexto_final = [c for c in self.repo.list_candidatos() if c.campus == view_context['campus'] and c.curso == view_context['curso'] and c.turno == view_context['turno']]
-        for cand in candidatos_contexto_final:
-            update_data = {}
-            for cota_enum in TipoCota:
-                cota_str = cota_enum.value
-                class_key = f"class_{cota_str}"
-                if cand.cpf in classificacoes_por_cpf and class_key in classificacoes_por_cpf[cand.cpf]:
-                    update_data[class_key] = classificacoes_por_cpf[cand.cpf][class_key]
-                else:
-                    update_data[class_key] = None
-            if update_data: self.repo.update_candidato(cand.id, update_data)
-
-        return self._montar_resultado_para_contexto(view_context, chamada_num, fator_multiplicacao)
-
-    def _processar_chamada_para_curso(self, curso_key, candidatos_ordenados, cpfs_ja_selecionados, fator_multiplicacao):
-        chamada_num = self.repo.get_chamada_num()
-        vagas_obj = self.repo.get_vagas_para_curso(curso_key)
-        if not vagas_obj: return
-
-        vagas_ofertadas = {c: int(getattr(vagas_obj, c.value, 0) * fator_multiplicacao) for c in TipoCota}
-        vagas_preenchidas_na_cota = defaultdict(int)
-
-        for passo_idx in range(len(self.INDICE_PARA_COTA)):
-            passo_num = passo_idx + 1
-            cota_alvo = self.INDICE_PARA_COTA[passo_idx]
-            vagas_para_ofertar = vagas_ofertadas.get(cota_alvo, 0)
-            if vagas_para_ofertar <= 0: continue
-
-            candidatos_para_passo = self._filtrar_candidatos_para_passo(candidatos_ordenados, passo_num, cpfs_ja_selecionados)
-            preenchidas = self._executar_passo(cota_alvo, vagas_para_ofertar - vagas_preenchidas_na_cota[cota_alvo], chamada_num, candidatos_para_passo, cpfs_ja_selecionados)
-            vagas_preenchidas_na_cota[cota_alvo] += preenchidas
-
-            remanescentes = vagas_para_ofertar - vagas_preenchidas_na_cota[cota_alvo]
-            if remanescentes > 0:
-                lista_prioridades = self.PRIORIDADE_PREENCHIMENTO.get(cota_alvo, [])
-                for cota_fallback in lista_prioridades:
-                    if remanescentes <= 0: break
-                    cands_fallback = [c for c in candidatos_ordenados if c.cota == cota_fallback and c.cpf not in cpfs_ja_selecionados]
-                    preenchidas_fallback = self._executar_passo(cota_alvo, remanescentes, chamada_num, cands_fallback, cpfs_ja_selecionados)
-                    vagas_preenchidas_na_cota[cota_alvo] += preenchidas_fallback
-                    remanescentes -= preenchidas_fallback
-        
-        saldo_atual = self.repo.get_vagas_para_curso(curso_key)
-        if saldo_atual:
-            novo_saldo_dict = saldo_atual.model_dump()
-            for cota, preenchidas in vagas_preenchidas_na_cota.items():
-                novo_saldo_dict[cota.value] = max(0, novo_saldo_dict[cota.value] - preenchidas)
-            self.repo.set_vagas_para_curso(curso_key, Vagas(**novo_saldo_dict))
-
-    def _montar_resultado_para_contexto(self, context: Dict[str, str], chamada_num: int, fator_multiplicacao: int) -> ChamadaResult:
-        campus, curso, turno = context['campus'], context['curso'], context['turno']
-        curso_key = (campus, curso, turno)
-
-        candidatos_chamados_no_contexto = [
-            c for c in self.repo.list_candidatos()
-            if c.chamada == chamada_num and c.status == StatusCandidato.SELECIONADO and
-            c.campus == campus and c.curso == curso and c.turno == turno
-        ]
-
-        vagas_selecionadas_dict = defaultdict(int)
-        for cand in candidatos_chamados_no_contexto:
-            if cand.vaga_selecionada:
-                vagas_selecionadas_dict[cand.vaga_selecionada] += 1
-        
+                tarefas.append(TarefaCurso(
+                    curso_key=curso_key, ids=ids, notas=colunas["nota_final"], cotas=colunas["cota"],
+                    status=colunas["status"], opcoes=colunas["opcao"], pessoas=colunas["pessoa"],
+                    saldo=np.array([getattr(vagas_obj, cota.value, 0) for cota in COTAS]),
+                ))
+            if not por_fase:
+                componentes = agrupar_cursos_dependentes([t.pessoas for t in tarefas], selecionados)
+            fim_preparacao = time.perf_counter()
+            relatar(0.2, f"Alocando {len(tarefas)} curso(s)")
+
+            if por_fase:
+                resultados, processos = executar_cursos_por_fase(tarefas, fator_multiplicacao, selecionados), 1
+            else:
+                resultados, processos = self._executar_componentes(tarefas, componentes, fator_multiplicacao, selecionados)
+            fim_alocacao = time.perf_counter()
+            relatar(0.7, "Gravando o resultado")
+
+            for tarefa, resultado in zip(tarefas, resultados):
+                self._aplicar_resultado_alocacao(tarefa.curso_key, resultado, chamada_num)
+            if tarefas:
+                ids_lote = np.concatenate([t.ids for t in tarefas])
+                grupos = np.repeat(np.arange(len(tarefas)), [len(t.ids) for t in tarefas])
+                notas_lote = np.concatenate([t.notas for t in tarefas])
+                cotas_lote = np.concatenate([t.cotas for t in tarefas])
+                self._gravar_classificacoes(ids_lote, RankingEngine.classificar(notas_lote, cotas_lote, grupos))
+            fim_gravacao = time.perf_counter()
+            relatar(0.9, "Resumindo os cursos")
+
+            resumos = []
+            for tarefa in tarefas:
+                ids_chamados = self.repo.filtrar_ids(curso_key=tarefa.curso_key, chamada=chamada_num, status=StatusCandidato.SELECIONADO)
+                campus, curso, turno = tarefa.curso_key
+                resumos.append(ChamadaCursoResumo(
+                    campus=campus, curso=curso, turno=turno, total_chamados=len(ids_chamados),
+                    **self._resumir_curso(tarefa.curso_key, ids_chamados, fator_multiplicacao)
+                ))
+            fim = time.perf_counter()
+
+            tempos = {
+                "preparacao": fim_preparacao - inicio, "alocacao": fim_alocacao - fim_preparacao,
+                "gravacao": fim_gravacao - fim_alocacao, "resumo": fim - fim_gravacao,
+            }
+            for fase, segundos in tempos.items():
+                metricas.observar_fase(f"chamada_lote.{fase}", segundos)
+            metricas.incrementar("chamadas_geradas_total", len(tarefas), modo="global" if por_fase else "lote")
+            metricas.incrementar("candidatos_selecionados_total", sum(len(r.ids) for r in resultados))
+
+            self._salvar_snapshot()
+            return ChamadaLoteResult(
+                chamada_num=chamada_num,
+                cursos=resumos,
+                total_chamados=sum(r.total_chamados for r in resumos),
+                processos=processos,
+                tempos_ms={**{fase: segundos * 1000 for fase, segundos in tempos.items()}, "total": (fim - inicio) * 1000}
+            )
+
+    def _executar_componentes(self, tarefas: List[TarefaCurso], componentes: List[List[int]], fator_multiplicacao: int, selecionados: bytearray) -> Tuple[List[ResultadoAlocacao], int]:
+        """
+        Executa os componentes de cursos dependentes, em um pool de processos
+        quando há volume suficiente. Como componentes não compartilham pessoas,
+        cada processo altera a sua própria cópia do mapa de selecionados.
+        """
+        max_workers = settings.chamada_lote_max_workers or os.cpu_count() or 1
+        total_candidatos = sum(len(t.ids) for t in tarefas)
+        if max_workers <= 1 or len(componentes) <= 1 or total_candidatos < settings.chamada_lote_min_candidatos_paralelo:
+            return executar_cursos_em_ordem(tarefas, fator_multiplicacao, selecionados), 1
+
+        # Distribui os componentes em lotes de tamanho parecido (maiores primeiro)
+        processos = min(max_workers, len(componentes))
+        lotes: List[List[int]] = [[] for _ in range(processos)]
+        cargas = [0] * processos
+        for componente in sorted(componentes, key=lambda c: -sum(len(tarefas[i].ids) for i in c)):
+            destino = cargas.index(min(cargas))
+            lotes[destino].extend(componente)
+            cargas[destino] += sum(len(tarefas[i].ids) for i in componente)
+
+        resultados: List[ResultadoAlocacao] = [None] * len(tarefas)
+        with ProcessPoolExecutor(max_workers=processos) as pool:
+            futuros = {}
+            for lote in lotes:
+                if not lote: continue
+                futuro = pool.submit(executar_cursos_em_ordem, [tarefas[i] for i in lote], fator_multiplicacao, selecionados)
+                futuros[futuro] = lote
+            for futuro, lote in futuros.items():
+                for indice, resultado in zip(lote, futuro.result()):
+                    resultados[indice] = resultado
+        return resultados, processos
+
+    def _aplicar_resultado_alocacao(self, curso_key, resultado: ResultadoAlocacao, chamada_num: int) -> None:
+        """Grava os selecionados de uma alocação e o novo saldo de vagas do curso."""
+        self.repo.update_many(resultado.ids, {
+            "status": StatusCandidato.SELECIONADO,
+            "vaga_selecionada": resultado.vagas,
+            "chamada": chamada_num,
+        })
+        self.repo.set_vagas_para_curso(curso_key, Vagas(**{cota.value: int(resultado.saldo[i]) for i, cota in enumerate(COTAS)}))
+
+    def _montar_resultado_para_curso(self, curso_key: Tuple[str, str, str], chamada_num: int, fator_multiplicacao: int, incluir_candidatos: bool = True) -> ChamadaResult:
+        """Resultado da chamada do curso; sem `incluir_candidatos`, a lista de candidatos vem vazia."""
+        ids_chamados_no_contexto = self.repo.filtrar_ids(curso_key=curso_key, chamada=chamada_num, status=StatusCandidato.SELECIONADO)
+        return ChamadaResult(
+            candidatos_chamados=self.repo.materializar(ids_chamados_no_contexto) if incluir_candidatos else [],
+            chamada_num=chamada_num,
+            **self._resumir_curso(curso_key, ids_chamados_no_contexto, fator_multiplicacao)
+        )
+
+    def _resumir_curso(self, curso_key: Tuple[str, str, str], ids_chamados_no_contexto: np.ndarray, fator_multiplicacao: int) -> Dict[str, Any]:
+        """Estatísticas da chamada de um curso: todos os campos de ChamadaResult exceto a lista de candidatos."""
+        vagas_codigos = self.repo.get_colunas(ids_chamados_no_contexto, ["vaga_selecionada"])["vaga_selecionada"]
+        contagem_vagas = np.bincount(vagas_codigos[vagas_codigos >= 0], minlength=len(COTAS))
+        vagas_selecionadas_dict = {cota: int(contagem_vagas[i]) for i, cota in enumerate(COTAS) if contagem_vagas[i]}
+
         saldo_remanescente_obj = self.repo.get_vagas_para_curso(curso_key) or Vagas()
-        
-        tamanho_lista_dict = {}
-        candidatos_do_curso_total = [c for c in self.repo.list_candidatos() if c.campus == campus and c.curso == curso and c.turno == turno]
-        candidatos_ordenados = self._ordenar_por_nota(candidatos_do_curso_total)
-        for i in range(len(self.INDICE_PARA_COTA)):
-            passo_num = i + 1
-            cota_alvo = self.INDICE_PARA_COTA[i]
-            lista_passo = self._filtrar_candidatos_para_passo(candidatos_ordenados, passo_num, set(), ignore_status=True)
-            tamanho_lista_dict[cota_alvo] = len(lista_passo)
+
+        estatisticas_da_lista = self.cache.obter_ou_calcular(
+            self._chave_cache("estatisticas_lista", curso_key, fator_multiplicacao),
+            lambda: self._estatisticas_da_lista(curso_key, fator_multiplicacao)
+        )
+
+        return dict(
+            vagas_selecionadas=dict(vagas_selecionadas_dict),
+            saldo_remanescente_proxima_chamada=saldo_remanescente_obj.model_dump(),
+            **estatisticas_da_lista
+        )
+
+    def _estatisticas_da_lista(self, curso_key: Tuple[str, str, str], fator_multiplicacao: int, vagas_originais: Vagas = None) -> Dict[str, Any]:
+        """Tamanho das listas de cada cota e saldo de candidatos frente à oferta (dependem só do estado do curso e do fator)."""
+        cotas_do_curso = self.repo.get_colunas(self.repo.ids_do_curso(curso_key), ["cota"])["cota"]
+        contagem_por_cota = np.bincount(cotas_do_curso, minlength=len(COTAS))
+        tamanho_por_cota_alvo = ELEGIBILIDADE.astype(np.int64) @ contagem_por_cota
+        tamanho_lista_dict = {cota_alvo: int(tamanho_por_cota_alvo[i]) for i, cota_alvo in enumerate(COTAS)}
 
         saldo_candidatos_vs_oferta_list = []
-        vagas_originais = self.repo.get_vagas_originais_para_curso(curso_key) or Vagas()
+        vagas_originais = vagas_originais or self.repo.get_vagas_originais_para_curso(curso_key) or Vagas()
         for i in range(len(self.INDICE_PARA_COTA)):
             cota_atual = self.INDICE_PARA_COTA[i]
             oferta_para_cota = int(getattr(vagas_originais, cota_atual.value, 0) * fator_multiplicacao)
@@ -240,56 +572,97 @@ class ChamadaService:
         saldo_candidatos_chamada_atual_dict = {self.INDICE_PARA_COTA[i]: saldo_candidatos_vs_oferta_list[i] for i in range(len(self.INDICE_PARA_COTA))}
         saldo_candidatos_chamada_atual_ajustado_dict = {self.INDICE_PARA_COTA[i]: saldo_candidatos_vs_oferta_ajustado_list[i] for i in range(len(self.INDICE_PARA_COTA))}
 
-        candidatos_do_curso_para_retorno = [
-            c for c in self.repo.list_candidatos()
-            if c.campus == campus and c.curso == curso and c.turno == turno and c.chamada == chamada_num and c.status == StatusCandidato.SELECIONADO
-        ]
-
-        return ChamadaResult(
-            candidatos_chamados=candidatos_do_curso_para_retorno,
-            vagas_selecionadas=dict(vagas_selecionadas_dict),
-            saldo_remanescente_proxima_chamada=saldo_remanescente_obj.model_dump(),
+        return dict(
             tamanho_lista=tamanho_lista_dict,
-            chamada_num=chamada_num,
             saldo_candidatos_chamada_atual=saldo_candidatos_chamada_atual_dict,
             saldo_candidatos_chamada_atual_ajustado=saldo_candidatos_chamada_atual_ajustado_dict
         )
 
-    def marcar_nao_homologados(self, cpfs: List[str]) -> List[Dict[str, Any]]:
-        vagas_liberadas_por_cota: Dict[Tuple[str, str, str], Dict[TipoCota, int]] = defaultdict(lambda: defaultdict(int))
-        numeros_chamadas = {c.chamada for c in self.repo.list_candidatos() if c.status == StatusCandidato.SELECIONADO and c.chamada is not None}
-        ultima_chamada_com_selecionados = max(numeros_chamadas) if numeros_chamadas else 0
-
-        for cpf in cpfs:
-            candidatos_do_cpf = self.repo.get_candidatos_by_cpf(cpf)
-            for candidato in candidatos_do_cpf:
-                if candidato.status == StatusCandidato.SELECIONADO and candidato.chamada == ultima_chamada_com_selecionados:
-                    cota_liberada = candidato.vaga_selecionada
-                    curso_key = (candidato.campus, candidato.curso, candidato.turno)
-                    self.repo.update_candidato(candidato.id, {"status": StatusCandidato.NAO_HOMOLOGADO, "vaga_selecionada": None})
-                    if cota_liberada and curso_key:
-                        vagas_liberadas_por_cota[curso_key][cota_liberada] += 1
-
-        for curso_key, liberadas in vagas_liberadas_por_cota.items():
-            vagas_atuais = self.repo.get_vagas_para_curso(curso_key)
-            if vagas_atuais:
-                novo_saldo = vagas_atuais.model_copy()
-                for cota, qtd in liberadas.items():
-                    valor_atual = getattr(novo_saldo, cota.value, 0)
-                    setattr(novo_saldo, cota.value, valor_atual + qtd)
-                self.repo.set_vagas_para_curso(curso_key, novo_saldo)
-
-        self.repo.increment_chamada_num()
-        return self.get_vagas_disponiveis()
-
-    def listar_candidatos_chamada(self, chamada_num: int) -> List[Candidato]:
-        candidatos_chamada = [c for c in self.repo.list_candidatos() if c.chamada == chamada_num and c.status == StatusCandidato.SELECIONADO]
-        return self._ordenar_por_nota(candidatos_chamada)
-
-    def get_vagas_disponiveis(self) -> List[Dict[str, Any]]:
-        context = self.repo.get_view_context()
-        if not context: raise ValidationException("Nenhum curso selecionado para visualização.")
-        curso_key = (context['campus'], context['curso'], context['turno'])
+    def marcar_nao_homologados(self, cpfs: List[str], curso_key: Optional[Tuple[str, str, str]] = None) -> List[Dict[str, Any]]:
+        """
+        Marca como não homologados os selecionados da última chamada com os CPFs
+        informados, devolve as vagas aos cursos e avança a chamada, tudo em uma
+        única transação. Retorna as vagas de `curso_key` (padrão: o curso do filtro).
+        """
+        curso_consultado = self._curso_da_operacao(curso_key, "Nenhum curso selecionado para visualização.")
+        with self.repo.transacao():
+            vagas_liberadas_por_cota: Dict[Tuple[str, str, str], Dict[TipoCota, int]] = defaultdict(lambda: defaultdict(int))
+            chamadas_selecionados = self.repo.get_colunas(self.repo.filtrar_ids(status=StatusCandidato.SELECIONADO), ["chamada"])["chamada"]
+            chamadas_selecionados = chamadas_selecionados[chamadas_selecionados >= 0]
+            ultima_chamada_com_selecionados = int(chamadas_selecionados.max()) if chamadas_selecionados.size else 0
+
+            ids_nao_homologados = []
+            # Inscrições (em qualquer curso) das pessoas que deixam de estar selecionadas
+            ids_reabertos_por_curso: Dict[Tuple[str, str, str], List[int]] = defaultdict(list)
+            # Formatos diferentes do mesmo CPF (com ou sem pontuação) contam uma vez só
+            for cpf in {chave_cpf(cpf): cpf for cpf in cpfs}.values():
+                candidatos_do_cpf = self.repo.get_candidatos_by_cpf(cpf)
+                liberou = False
+                for candidato in candidatos_do_cpf:
+                    if candidato.status == StatusCandidato.SELECIONADO and candidato.chamada == ultima_chamada_com_selecionados:
+                        cota_liberada = candidato.vaga_selecionada
+                        curso_key = (candidato.campus, candidato.curso, candidato.turno)
+                        ids_nao_homologados.append(candidato.id)
+                        liberou = True
+                        if cota_liberada and curso_key:
+                            vagas_liberadas_por_cota[curso_key][cota_liberada] += 1
+                if liberou:
+                    for candidato in candidatos_do_cpf:
+                        ids_reabertos_por_curso[(candidato.campus, candidato.curso, candidato.turno)].append(candidato.id)
+
+            # Os motores guardados são retirados na versão de antes das alterações e guardados de novo depois
+            motores = {curso_key: self._retirar_motor(curso_key) for curso_key in ids_reabertos_por_curso}
+            self.repo.update_many(ids_nao_homologados, {"status": StatusCandidato.NAO_HOMOLOGADO, "vaga_selecionada": None})
+
+            for curso_key, liberadas in vagas_liberadas_por_cota.items():
+                vagas_atuais = self.repo.get_vagas_para_curso(curso_key)
+                if vagas_atuais:
+                    novo_saldo = vagas_atuais.model_copy()
+                    for cota, qtd in liberadas.items():
+                        valor_atual = getattr(novo_saldo, cota.value, 0)
+                        setattr(novo_saldo, cota.value, valor_atual + qtd)
+                    self.repo.set_vagas_para_curso(curso_key, novo_saldo)
+
+            for curso_key, motor in motores.items():
+                if motor is not None:
+                    motor.reabrir(ids_reabertos_por_curso[curso_key])
+                    self._guardar_motor(curso_key, motor)
+
+            self.repo.increment_chamada_num()
+            self._salvar_snapshot()
+        return self.get_vagas_disponiveis(curso_consultado)
+
+    def ids_candidatos_chamada(
+        self, chamada_num: int, curso_key: Tuple[str, str, str] = None,
+        cota: Optional[TipoCota] = None, vaga_selecionada: Optional[TipoCota] = None
+    ) -> np.ndarray:
+        """Ids dos selecionados na chamada que atendem aos filtros, por nota decrescente."""
+        filtros = (curso_key, chamada_num, StatusCandidato.SELECIONADO, cota, vaga_selecionada)
+        return self._indice_listagem(filtros, OrdemCandidatos.NOTA)[0]
+
+    def listar_candidatos_chamada(self, chamada_num: int, campos: List[str] = None, **filtros) -> List[Dict[str, Any]]:
+        """Selecionados da chamada como dicionários com os campos pedidos (padrão: os de `Candidato`)."""
+        campos = campos or list(Candidato.model_fields)
+        self._validar_campos(campos)
+        return self.repo.projetar(self.ids_candidatos_chamada(chamada_num, **filtros), campos)
+
+    def listar_candidatos_chamada_em_blocos(self, chamada_num: int, campos: List[str] = None, **filtros) -> Iterator[List[Dict[str, Any]]]:
+        """Como `listar_candidatos_chamada`, em blocos; campos e ids são resolvidos já aqui e só a projeção fica para depois."""
+        campos = campos or list(Candidato.model_fields)
+        self._validar_campos(campos)
+        return self.projetar_em_blocos(self.ids_candidatos_chamada(chamada_num, **filtros), campos)
+
+    def projetar_em_blocos(self, ids: np.ndarray, campos: List[str] = None) -> Iterator[List[Dict[str, Any]]]:
+        """Projeção dos ids em blocos de `export_chunk_rows`, para respostas transmitidas aos poucos."""
+        campos = campos or list(Candidato.model_fields)
+        for inicio in range(0, len(ids), settings.export_chunk_rows):
+            yield self.repo.projetar(ids[inicio:inicio + settings.export_chunk_rows], campos)
+
+    def get_vagas_disponiveis(self, curso_key: Optional[Tuple[str, str, str]] = None) -> List[Dict[str, Any]]:
+        curso_key = self._curso_da_operacao(curso_key, "Nenhum curso selecionado para visualização.")
+        return self.cache.obter_ou_calcular(self._chave_cache("vagas_disponiveis", curso_key), lambda: self._listar_vagas_disponiveis(curso_key))
+
+    def _listar_vagas_disponiveis(self, curso_key: Tuple[str, str, str]) -> List[Dict[str, Any]]:
         vagas_originais = self.repo.get_vagas_originais_para_curso(curso_key) or Vagas()
         vagas_disponiveis = self.repo.get_vagas_para_curso(curso_key) or Vagas()
         formatted_list = []
@@ -302,39 +675,42 @@ class ChamadaService:
             })
         return formatted_list
 
+    def ids_relatorio_chamada_completo(self, chamada_num: int) -> np.ndarray:
+        """Ids de todos os candidatos da chamada (inclusive não homologados), por nota decrescente."""
+        return self.repo.filtrar_ids(chamada=chamada_num, ordenar_por_nota=True)
+
     def gerar_relatorio_chamada_completo(self, chamada_num: int) -> List[Candidato]:
-        candidatos_relatorio = [c for c in self.repo.list_candidatos() if c.chamada == chamada_num]
-        return self._ordenar_por_nota(candidatos_relatorio)
+        return self.repo.materializar(self.ids_relatorio_chamada_completo(chamada_num))
     
     def gerar_relatorio_geral_por_curso(self) -> List[Candidato]:
         """
         Gera um relatório com TODOS os candidatos de um curso/turno (contexto),
         com suas respectivas classificações calculadas em todas as cotas.
         """
+        return self.repo.materializar(self.ids_relatorio_geral_por_curso())
+
+    def ids_relatorio_geral_por_curso(self) -> np.ndarray:
+        """
+        Ids de todos os candidatos do curso/turno do contexto, por nota
+        decrescente, após gravar as classificações em todas as cotas.
+        """
         view_context = self.repo.get_view_context()
         if not view_context:
             raise ValidationException("Nenhum curso foi selecionado. Aplique um filtro primeiro.")
 
-        candidatos_do_curso = [
-            c for c in self.repo.list_candidatos()
-            if c.campus == view_context['campus'] and
-               c.curso == view_context['curso'] and
-               c.turno == view_context['turno']
-        ]
-
-        if not candidatos_do_curso:
+        curso_key = (view_context['campus'], view_context['curso'], view_context['turno'])
+        ids_do_curso = self.repo.ids_do_curso(curso_key, ordenar_por_nota=True)
+        if not len(ids_do_curso):
             raise NotFoundException("Nenhum candidato encontrado para o filtro atual.")
 
-        classificacoes_por_cpf = self._calcular_classificacao_por_cota(candidatos_do_curso)
-
-        for cand in candidatos_do_curso:
-            if cand.cpf in classificacoes_por_cpf:
-                update_data = classificacoes_por_cpf[cand.cpf]
-                self.repo.update_candidato(cand.id, update_data)
-        
-        candidatos_atualizados = [self.repo.get_candidato(c.id) for c in candidatos_do_curso]
-
-        return self._ordenar_por_nota(candidatos_atualizados)
+        # As classificações gravadas só mudam se o curso mudar: na mesma versão, o relatório é reaproveitado
+        ids_ordenados = self.cache.obter(self._chave_cache("relatorio_geral", curso_key))
+        if ids_ordenados is None:
+            self._gravar_classificacoes(ids_do_curso, self._calcular_classificacao_por_cota(ids_do_curso))
+            ids_ordenados = ids_do_curso
+            self.cache.guardar(self._chave_cache("relatorio_geral", curso_key), ids_ordenados)
+        return ids_ordenados
 
     def reset_sistema(self) -> None:
-        self.repo.reset()
\ No newline at end of file
+        self.repo.reset()
+        self._salvar_snapshot()
\ No newline at end of file
@@ -0,0 +1,163 @@
+from typing import Any, Dict, Iterator, List
+import io
+import numpy as np
+import pandas as pd
+from domain.enums import COTAS, STATUS, SEM_VALOR, FormatoArquivo
+from repositories.in_memory_repository import InMemoryRepository, CAMPOS_CLASSIFICACAO
+from core.config import settings
+from core.optional_dependencies import importar_pyarrow
+
+# Tabelas de decodificação: o último item (None) é alcançado pelo índice SEM_VALOR
+_TEXTO_COTAS = np.array([cota.value for cota in COTAS] + [None], dtype=object)
+_TEXTO_STATUS = np.array([status.value for status in STATUS] + [None], dtype=object)
+
+_CAMPOS_INTEIROS_OPCIONAIS = ("chamada", *CAMPOS_CLASSIFICACAO)
+
+
+class _Destino:
+    """Destino de escrita do pyarrow que acumula os bytes até serem drenados para a resposta."""
+
+    def __init__(self):
+        self.partes: List[bytes] = []
+        self.closed = False
+
+    def write(self, dados) -> int:
+        self.partes.append(bytes(dados))
+        return len(dados)
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+    def drenar(self) -> bytes:
+        dados = b"".join(self.partes)
+        self.partes.clear()
+        return dados
+
+
+class ExportService:
+
+    COLUNAS_EXPORTACAO = [
+        "id", "campus", "curso", "turno", "nome", "nota_final",
+        "cota", "vaga_selecionada", "status", "opcao", "chamada",
+        *CAMPOS_CLASSIFICACAO
+    ]
+
+    # formato -> (media type, extensão do arquivo)
+    FORMATOS = {
+        FormatoArquivo.CSV: ("text/csv", "csv"),
+        FormatoArquivo.PARQUET: ("application/vnd.apache.parquet", "parquet"),
+        FormatoArquivo.ARROW: ("application/vnd.apache.arrow.file", "arrow"),
+    }
+
+    @staticmethod
+    def _ordinal(valores: np.ndarray, sufixo: str) -> np.ndarray:
+        """Formata uma coluna inteira como ordinal (ex: 3 -> '3º'); SEM_VALOR vira ''."""
+        texto = pd.Series(valores).astype(str).add(sufixo).to_numpy(dtype=object)
+        texto[valores == SEM_VALOR] = ''
+        return texto
+
+    @staticmethod
+    def _ler_bloco(repo: InMemoryRepository, ids: np.ndarray) -> Dict[str, Any]:
+        """Colunas de exportação de um bloco: textos decodificados e inteiros com SEM_VALOR."""
+        colunas = repo.get_colunas(ids, ["id", "curso_key", "nome", "nota_final", "cota", "vaga_selecionada", "status", "opcao", "chamada", *CAMPOS_CLASSIFICACAO])
+
+        codigos, posicoes = np.unique(colunas["curso_key"], return_inverse=True)
+        cursos = np.empty((codigos.size, 3), dtype=object)
+        for i, codigo in enumerate(codigos.tolist()):
+            cursos[i] = repo.get_curso(codigo)
+
+        dados = {
+            "id": colunas["id"],
+            "campus": cursos[posicoes, 0],
+            "curso": cursos[posicoes, 1],
+            "turno": cursos[posicoes, 2],
+            "nome": colunas["nome"],
+            "nota_final": colunas["nota_final"],
+            "cota": _TEXTO_COTAS[colunas["cota"]],
+            "vaga_selecionada": _TEXTO_COTAS[colunas["vaga_selecionada"]],
+            "status": _TEXTO_STATUS[colunas["status"]],
+            "opcao": colunas["opcao"],
+        }
+        for campo in _CAMPOS_INTEIROS_OPCIONAIS:
+            dados[campo] = colunas[campo]
+        return dados
+
+    @staticmethod
+    def _bloco_csv(dados: Dict[str, Any]) -> pd.DataFrame:
+        dados = dict(dados)
+        dados["opcao"] = ExportService._ordinal(dados["opcao"], "ª opção")
+        dados["chamada"] = ExportService._ordinal(dados["chamada"], "ª chamada")
+        for campo in CAMPOS_CLASSIFICACAO:
+            dados[campo] = ExportService._ordinal(dados[campo], "º")
+        return pd.DataFrame(dados, columns=ExportService.COLUNAS_EXPORTACAO)
+
+    @staticmethod
+    def _esquema_arrow(pa):
+        inteiro_opcional = [(campo, pa.int32()) for campo in _CAMPOS_INTEIROS_OPCIONAIS]
+        return pa.schema([
+            ("id", pa.int64()), ("campus", pa.string()), ("curso", pa.string()), ("turno", pa.string()),
+            ("nome", pa.string()), ("nota_final", pa.float64()),
+            ("cota", pa.string()), ("vaga_selecionada", pa.string()), ("status", pa.string()),
+            ("opcao", pa.int32()), *inteiro_opcional,
+        ])
+
+    @staticmethod
+    def _bloco_arrow(pa, esquema, dados: Dict[str, Any]):
+        """RecordBatch tipado do bloco: sem formatação de texto e com nulos no lugar de SEM_VALOR."""
+        arrays = []
+        for campo in esquema:
+            valores = dados[campo.name]
+            mascara = valores == SEM_VALOR if campo.name in _CAMPOS_INTEIROS_OPCIONAIS else None
+            arrays.append(pa.array(valores, type=campo.type, mask=mascara, from_pandas=True))
+        return pa.RecordBatch.from_arrays(arrays, schema=esquema)
+
+    @staticmethod
+    def _blocos(repo: InMemoryRepository, ids: np.ndarray, tamanho_bloco: int) -> Iterator[Dict[str, Any]]:
+        ids = np.asarray(ids, dtype=np.int64)
+        for inicio in list(range(0, ids.size, tamanho_bloco)) or [0]:
+            yield ExportService._ler_bloco(repo, ids[inicio:inicio + tamanho_bloco])
+
+    @staticmethod
+    def gerar(repo: InMemoryRepository, ids: np.ndarray, formato: FormatoArquivo = FormatoArquivo.CSV, tamanho_bloco: int = None) -> Iterator:
+        """
+        Retorna o gerador do arquivo de exportação no formato pedido. A
+        disponibilidade do pyarrow é verificada aqui, antes de a resposta começar.
+        """
+        tamanho_bloco = tamanho_bloco or settings.export_chunk_rows
+        if formato == FormatoArquivo.CSV:
+            return ExportService.gerar_csv(repo, ids, tamanho_bloco)
+        pa = importar_pyarrow()
+        if formato == FormatoArquivo.PARQUET:
+            return ExportService._gerar_arrow(pa, repo, ids, tamanho_bloco, lambda destino, esquema: pa.parquet.ParquetWriter(destino, esquema))
+        return ExportService._gerar_arrow(pa, repo, ids, tamanho_bloco, pa.ipc.new_file)
+
+    @staticmethod
+    def gerar_csv(repo: InMemoryRepository, ids: np.ndarray, tamanho_bloco: int = None) -> Iterator[str]:
+        """
+        Gera o CSV de exportação dos candidatos (na ordem dos ids) em pedaços de
+        até `tamanho_bloco` linhas: cada bloco é lido do repositório, formatado
+        coluna a coluna e escrito assim que fica pronto, de modo que o download
+        começa de imediato e o arquivo inteiro nunca fica em memória.
+        """
+        tamanho_bloco = tamanho_bloco or settings.export_chunk_rows
+        for numero, dados in enumerate(ExportService._blocos(repo, ids, tamanho_bloco)):
+            saida = io.StringIO()
+            ExportService._bloco_csv(dados).to_csv(saida, index=False, header=numero == 0, sep=';', decimal=',')
+            yield saida.getvalue()
+
+    @staticmethod
+    def _gerar_arrow(pa, repo: InMemoryRepository, ids: np.ndarray, tamanho_bloco: int, abrir_escritor) -> Iterator[bytes]:
+        """Escreve um row group / record batch por bloco e envia os bytes produzidos a cada bloco."""
+        esquema = ExportService._esquema_arrow(pa)
+        destino = _Destino()
+        escritor = abrir_escritor(destino, esquema)
+        for dados in ExportService._blocos(repo, ids, tamanho_bloco):
+            escritor.write_batch(ExportService._bloco_arrow(pa, esquema, dados))
+            parte = destino.drenar()
+            if parte:
+                yield parte
+        escritor.close()
+        yield destino.drenar()
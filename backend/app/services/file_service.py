@@ -1,13 +1,27 @@
+import numpy as np
 import pandas as pd
-from typing import List, Dict, Any
+from typing import BinaryIO, Iterator, List, Dict, Any, Optional, Tuple
 from domain.entities import CandidatoCreate
+from domain.enums import COTAS, FormatoArquivo
+from core.config import settings
 from core.exceptions import InvalidFileException
-from io import StringIO
-import re
+from core.metrics import metricas
+from core.optional_dependencies import importar_pyarrow
+from io import BytesIO
 import unicodedata
 
+_CODIGO_POR_COTA = {cota.value: i for i, cota in enumerate(COTAS)}
+
 class FileService:
 
+    REQUIRED_COLUMNS = ['cpf', 'nota_final', 'cota_do_candidato', 'opcao_de_inscricao']
+    OPTIONAL_COLUMNS = ['nome', 'e-mail', 'email', 'campus', 'curso', 'turno']
+    MAX_ERROS_REPORTADOS = 100
+    EXTENSOES_FORMATO = {
+        'parquet': FormatoArquivo.PARQUET, 'pq': FormatoArquivo.PARQUET,
+        'arrow': FormatoArquivo.ARROW, 'feather': FormatoArquivo.ARROW, 'ipc': FormatoArquivo.ARROW,
+    }
+
     @staticmethod
     def _normalize_column_name(col_name: str) -> str:
         """
@@ -28,22 +42,40 @@ class FileService:
 
     @staticmethod
     def process_csv(file_content: bytes, delimiter: str, encoding: str) -> List[Dict[str, Any]]:
-        try:
-            csv_data = StringIO(file_content.decode(encoding))
-            df = pd.read_csv(csv_data, sep=delimiter, decimal=',')
+        registros: List[Dict[str, Any]] = []
+        with metricas.medir("arquivo.process_csv"):
+            for chunk in FileService.iter_csv_chunks(BytesIO(file_content), delimiter, encoding):
+                registros.extend(chunk.to_dict('records'))
+        metricas.incrementar("linhas_processadas_total", len(registros), etapa="process_csv")
+        return registros
 
-            df.columns = [FileService._normalize_column_name(col) for col in df.columns]
-            
-            required_columns = [
-                'cpf', 'nota_final', 'cota_do_candidato', 'opcao_de_inscricao'
-            ]
+    @staticmethod
+    def iter_csv_chunks(file_obj: BinaryIO, delimiter: str, encoding: str, chunksize: int = None) -> Iterator[pd.DataFrame]:
+        """
+        Lê o CSV de forma incremental, em blocos de até `chunksize` linhas, com os
+        nomes de colunas já normalizados. O cabeçalho é lido e validado antes do
+        primeiro bloco, e a coluna de CPF é sempre lida como texto para que a
+        inferência de tipos não varie de um bloco para outro.
+        """
+        chunksize = chunksize or settings.upload_chunk_rows
+        try:
+            cabecalho = pd.read_csv(file_obj, sep=delimiter, encoding=encoding, nrows=0)
+            colunas = [FileService._normalize_column_name(col) for col in cabecalho.columns]
 
-            if not all(col in df.columns for col in required_columns):
-                missing = [col for col in required_columns if col not in df.columns]
+            missing = [col for col in FileService.REQUIRED_COLUMNS if col not in colunas]
+            if missing:
                 raise InvalidFileException(f"Colunas obrigatórias faltando no CSV ou com nomes inesperados após normalização: {', '.join(missing)}")
-            
-            return df.to_dict('records')
 
+            tipos = {original: str for original, normalizada in zip(cabecalho.columns, colunas) if normalizada == 'cpf'}
+            file_obj.seek(0)
+            leitor = pd.read_csv(file_obj, sep=delimiter, decimal=',', encoding=encoding, dtype=tipos, chunksize=chunksize)
+            with leitor:
+                for chunk in leitor:
+                    chunk.columns = colunas
+                    yield chunk
+
+        except InvalidFileException:
+            raise
         except UnicodeDecodeError:
             raise InvalidFileException(
                 f"Não foi possível decodificar o arquivo com o encoding '{encoding}'. "
@@ -58,34 +90,191 @@ class FileService:
                 raise InvalidFileException(f"Erro ao processar arquivo CSV: {str(e)}")
 
     @staticmethod
-    def convert_to_candidatos(data: List[Dict[str, Any]]) -> List[CandidatoCreate]:
-        candidatos = []
-        for row in data:
+    def detectar_formato(filename: Optional[str]) -> FormatoArquivo:
+        """Deduz o formato do arquivo pela extensão (CSV quando não reconhecida)."""
+        extensao = (filename or '').rsplit('.', 1)[-1].lower()
+        return FileService.EXTENSOES_FORMATO.get(extensao, FormatoArquivo.CSV)
+
+    @staticmethod
+    def iter_chunks(file_obj: BinaryIO, formato: FormatoArquivo, delimiter: str, encoding: str, chunksize: int = None) -> Iterator[pd.DataFrame]:
+        if formato == FormatoArquivo.PARQUET:
+            return FileService.iter_parquet_chunks(file_obj, chunksize)
+        if formato == FormatoArquivo.ARROW:
+            return FileService.iter_arrow_chunks(file_obj, chunksize)
+        return FileService.iter_csv_chunks(file_obj, delimiter, encoding, chunksize)
+
+    @staticmethod
+    def _colunas_para_leitura(nomes: List[str]) -> Dict[str, str]:
+        """Mapeia as colunas do arquivo que interessam à carga (nome original -> normalizado), validando as obrigatórias."""
+        normalizadas = {nome: FileService._normalize_column_name(nome) for nome in nomes}
+        missing = [col for col in FileService.REQUIRED_COLUMNS if col not in normalizadas.values()]
+        if missing:
+            raise InvalidFileException(f"Colunas obrigatórias faltando no arquivo ou com nomes inesperados após normalização: {', '.join(missing)}")
+        uteis = set(FileService.REQUIRED_COLUMNS) | set(FileService.OPTIONAL_COLUMNS)
+        return {nome: normalizada for nome, normalizada in normalizadas.items() if normalizada in uteis}
+
+    @staticmethod
+    def _iter_lotes_arrow(lotes, colunas: Dict[str, str], chunksize: int) -> Iterator[pd.DataFrame]:
+        """Converte RecordBatches em DataFrames de até `chunksize` linhas, com numeração contínua."""
+        inicio = 0
+        for lote in lotes:
+            for deslocamento in range(0, lote.num_rows, chunksize):
+                parte = lote.slice(deslocamento, chunksize).select(list(colunas)).to_pandas()
+                parte.columns = list(colunas.values())
+                parte.index = pd.RangeIndex(inicio, inicio + len(parte))
+                inicio += len(parte)
+                yield parte
+
+    @staticmethod
+    def iter_parquet_chunks(file_obj: BinaryIO, chunksize: int = None) -> Iterator[pd.DataFrame]:
+        """Lê um arquivo Parquet em blocos, lendo apenas as colunas usadas na carga."""
+        pa = importar_pyarrow()
+        chunksize = chunksize or settings.upload_chunk_rows
+        try:
+            arquivo = pa.parquet.ParquetFile(file_obj)
+            colunas = FileService._colunas_para_leitura(arquivo.schema_arrow.names)
+            yield from FileService._iter_lotes_arrow(arquivo.iter_batches(batch_size=chunksize, columns=list(colunas)), colunas, chunksize)
+        except InvalidFileException:
+            raise
+        except Exception as e:
+            raise InvalidFileException(f"Erro ao processar arquivo Parquet: {str(e)}")
+
+    @staticmethod
+    def iter_arrow_chunks(file_obj: BinaryIO, chunksize: int = None) -> Iterator[pd.DataFrame]:
+        """Lê um arquivo Arrow IPC (formato de arquivo ou de stream) em blocos."""
+        pa = importar_pyarrow()
+        chunksize = chunksize or settings.upload_chunk_rows
+        try:
             try:
-                opcao_str = str(row.get('opcao_de_inscricao', ''))
-
-                match = re.search(r'\d+', opcao_str)
-                if not match:
-                    raise ValueError(f"O valor na coluna 'opcao_de_inscricao' ('{opcao_str}') não contém um número válido. Verifique o formato.")
-                opcao_int = int(match.group(0))
-
-                candidatos.append(CandidatoCreate(
-                    cpf=str(row['cpf']),
-                    nota_final=float(row['nota_final']),
-                    cota=row['cota_do_candidato'],
-                    opcao=opcao_int,
-                    nome=row.get('nome', ''),
-                    email=row.get('e-mail', row.get('email', '')),
-                    campus=row.get('campus', ''),
-                    curso=row.get('curso', ''),
-                    turno=row.get('turno', '')
-                ))
-
-            except (ValueError, TypeError, KeyError) as e:
-                cpf = row.get('cpf', 'N/A')
-                raise InvalidFileException(
-                    f"Erro ao converter dados do candidato com CPF {cpf}. "
-                    "Verifique os tipos de dados ou o conteúdo das colunas. "
-                    f"Detalhe: {str(e)}. Dados da linha: {row}"
-                )
-        return candidatos
\ No newline at end of file
+                leitor = pa.ipc.open_file(file_obj)
+                lotes = (leitor.get_batch(i) for i in range(leitor.num_record_batches))
+            except pa.ArrowInvalid:
+                file_obj.seek(0)
+                leitor = pa.ipc.open_stream(file_obj)
+                lotes = iter(leitor)
+            colunas = FileService._colunas_para_leitura(leitor.schema.names)
+            yield from FileService._iter_lotes_arrow(lotes, colunas, chunksize)
+        except InvalidFileException:
+            raise
+        except Exception as e:
+            raise InvalidFileException(f"Erro ao processar arquivo Arrow: {str(e)}")
+
+    @staticmethod
+    def stream_candidatos(
+        file_obj: BinaryIO, delimiter: str, encoding: str, chunksize: int = None,
+        rejeitadas: Optional[List[Dict[str, Any]]] = None, formato: FormatoArquivo = FormatoArquivo.CSV
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Converte o arquivo (CSV, Parquet ou Arrow IPC) bloco a bloco, produzindo as colunas já validadas de cada
+        bloco (no formato de `convert_dataframe`). Linhas inválidas são acumuladas
+        e, ao final da leitura, todas são reportadas de uma só vez.
+
+        Se a lista `rejeitadas` for informada, as linhas inválidas são apenas
+        descartadas e registradas nela, sem interromper a carga.
+        """
+        erros: List[Dict[str, Any]] = []
+        total_erros = 0
+        blocos = FileService.iter_chunks(file_obj, formato, delimiter, encoding, chunksize)
+        while True:
+            with metricas.medir("upload.leitura"):
+                chunk = next(blocos, None)
+            if chunk is None: break
+            with metricas.medir("upload.conversao"):
+                colunas, erros_do_bloco = FileService.convert_dataframe(chunk)
+            metricas.incrementar("linhas_processadas_total", len(chunk), etapa="upload")
+            metricas.incrementar("linhas_rejeitadas_total", len(erros_do_bloco), etapa="upload")
+            if rejeitadas is not None:
+                rejeitadas.extend(erros_do_bloco)
+            else:
+                total_erros += len(erros_do_bloco)
+                erros.extend(erros_do_bloco[:FileService.MAX_ERROS_REPORTADOS - len(erros)])
+            if not total_erros and len(colunas['cpf']):
+                yield colunas
+        if total_erros:
+            raise InvalidFileException(FileService._formatar_erros(erros, total_erros))
+
+    @staticmethod
+    def _coluna_texto(df: pd.DataFrame, *nomes: str) -> List[Any]:
+        """Valores de texto da primeira coluna existente entre `nomes` ('' se nenhuma existir, None nas células vazias)."""
+        for nome in nomes:
+            if nome in df.columns:
+                coluna = df[nome]
+                return [None if pd.isna(v) else str(v) for v in coluna.tolist()]
+        return [''] * len(df)
+
+    @staticmethod
+    def convert_dataframe(df: pd.DataFrame) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """
+        Valida e converte um bloco do CSV coluna a coluna: extração do número da
+        opção, conversão da nota, validação da cota e do CPF. Retorna as colunas
+        das linhas válidas (cota como código inteiro, na ordem de COTAS) e a lista
+        de erros, com o número da linha no arquivo.
+        """
+        cpf = df['cpf'].astype('string')
+        opcao = df['opcao_de_inscricao']
+        if not pd.api.types.is_integer_dtype(opcao):
+            opcao = opcao.astype('string').str.extract(r'(\d+)', expand=False)
+        nota = df['nota_final']
+        if not pd.api.types.is_numeric_dtype(nota):
+            nota = pd.to_numeric(nota.astype('string').str.strip().str.replace(',', '.', regex=False), errors='coerce')
+        cota = df['cota_do_candidato'].astype('string').map(_CODIGO_POR_COTA)
+
+        nota_invalida = nota.isna() & df['nota_final'].notna()
+        problemas = {
+            "CPF vazio": cpf.isna() | (cpf.str.strip() == ''),
+            "O valor na coluna 'opcao_de_inscricao' não contém um número válido": opcao.isna(),
+            "O valor na coluna 'nota_final' não é numérico": nota_invalida,
+            f"Cota inválida (valores aceitos: {', '.join(c.value for c in COTAS)})": cota.isna(),
+        }
+        problemas = {motivo: mascara.fillna(True).to_numpy(dtype=bool) for motivo, mascara in problemas.items()}
+        invalidas = np.logical_or.reduce(list(problemas.values()))
+
+        erros: List[Dict[str, Any]] = []
+        for posicao in np.flatnonzero(invalidas).tolist():
+            cpf_original = df['cpf'].iat[posicao]
+            erros.append({
+                "linha": int(df.index[posicao]) + 2,
+                "cpf": None if pd.isna(cpf_original) else str(cpf_original),
+                "erros": [motivo for motivo, mascara in problemas.items() if mascara[posicao]],
+            })
+
+        validas = ~invalidas
+        df_validas = df[validas]
+        colunas = {
+            "cpf": cpf[validas].tolist(),
+            "nota_final": nota[validas].to_numpy(dtype=np.float64),
+            "cota": cota[validas].to_numpy(dtype=np.int8),
+            "opcao": opcao[validas].astype(np.int64).to_numpy(dtype=np.int32),
+            "nome": FileService._coluna_texto(df_validas, 'nome'),
+            "email": FileService._coluna_texto(df_validas, 'e-mail', 'email'),
+            "campus": FileService._coluna_texto(df_validas, 'campus'),
+            "curso": FileService._coluna_texto(df_validas, 'curso'),
+            "turno": FileService._coluna_texto(df_validas, 'turno'),
+        }
+        return colunas, erros
+
+    @staticmethod
+    def _formatar_erros(erros: List[Dict[str, Any]], total: int = None) -> str:
+        total = total or len(erros)
+        erros = erros[:FileService.MAX_ERROS_REPORTADOS]
+        detalhes = "; ".join(
+            f"linha {erro['linha']} (CPF {erro['cpf'] or 'N/A'}): {', '.join(erro['erros'])}"
+            for erro in erros
+        )
+        restantes = f"; ... e mais {total - len(erros)} linha(s)" if total > len(erros) else ""
+        return f"{total} linha(s) com erro no arquivo. Verifique os tipos de dados ou o conteúdo das colunas. {detalhes}{restantes}"
+
+    @staticmethod
+    def convert_to_candidatos(data: List[Dict[str, Any]]) -> List[CandidatoCreate]:
+        with metricas.medir("arquivo.convert_to_candidatos"):
+            colunas, erros = FileService.convert_dataframe(pd.DataFrame(data))
+        if erros:
+            raise InvalidFileException(FileService._formatar_erros(erros))
+        return [
+            CandidatoCreate.model_construct(
+                cpf=colunas['cpf'][i], nota_final=float(colunas['nota_final'][i]), cota=COTAS[colunas['cota'][i]],
+                opcao=int(colunas['opcao'][i]), nome=colunas['nome'][i], email=colunas['email'][i],
+                campus=colunas['campus'][i], curso=colunas['curso'][i], turno=colunas['turno'][i]
+            )
+            for i in range(len(colunas['cpf']))
+        ]
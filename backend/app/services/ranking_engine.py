@@ -0,0 +1,69 @@
+from typing import Optional
+import numpy as np
+from domain.enums import TipoCota, COTAS, SEM_VALOR
+
+# Cotas de origem elegíveis para cada cota alvo (mesmos conjuntos dos 9 passos da chamada)
+ELIGIBILITY_FOR_RANKING = {
+    TipoCota.AC: [TipoCota.AC, TipoCota.LI_EP, TipoCota.LI_PCD, TipoCota.LI_Q, TipoCota.LI_PPI, TipoCota.LB_EP, TipoCota.LB_PCD, TipoCota.LB_Q, TipoCota.LB_PPI],
+    TipoCota.LI_EP: [TipoCota.LI_EP, TipoCota.LI_PCD, TipoCota.LI_Q, TipoCota.LI_PPI, TipoCota.LB_EP, TipoCota.LB_PCD, TipoCota.LB_Q, TipoCota.LB_PPI],
+    TipoCota.LI_PCD: [TipoCota.LI_PCD, TipoCota.LB_PCD],
+    TipoCota.LI_Q: [TipoCota.LI_Q, TipoCota.LB_Q],
+    TipoCota.LI_PPI: [TipoCota.LI_PPI, TipoCota.LB_PPI],
+    TipoCota.LB_EP: [TipoCota.LB_EP, TipoCota.LB_PCD, TipoCota.LB_Q, TipoCota.LB_PPI],
+    TipoCota.LB_PCD: [TipoCota.LB_PCD],
+    TipoCota.LB_Q: [TipoCota.LB_Q],
+    TipoCota.LB_PPI: [TipoCota.LB_PPI],
+}
+
+# ELEGIBILIDADE[alvo, origem] indica se a cota de origem (código) concorre na lista da cota alvo (código)
+ELEGIBILIDADE = np.array(
+    [[origem in ELIGIBILITY_FOR_RANKING[alvo] for origem in COTAS] for alvo in COTAS],
+    dtype=bool
+)
+
+
+class RankingEngine:
+
+    @staticmethod
+    def ordenar_por_nota(notas: np.ndarray, grupos: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Retorna as posições que ordenam as notas de forma decrescente (dentro de
+        cada grupo, quando informado). A ordenação é estável: empates mantêm a
+        ordem de entrada, como no `sorted(..., reverse=True)` original.
+        """
+        if grupos is None:
+            return np.argsort(-notas, kind="stable")
+        return np.lexsort((-notas, grupos))
+
+    @staticmethod
+    def classificar(notas: np.ndarray, cotas: np.ndarray, grupos: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Calcula a classificação de cada candidato nas nove listas de cota.
+
+        Ordena uma única vez por nota e deriva as nove colunas class_* de somas
+        acumuladas das máscaras de elegibilidade. Com `grupos` (ex.: código do
+        curso), todos os cursos são classificados em uma só passada e a contagem
+        recomeça em cada grupo.
+
+        Retorna uma matriz (n, 9) na ordem de entrada, com SEM_VALOR onde o
+        candidato não concorre na cota.
+        """
+        n = notas.size
+        resultado = np.full((n, len(COTAS)), SEM_VALOR, dtype=np.int32)
+        if n == 0:
+            return resultado
+
+        ordem = RankingEngine.ordenar_por_nota(notas, grupos)
+        elegiveis = ELEGIBILIDADE[:, cotas[ordem]].T
+        acumulado = np.cumsum(elegiveis, axis=0, dtype=np.int32)
+
+        if grupos is not None:
+            grupos_ordenados = grupos[ordem]
+            inicios = np.flatnonzero(np.r_[True, grupos_ordenados[1:] != grupos_ordenados[:-1]])
+            base = np.zeros((inicios.size, len(COTAS)), dtype=np.int32)
+            base[1:] = acumulado[inicios[1:] - 1]
+            tamanhos = np.diff(np.r_[inicios, n])
+            acumulado -= np.repeat(base, tamanhos, axis=0)
+
+        resultado[ordem] = np.where(elegiveis, acumulado, SEM_VALOR)
+        return resultado
@@ -0,0 +1,9 @@
+"""
+Benchmarks do backend: gerador determinístico de arquivos de candidatos no
+formato do SISU e medições de tempo e pico de memória das operações da API.
+
+Uso, a partir da pasta `backend/`:
+
+    python -m benchmarks --tamanhos 10000 100000 1000000 --repeticoes 3 --memoria --saida resultado.json
+    python -m benchmarks.gerador --candidatos 1000000 candidatos.csv
+"""
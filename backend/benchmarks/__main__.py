@@ -0,0 +1,198 @@
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+import argparse
+import itertools
+import json
+import os
+import platform
+import sys
+import tempfile
+
+# O backend é executado a partir de backend/app, com importações absolutas
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "app"))
+
+import numpy as np
+import pandas as pd
+from fastapi.testclient import TestClient
+
+from benchmarks.gerador import ConfiguracaoDataset, gerar_csv
+from benchmarks.medicao import Medicao, medir
+
+# Parcela das vagas de cada cota (a soma das vagas do curso é ~10% das inscrições)
+DISTRIBUICAO_VAGAS = {
+    "AC": 0.50, "LI_EP": 0.10, "LI_PCD": 0.02, "LI_Q": 0.02, "LI_PPI": 0.10,
+    "LB_EP": 0.08, "LB_PCD": 0.02, "LB_Q": 0.02, "LB_PPI": 0.14,
+}
+CURSOS_POR_CICLO = 5
+CHAMADAS_POR_CICLO = 3
+PROPORCAO_NAO_HOMOLOGADOS = 0.1
+
+_workspaces = itertools.count(1)
+
+
+class Bancada:
+    """Executa as operações pela API, cada repetição em um workspace novo."""
+
+    def __init__(self, cliente: TestClient, arquivo: bytes, cursos: List[Tuple[Tuple[str, str, str], int]]):
+        self.cliente = cliente
+        self.arquivo = arquivo
+        self.cursos = cursos  # (curso, inscrições), do maior para o menor
+
+    def _requisitar(self, metodo: str, url: str, workspace: str, **kwargs) -> Any:
+        resposta = self.cliente.request(metodo, url, headers={"X-Workspace": workspace}, **kwargs)
+        if resposta.status_code >= 400:
+            raise RuntimeError(f"{metodo} {url} falhou ({resposta.status_code}): {resposta.text[:300]}")
+        return resposta
+
+    def novo_workspace(self, carregar: bool = True) -> str:
+        workspace = f"benchmark-{next(_workspaces)}"
+        if carregar:
+            self.upload(workspace)
+        return workspace
+
+    def remover(self, workspace: str) -> None:
+        self.cliente.delete(f"/workspaces/{workspace}")
+
+    def upload(self, workspace: str) -> None:
+        self._requisitar("POST", "/chamadas/upload?delimiter=;&encoding=iso-8859-1", workspace,
+                         files={"file": ("candidatos.csv", self.arquivo, "text/csv")})
+
+    def filtrar(self, workspace: str, curso: Tuple[str, str, str]) -> None:
+        campus, nome, turno = curso
+        self._requisitar("POST", "/chamadas/filtro", workspace, json={"campus": campus, "curso": nome, "turno": turno})
+
+    def definir_vagas(self, workspace: str, inscricoes: int) -> None:
+        total = max(len(DISTRIBUICAO_VAGAS), inscricoes // 10)
+        vagas = {cota: max(1, round(total * parcela)) for cota, parcela in DISTRIBUICAO_VAGAS.items()}
+        self._requisitar("POST", "/chamadas/definir-vagas", workspace, json=vagas)
+
+    def gerar_chamada(self, workspace: str, fator: int = 2) -> Dict[str, Any]:
+        return self._requisitar("POST", "/chamadas/gerar-chamada", workspace, json={"fator_multiplicacao": fator}).json()
+
+    def cpfs_nao_homologados(self, workspace: str, chamada_num: int) -> List[str]:
+        chamados = self._requisitar("GET", f"/chamadas/listar/{chamada_num}", workspace).json()
+        return [c["cpf"] for c in chamados[::round(1 / PROPORCAO_NAO_HOMOLOGADOS)]]
+
+    def marcar_nao_homologados(self, workspace: str, cpfs: List[str]) -> None:
+        self._requisitar("POST", "/chamadas/marcar-nao-homologados", workspace, json=cpfs)
+
+    def preparar_chamada(self) -> Tuple[str, int]:
+        """Workspace com o maior curso filtrado, vagas definidas e a 1ª chamada gerada."""
+        workspace = self.novo_workspace()
+        curso, inscricoes = self.cursos[0]
+        self.filtrar(workspace, curso)
+        self.definir_vagas(workspace, inscricoes)
+        return workspace, self.gerar_chamada(workspace)["chamada_num"]
+
+    def ciclo(self, workspace: str) -> None:
+        """Chamadas sucessivas de vários cursos, com não homologados entre elas."""
+        for rodada in range(CHAMADAS_POR_CICLO):
+            chamada_num = None
+            for curso, inscricoes in self.cursos[:CURSOS_POR_CICLO]:
+                self.filtrar(workspace, curso)
+                if rodada == 0:
+                    self.definir_vagas(workspace, inscricoes)
+                chamada_num = self.gerar_chamada(workspace)["chamada_num"]
+            self.marcar_nao_homologados(workspace, self.cpfs_nao_homologados(workspace, chamada_num))
+
+
+def executar_tamanho(bancada: Bancada, candidatos: int, repeticoes: int, memoria: bool) -> List[Medicao]:
+    from api.dependencies import workspaces
+
+    medicoes = []
+
+    def medir_operacao(operacao, executar, preparar):
+        criados: List[str] = []
+
+        def preparar_registrando():
+            estado = preparar()
+            criados.append(estado[0] if isinstance(estado, tuple) else estado)
+            return estado
+
+        medicoes.append(medir(operacao, candidatos, executar, preparar_registrando, repeticoes, memoria))
+        for workspace in criados:
+            bancada.remover(workspace)
+        print(f"  {operacao:<28} {medicoes[-1].mediana_ms:>10.1f} ms", flush=True)
+
+    curso, inscricoes = bancada.cursos[0]
+    medir_operacao("upload", bancada.upload, lambda: bancada.novo_workspace(carregar=False))
+    medir_operacao("filtro", lambda ws: bancada.filtrar(ws, curso), bancada.novo_workspace)
+
+    def preparar_vagas():
+        workspace = bancada.novo_workspace()
+        bancada.filtrar(workspace, curso)
+        bancada.definir_vagas(workspace, inscricoes)
+        return workspace
+    medir_operacao("gerar_chamada", bancada.gerar_chamada, preparar_vagas)
+
+    def preparar_nao_homologados():
+        workspace, chamada_num = bancada.preparar_chamada()
+        return workspace, bancada.cpfs_nao_homologados(workspace, chamada_num)
+    medir_operacao("marcar_nao_homologados", lambda estado: bancada.marcar_nao_homologados(*estado), preparar_nao_homologados)
+
+    # Exportações não alteram o estado: um só workspace, com os resultados memorizados descartados a cada repetição
+    workspace, chamada_num = bancada.preparar_chamada()
+
+    def sem_cache():
+        workspaces.obter(workspace).cache.limpar()
+        return workspace
+    for operacao, url in (
+        ("exportar_chamada", f"/chamadas/exportar/{chamada_num}"),
+        ("relatorio_completo", f"/chamadas/relatorio-completo/{chamada_num}"),
+        ("relatorio_geral_curso", "/chamadas/relatorio-geral-curso"),
+    ):
+        medicoes.append(medir(operacao, candidatos, lambda ws, url=url: bancada._requisitar("GET", url, ws).content, sem_cache, repeticoes, memoria))
+        print(f"  {operacao:<28} {medicoes[-1].mediana_ms:>10.1f} ms", flush=True)
+    bancada.remover(workspace)
+
+    medir_operacao(f"ciclo_{CHAMADAS_POR_CICLO}_chamadas_{CURSOS_POR_CICLO}_cursos", bancada.ciclo, bancada.novo_workspace)
+    return medicoes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Mede tempo e pico de memória das operações do backend.")
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=[10_000, 100_000], help="Números de inscrições dos arquivos gerados.")
+    parser.add_argument("--repeticoes", type=int, default=3)
+    parser.add_argument("--memoria", action="store_true", help="Mede também o pico de memória (execução extra sob o tracemalloc).")
+    parser.add_argument("--semente", type=int, default=ConfiguracaoDataset.semente)
+    parser.add_argument("--diretorio-dados", default=os.path.join(tempfile.gettempdir(), "sistema-vagas-benchmarks"),
+                        help="Onde guardar os arquivos gerados (reaproveitados entre execuções).")
+    parser.add_argument("--saida", help="Arquivo JSON para gravar os resultados.")
+    args = parser.parse_args()
+
+    from core.config import settings
+    from main import app
+
+    os.makedirs(args.diretorio_dados, exist_ok=True)
+    resultados = []
+    with TestClient(app) as cliente:
+        for candidatos in args.tamanhos:
+            config = ConfiguracaoDataset(candidatos=candidatos, semente=args.semente)
+            caminho = os.path.join(args.diretorio_dados, f"candidatos_{candidatos}_{args.semente}.csv")
+            if not os.path.exists(caminho):
+                gerar_csv(config, caminho)
+            with open(caminho, "rb") as arquivo:
+                conteudo = arquivo.read()
+            inscricoes = pd.read_csv(caminho, sep=";", encoding="iso-8859-1", usecols=["Campus", "Curso", "Turno"]).value_counts()
+            cursos = [(tuple(curso), int(total)) for curso, total in inscricoes.items()]
+
+            print(f"{candidatos} inscrições ({len(conteudo) / (1024 * 1024):.1f} MB, {len(cursos)} cursos)", flush=True)
+            resultados.extend(m.resumo() for m in executar_tamanho(Bancada(cliente, conteudo, cursos), candidatos, args.repeticoes, args.memoria))
+
+    print(f"\n{'operação':<32}{'inscrições':>12}{'mediana (ms)':>15}{'mínimo (ms)':>14}{'pico (MB)':>12}")
+    for r in resultados:
+        pico = "-" if r["pico_memoria_mb"] is None else f"{r['pico_memoria_mb']:.1f}"
+        print(f"{r['operacao']:<32}{r['candidatos']:>12}{r['mediana_ms']:>15.1f}{r['minimo_ms']:>14.1f}{pico:>12}")
+
+    if args.saida:
+        ambiente = {
+            "python": platform.python_version(), "plataforma": platform.platform(), "cpus": os.cpu_count(),
+            "numpy": np.__version__, "pandas": pd.__version__, "repositorio": settings.repositorio,
+            "repeticoes": args.repeticoes, "semente": args.semente,
+        }
+        with open(args.saida, "w", encoding="utf-8") as saida:
+            json.dump({"ambiente": ambiente, "resultados": resultados}, saida, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
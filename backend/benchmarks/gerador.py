@@ -0,0 +1,111 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+import argparse
+import numpy as np
+import pandas as pd
+
+COLUNAS_CSV = ["CPF", "Nome", "E-mail", "Campus", "Curso", "Turno", "Nota Final", "Cota do Candidato", "Opção de Inscrição"]
+
+# Distribuição aproximada das inscrições por cota em um processo do SISU
+PROPORCAO_COTAS_PADRAO = {
+    "AC": 0.50, "LI_EP": 0.10, "LI_PCD": 0.02, "LI_Q": 0.02, "LI_PPI": 0.10,
+    "LB_EP": 0.10, "LB_PCD": 0.02, "LB_Q": 0.02, "LB_PPI": 0.12,
+}
+
+TURNOS = ("Matutino", "Vespertino", "Noturno", "Integral")
+
+
+@dataclass
+class ConfiguracaoDataset:
+    """Parâmetros do arquivo sintético; a mesma configuração gera sempre o mesmo arquivo."""
+    candidatos: int = 100_000  # total de linhas (inscrições)
+    campi: int = 4
+    cursos_por_campus: int = 12
+    turnos_por_curso: int = 2
+    proporcao_cotas: Dict[str, float] = field(default_factory=lambda: dict(PROPORCAO_COTAS_PADRAO))
+    proporcao_segunda_opcao: float = 0.4  # pessoas que também se inscrevem em uma 2ª opção
+    proporcao_cpf_duplicado: float = 0.005  # inscrições que repetem o CPF de outra pessoa
+    semente: int = 42
+
+    def cursos(self) -> List[Tuple[str, str, str]]:
+        """Chaves (campus, curso, turno) dos cursos ofertados."""
+        cursos = []
+        for c in range(self.campi):
+            for k in range(self.cursos_por_campus):
+                for t in range(self.turnos_por_curso):
+                    cursos.append((f"Campus {c + 1:02d}", f"Curso {k + 1:03d}", TURNOS[(k + t) % len(TURNOS)]))
+        return cursos
+
+
+def gerar_dataframe(config: ConfiguracaoDataset) -> pd.DataFrame:
+    """Gera as inscrições com as colunas e os valores do arquivo do SISU (nota com vírgula decimal)."""
+    rng = np.random.default_rng(config.semente)
+    cursos = config.cursos()
+    pessoas = max(1, round(config.candidatos / (1 + config.proporcao_segunda_opcao)))
+
+    # Popularidade dos cursos com cauda longa: poucos cursos concentram muitas inscrições
+    popularidade = 1.0 / np.arange(1, len(cursos) + 1) ** 0.8
+    popularidade = rng.permutation(popularidade / popularidade.sum())
+
+    cpfs = rng.choice(10**11, size=pessoas, replace=False)
+    duplicados = rng.random(pessoas) < config.proporcao_cpf_duplicado
+    cpfs[duplicados] = cpfs[rng.integers(0, pessoas, duplicados.sum())]
+
+    nomes_cotas = list(config.proporcao_cotas)
+    pesos_cotas = np.array([config.proporcao_cotas[cota] for cota in nomes_cotas], dtype=np.float64)
+    cotas = rng.choice(len(nomes_cotas), size=pessoas, p=pesos_cotas / pesos_cotas.sum())
+    notas = np.clip(rng.normal(620, 85, pessoas), 300, 950)
+    primeira = rng.choice(len(cursos), size=pessoas, p=popularidade)
+
+    # Segunda opção: outro curso, com nota ligeiramente diferente
+    segundas = min(config.candidatos - pessoas, pessoas) if len(cursos) > 1 else 0
+    tem_segunda = np.sort(rng.choice(pessoas, size=max(0, segundas), replace=False))
+    segunda = (primeira[tem_segunda] + rng.integers(1, max(2, len(cursos)), tem_segunda.size)) % len(cursos)
+
+    pessoa = np.concatenate([np.arange(pessoas), tem_segunda])
+    curso = np.concatenate([primeira, segunda])
+    opcao = np.concatenate([np.ones(pessoas, dtype=np.int8), np.full(tem_segunda.size, 2, dtype=np.int8)])
+    nota = np.concatenate([notas, notas[tem_segunda] + rng.uniform(-5, 5, tem_segunda.size)])
+    ordem = rng.permutation(pessoa.size)
+    pessoa, curso, opcao, nota = pessoa[ordem], curso[ordem], opcao[ordem], np.round(nota[ordem], 2)
+
+    chaves = np.array(cursos, dtype=object)
+    return pd.DataFrame({
+        "CPF": pd.Series(cpfs[pessoa]).map("{:011d}".format),
+        "Nome": pd.Series(pessoa).map("Candidato {:d}".format),
+        "E-mail": pd.Series(pessoa).map("candidato{:d}@exemplo.com.br".format),
+        "Campus": chaves[curso, 0],
+        "Curso": chaves[curso, 1],
+        "Turno": chaves[curso, 2],
+        "Nota Final": nota,
+        "Cota do Candidato": np.array(nomes_cotas, dtype=object)[cotas[pessoa]],
+        "Opção de Inscrição": np.where(opcao == 1, "1ª opção", "2ª opção"),
+    }, columns=COLUNAS_CSV)
+
+
+def gerar_csv(config: ConfiguracaoDataset, destino: str) -> str:
+    """Grava o arquivo sintético em `destino` (separador ';', ISO-8859-1) e retorna o caminho."""
+    gerar_dataframe(config).to_csv(destino, sep=";", decimal=",", encoding="iso-8859-1", index=False)
+    return destino
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Gera um CSV sintético de candidatos no formato do SISU.")
+    parser.add_argument("destino")
+    parser.add_argument("--candidatos", type=int, default=ConfiguracaoDataset.candidatos)
+    parser.add_argument("--campi", type=int, default=ConfiguracaoDataset.campi)
+    parser.add_argument("--cursos-por-campus", type=int, default=ConfiguracaoDataset.cursos_por_campus)
+    parser.add_argument("--turnos-por-curso", type=int, default=ConfiguracaoDataset.turnos_por_curso)
+    parser.add_argument("--segunda-opcao", type=float, default=ConfiguracaoDataset.proporcao_segunda_opcao)
+    parser.add_argument("--cpf-duplicado", type=float, default=ConfiguracaoDataset.proporcao_cpf_duplicado)
+    parser.add_argument("--semente", type=int, default=ConfiguracaoDataset.semente)
+    args = parser.parse_args()
+    gerar_csv(ConfiguracaoDataset(
+        candidatos=args.candidatos, campi=args.campi, cursos_por_campus=args.cursos_por_campus,
+        turnos_por_curso=args.turnos_por_curso, proporcao_segunda_opcao=args.segunda_opcao,
+        proporcao_cpf_duplicado=args.cpf_duplicado, semente=args.semente,
+    ), args.destino)
+
+
+if __name__ == "__main__":
+    main()
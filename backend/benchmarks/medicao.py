@@ -0,0 +1,63 @@
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+import gc
+import statistics
+import time
+import tracemalloc
+
+
+@dataclass
+class Medicao:
+    operacao: str
+    candidatos: int
+    tempos_s: List[float] = field(default_factory=list)
+    pico_memoria_mb: Optional[float] = None
+
+    @property
+    def mediana_ms(self) -> float:
+        return statistics.median(self.tempos_s) * 1000
+
+    @property
+    def minimo_ms(self) -> float:
+        return min(self.tempos_s) * 1000
+
+    def resumo(self) -> Dict[str, Any]:
+        return {
+            "operacao": self.operacao,
+            "candidatos": self.candidatos,
+            "mediana_ms": round(self.mediana_ms, 2),
+            "minimo_ms": round(self.minimo_ms, 2),
+            "tempos_ms": [round(t * 1000, 2) for t in self.tempos_s],
+            "pico_memoria_mb": None if self.pico_memoria_mb is None else round(self.pico_memoria_mb, 2),
+        }
+
+
+def medir(
+    operacao: str, candidatos: int, executar: Callable[[Any], Any], preparar: Callable[[], Any] = None,
+    repeticoes: int = 3, memoria: bool = False
+) -> Medicao:
+    """
+    Mede `executar(estado)` `repeticoes` vezes, cada uma sobre o estado novo
+    retornado por `preparar()` (que não entra na medição). Com `memoria`, uma
+    execução extra é feita sob o tracemalloc, separada das cronometradas, para
+    obter o pico de memória alocada pela operação.
+    """
+    preparar = preparar or (lambda: None)
+    medicao = Medicao(operacao, candidatos)
+    for _ in range(repeticoes):
+        estado = preparar()
+        gc.collect()
+        inicio = time.perf_counter()
+        executar(estado)
+        medicao.tempos_s.append(time.perf_counter() - inicio)
+
+    if memoria:
+        estado = preparar()
+        gc.collect()
+        tracemalloc.start()
+        try:
+            executar(estado)
+            medicao.pico_memoria_mb = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+        finally:
+            tracemalloc.stop()
+    return medicao
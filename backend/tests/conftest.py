@@ -0,0 +1,5 @@
+from pathlib import Path
+import sys
+
+# O backend é executado a partir de backend/app, com importações absolutas
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "app"))
@@ -0,0 +1,65 @@
+from typing import Dict, List, Sequence, Set
+
+import numpy as np
+import pytest
+
+from services.allocation_engine import agrupar_cursos_dependentes
+
+
+def _agrupar_por_conjuntos(pessoas_por_curso: Sequence[np.ndarray], selecionados: Set[int]) -> List[List[int]]:
+    """Agrupamento de referência: union-find sobre conjuntos de pessoas, como antes da versão vetorizada."""
+    pai = list(range(len(pessoas_por_curso)))
+
+    def raiz(i: int) -> int:
+        while pai[i] != i:
+            pai[i] = pai[pai[i]]
+            i = pai[i]
+        return i
+
+    primeiro_curso: Dict[int, int] = {}
+    for indice, pessoas in enumerate(pessoas_por_curso):
+        for pessoa in set(pessoas.tolist()):
+            if pessoa in selecionados: continue
+            outro = primeiro_curso.setdefault(pessoa, indice)
+            if outro != indice:
+                pai[raiz(indice)] = raiz(outro)
+
+    componentes: Dict[int, List[int]] = {}
+    for indice in range(len(pessoas_por_curso)):
+        componentes.setdefault(raiz(indice), []).append(indice)
+    return list(componentes.values())
+
+
+def test_sem_cursos():
+    assert agrupar_cursos_dependentes([], bytearray(3)) == []
+
+
+def test_cursos_sem_candidatos():
+    vazio = np.array([], dtype=np.int64)
+    assert agrupar_cursos_dependentes([vazio, vazio, vazio], bytearray()) == [[0], [1], [2]]
+
+
+def test_todas_as_pessoas_ja_selecionadas():
+    pessoas_por_curso = [np.array([0, 1]), np.array([0, 1])]
+    assert agrupar_cursos_dependentes(pessoas_por_curso, bytearray([1, 1])) == [[0], [1]]
+
+
+def test_pessoa_livre_liga_os_cursos():
+    pessoas_por_curso = [np.array([0, 1]), np.array([2]), np.array([1, 3])]
+    assert agrupar_cursos_dependentes(pessoas_por_curso, bytearray([1, 0, 0, 0])) == [[0, 2], [1]]
+    assert agrupar_cursos_dependentes(pessoas_por_curso, bytearray([0, 1, 0, 0])) == [[0], [1], [2]]
+
+
+@pytest.mark.parametrize("semente", range(200))
+def test_igual_ao_agrupamento_por_conjuntos(semente):
+    rng = np.random.default_rng(semente)
+    total_pessoas = int(rng.integers(1, 30))
+    pessoas_por_curso = [
+        rng.integers(0, total_pessoas, size=int(rng.integers(0, 8)))
+        for _ in range(int(rng.integers(0, 10)))
+    ]
+    proporcao = rng.choice([0.0, 0.3, 0.8, 1.0])
+    selecionados = bytearray((rng.random(total_pessoas) < proporcao).astype(np.uint8).tobytes())
+
+    esperado = _agrupar_por_conjuntos(pessoas_por_curso, {i for i, marcado in enumerate(selecionados) if marcado})
+    assert agrupar_cursos_dependentes(pessoas_por_curso, selecionados) == esperado
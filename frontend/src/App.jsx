@@ -11,6 +11,8 @@ import { resetCall } from './store/slices/callSlice';
 import { resetVacancies } from './store/slices/vacanciesSlice';
 import { resetUi } from './store/slices/uiSlice';
 
+import { getWorkspace } from './utils/workspace';
+
 import './styles/main.css';
 
 function AppContent() {
@@ -25,6 +27,7 @@ function AppContent() {
           method: 'POST',
           headers: {
             'Content-Type': 'application/json',
+            'X-Workspace': getWorkspace(),
           },
         });
         const responseData = await response.json();
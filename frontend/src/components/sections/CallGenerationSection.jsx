@@ -10,6 +10,7 @@ import { setCallData } from '../../store/slices/callSlice';
 import { setCandidates, clearNonApprovedCpfs } from '../../store/slices/candidatesSlice';
 import InfoLegend from '../ui/InfoLegend';
 import CallStory from '../story/CallStory';
+import { withWorkspace } from '../../utils/workspace';
 
 
 const CallGenerationSection = () => {
@@ -245,7 +246,7 @@ const CallGenerationSection = () => {
                                 className="btn-app btn-app-success"
                                 onClick={() => {
                                     const url = `${import.meta.env.VITE_API_BASE_URL || '/api/v1'}/chamadas/exportar/${currentCall}`;
-                                    window.location.href = url;
+                                    window.location.href = withWorkspace(url);
                                 }}
                             >
                                 DOWNLOAD DA LISTA DE CHAMADOS
@@ -271,7 +272,7 @@ const CallGenerationSection = () => {
                             className="btn-app btn-app-success"
                             onClick={() => {
                                 const url = `${import.meta.env.VITE_API_BASE_URL || '/api/v1'}/chamadas/relatorio-completo/${currentCall}`;
-                                window.location.href = url;
+                                window.location.href = withWorkspace(url);
                             }}
                         >
                             DOWNLOAD DO RESULTADO FINAL DA {currentCall}ª CHAMADA
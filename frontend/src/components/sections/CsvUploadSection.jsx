@@ -73,7 +73,7 @@ const CsvUploadSection = () => {
                     message: `Arquivo ${responseData.data.filename} carregado com sucesso! ${responseData.data.records_processed} registros processados.`,
                     type: 'success'
                 });
-                dispatch(setMasterList(responseData.data.candidatos));
+                dispatch(setMasterList(responseData.data.cursos));
                 dispatch(setWorkflowStep('upload-complete'));
             } else {
                 setStatus({
@@ -10,6 +10,7 @@ import {
 import SortableTableHeader from './SortableTableHeader';
 import '../../styles/components/candidatesTable.css';
 import { Download } from 'react-bootstrap-icons';
+import { withWorkspace } from '../../utils/workspace';
 
 const formatOrdinalFeminine = (n) => {
   if (n === null || n === undefined || isNaN(parseInt(n))) return '';
@@ -61,7 +62,7 @@ const CandidatesTable = () => {
 
   const handleDownloadAll = () => {
     const url = `${import.meta.env.VITE_API_BASE_URL || '/api/v1'}/chamadas/relatorio-geral-curso`;
-    window.location.href = url;
+    window.location.href = withWorkspace(url);
   };
 
 
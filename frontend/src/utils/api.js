@@ -1,9 +1,11 @@
+import { getWorkspace } from './workspace';
+
 export const api = {
   async request({ endpoint, method = 'GET', data = null, isFormData = false }) {
     const url = `/api/v1${endpoint}`; // O proxy do Vite cuidará do redirecionamento
     const options = {
       method,
-      headers: {}
+      headers: { 'X-Workspace': getWorkspace() }
     };
 
     if (data) {
@@ -0,0 +1,16 @@
+const STORAGE_KEY = 'workspace';
+
+// Cada navegador trabalha em um workspace próprio no backend (cabeçalho X-Workspace),
+// para que operadores diferentes não sobrescrevam o filtro e as chamadas uns dos outros.
+export const getWorkspace = () => {
+  let workspace = localStorage.getItem(STORAGE_KEY);
+  if (!workspace) {
+    workspace = `ws-${Math.random().toString(36).slice(2, 12)}`;
+    localStorage.setItem(STORAGE_KEY, workspace);
+  }
+  return workspace;
+};
+
+// Links de download não enviam cabeçalhos: o workspace vai como parâmetro da URL
+export const withWorkspace = (url) =>
+  `${url}${url.includes('?') ? '&' : '?'}workspace=${encodeURIComponent(getWorkspace())}`;